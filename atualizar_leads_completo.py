@@ -7,14 +7,15 @@ Script para coletar TODOS os dados de leads e atualizar a tabela
 import asyncio
 import os
 import sys
-import duckdb
-import pandas as pd
+from dataclasses import replace
 from datetime import datetime
 from dotenv import load_dotenv
 
 # Adicionar o diretório scripts ao path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'scripts'))
 
+from scripts.orchestrator import orchestrator
+
 async def main():
     print("🎯 ATUALIZAÇÃO COMPLETA DA TABELA DE LEADS")
     print("=" * 50)
@@ -35,60 +36,25 @@ async def main():
     print("✅ Variáveis de ambiente OK")
     
     try:
-        from scripts.cv_leads_api import obter_dados_cv_leads
+        from scripts.fontes import FONTES
+        from scripts.motor_fontes import executar_fontes, imprimir_resultado, imprimir_tabelas_motherduck
         
         print("\n🚀 COLETANDO TODOS OS DADOS DE LEADS...")
         print("⚠️ Este processo pode demorar alguns minutos...")
         
-        # Coletar TODOS os dados
-        df_leads = await obter_dados_cv_leads()
-        
-        print(f"\n📊 DADOS COLETADOS:")
-        print(f"   - Total de registros: {len(df_leads):,}")
+        # Carga completa (substitui main.cv_leads e reinicia a watermark do sync incremental)
+        fontes = [replace(FONTES['cv_leads'], timeout=1800.0)]
+        resultado = await executar_fontes(fontes, forcar_completa=True)
+        imprimir_resultado(resultado, fontes)
         
-        if df_leads.empty:
+        count_leads = resultado.registros('cv_leads')
+        if count_leads == 0:
             print("❌ Nenhum registro encontrado")
             return False
+        if not resultado.sucesso:
+            return False
         
-        print(f"   - Colunas: {len(df_leads.columns)}")
-        print(f"   - Primeiros registros:")
-        print(df_leads.head(3))
-        
-        # Upload para MotherDuck
-        print(f"\n📤 FAZENDO UPLOAD COMPLETO PARA MOTHERDUCK...")
-        
-        # Configurar DuckDB
-        print("1. Configurando DuckDB...")
-        duckdb.sql("INSTALL motherduck")
-        duckdb.sql("LOAD motherduck")
-        
-        os.environ['motherduck_token'] = motherduck
-        
-        # Conectar
-        print("2. Conectando ao MotherDuck...")
-        conn = duckdb.connect('md:reservas')
-        print("✅ Conexão estabelecida")
-        
-        # Upload CV Leads (substituição completa)
-        print(f"3. CV Leads - {len(df_leads):,} registros")
-        print("   Fazendo upload completo CV Leads...")
-        conn.register("df_cv_leads", df_leads)
-        conn.execute("CREATE OR REPLACE TABLE main.cv_leads AS SELECT * FROM df_cv_leads")
-        count_leads = conn.sql("SELECT COUNT(*) FROM main.cv_leads").fetchone()[0]
-        print(f"   ✅ CV Leads: {count_leads:,} registros")
-        
-        # Verificar tabelas
-        print("\n4. Verificando tabelas no banco 'reservas':")
-        tables = conn.sql("SHOW TABLES").fetchall()
-        for table in tables:
-            table_name = table[0]
-            try:
-                count = conn.sql(f"SELECT COUNT(*) FROM main.{table_name}").fetchone()[0]
-                print(f"   📊 {table_name}: {count:,} registros")
-            except:
-                print(f"   📊 {table_name}: (erro ao contar)")
-        
-        conn.close()
+        imprimir_tabelas_motherduck()
         print(f"\n✅ ATUALIZAÇÃO COMPLETA CONCLUÍDA!")
         print(f"🎉 Tabela 'main.cv_leads' atualizada com {count_leads:,} registros")
         
@@ -99,6 +65,9 @@ async def main():
         import traceback
         traceback.print_exc()
         return False
+    
+    finally:
+        await orchestrator.close()
 
 if __name__ == "__main__":
     print("⚠️ ATENÇÃO: Este script irá coletar TODOS os dados de leads")
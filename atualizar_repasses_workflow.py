@@ -7,14 +7,14 @@ Script para coletar dados e atualizar a tabela Repases_Workflow
 import asyncio
 import os
 import sys
-import duckdb
-import pandas as pd
 from datetime import datetime
 from dotenv import load_dotenv
 
 # Adicionar o diretório scripts ao path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'scripts'))
 
+from scripts.orchestrator import orchestrator
+
 async def main():
     print("🎯 ATUALIZAÇÃO DA TABELA DE REPASSES WORKFLOW")
     print("=" * 50)
@@ -35,60 +35,24 @@ async def main():
     print("✅ Variáveis de ambiente OK")
     
     try:
-        from scripts.cv_repasses_workflow_api import obter_dados_cv_repasses_workflow
+        from scripts.fontes import obter_fontes
+        from scripts.motor_fontes import executar_fontes, imprimir_resultado, imprimir_tabelas_motherduck
         
         print("\n🚀 COLETANDO DADOS DE REPASSES WORKFLOW...")
         print("⚠️ Coletando todos os dados disponíveis...")
         
-        # Coletar dados
-        df_workflow = await obter_dados_cv_repasses_workflow()
-        
-        print(f"\n📊 DADOS COLETADOS:")
-        print(f"   - Total de registros: {len(df_workflow):,}")
+        fontes = obter_fontes(['cv_repasses_workflow'])
+        resultado = await executar_fontes(fontes)
+        imprimir_resultado(resultado, fontes)
         
-        if df_workflow.empty:
+        count_workflow = resultado.registros('cv_repasses_workflow')
+        if count_workflow == 0:
             print("❌ Nenhum registro encontrado")
             return False
+        if not resultado.sucesso:
+            return False
         
-        print(f"   - Colunas: {len(df_workflow.columns)}")
-        print(f"   - Primeiros registros:")
-        print(df_workflow.head(3))
-        
-        # Upload para MotherDuck
-        print(f"\n📤 FAZENDO UPLOAD PARA MOTHERDUCK...")
-        
-        # Configurar DuckDB
-        print("1. Configurando DuckDB...")
-        duckdb.sql("INSTALL motherduck")
-        duckdb.sql("LOAD motherduck")
-        
-        os.environ['motherduck_token'] = motherduck
-        
-        # Conectar
-        print("2. Conectando ao MotherDuck...")
-        conn = duckdb.connect('md:reservas')
-        print("✅ Conexão estabelecida")
-        
-        # Upload CV Repasses Workflow
-        print(f"3. CV Repasses Workflow - {len(df_workflow):,} registros")
-        print("   Fazendo upload CV Repasses Workflow...")
-        conn.register("df_cv_repasses_workflow", df_workflow)
-        conn.execute("CREATE OR REPLACE TABLE main.cv_repasses_workflow AS SELECT * FROM df_cv_repasses_workflow")
-        count_workflow = conn.sql("SELECT COUNT(*) FROM main.cv_repasses_workflow").fetchone()[0]
-        print(f"   ✅ CV Repasses Workflow: {count_workflow:,} registros")
-        
-        # Verificar tabelas
-        print("\n4. Verificando tabelas no banco 'reservas':")
-        tables = conn.sql("SHOW TABLES").fetchall()
-        for table in tables:
-            table_name = table[0]
-            try:
-                count = conn.sql(f"SELECT COUNT(*) FROM main.{table_name}").fetchone()[0]
-                print(f"   📊 {table_name}: {count:,} registros")
-            except:
-                print(f"   📊 {table_name}: (erro ao contar)")
-        
-        conn.close()
+        imprimir_tabelas_motherduck()
         print(f"\n✅ ATUALIZAÇÃO CONCLUÍDA!")
         print(f"🎉 Tabela 'main.cv_repasses_workflow' atualizada com {count_workflow:,} registros")
         
@@ -99,6 +63,9 @@ async def main():
         import traceback
         traceback.print_exc()
         return False
+    
+    finally:
+        await orchestrator.close()
 
 if __name__ == "__main__":
     print("⚠️ ATENÇÃO: Este script irá atualizar a tabela cv_repasses_workflow")
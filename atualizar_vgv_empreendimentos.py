@@ -12,6 +12,7 @@ import sys
 from datetime import datetime
 from dotenv import load_dotenv
 from scripts.cv_vgv_empreendimentos_api import obter_dados_vgv_empreendimentos
+from scripts.orchestrator import orchestrator
 
 async def upload_vgv_empreendimentos_motherduck(df_vgv_empreendimentos):
     """Faz upload dos dados VGV Empreendimentos para o MotherDuck"""
@@ -124,6 +125,9 @@ async def atualizar_vgv_empreendimentos_completo():
         import traceback
         traceback.print_exc()
         return False
+    
+    finally:
+        await orchestrator.close()
 
 def main():
     """Função principal"""
@@ -132,146 +132,17 @@ def atualizar_view_vera_cruz(conn):
         return False
 
 def atualizar_view_principal(conn):
-    """Atualiza a view principal com as novas colunas"""
+    """Materializa as vendas consolidadas e recria a view principal como alias da tabela"""
     print("\n" + "="*60)
     print("ATUALIZANDO VIEW PRINCIPAL")
     print("="*60)
     
     try:
-        sql_principal = """
-        CREATE OR REPLACE VIEW informacoes_consolidadas.sienge_vendas_consolidadas AS
-        -- Seção 1: Vendas Realizadas Sienge
-        SELECT
-            CAST(s.enterpriseId AS INTEGER) as enterpriseId,
-            COALESCE(r.empreendimento, CASE WHEN s.enterpriseId = '19' THEN 'Ondina II' ELSE 'Sienge Realizada' END) as nome_empreendimento,
-            s.value,
-            CAST(s.issueDate AS DATE) as issueDate,
-            CAST(s.contractDate AS DATE) as contractDate,
-            'Sienge Realizada' as origem,
-            COALESCE(r.corretor, s.brokers[1].name) as corretor,
-            COALESCE(r.imobiliaria, (SELECT imobiliaria FROM reservas.reservas_abril WHERE idimobiliaria = s.brokers[1].id LIMIT 1)) as imobiliaria,
-            s.customers[1].name as cliente,
-            s.customers[1].email as email,
-            s.customers[1].addresses[1].city as cidade,
-            s.customers[1].addresses[1].zipCode as cep_cliente,
-            s.customers[1].profession as profissao,
-            s.customers[1].cpf as documento_cliente,
-            s.customers[1].id as idcliente,
-            s.brokers[1].id as idcorretor,
-            (SELECT idimobiliaria FROM reservas.reservas_abril WHERE idimobiliaria = s.brokers[1].id LIMIT 1) as idimobiliaria,
-            s.customers[1].sex as sexo,
-            s.customers[1].civilStatus as estado_civil,
-            NULL as idade,
-            NULL as renda,
-            NULL as situacao_original,
-            NULL as data_venda,
-            NULL as valor_contrato_com_juros,
-            NULL as vencimento,
-            NULL as campanha,
-            NULL as midia,
-            NULL as tipovenda,
-            NULL as grupo,
-            NULL as regiao,
-            NULL as bloco,
-            NULL as unidade,
-            NULL as etapa,
-            -- NOVAS COLUNAS ADICIONADAS
-            (SELECT vpl_reserva FROM reservas.reservas_abril WHERE codigointerno = s.id LIMIT 1) as vpl_reserva,
-            (SELECT vpl_tabela FROM reservas.reservas_abril WHERE codigointerno = s.id LIMIT 1) as vpl_tabela,
-            (SELECT idreserva FROM reservas.reservas_abril WHERE codigointerno = s.id LIMIT 1) as idreserva
-        FROM reservas.sienge_vendas_realizadas s
-        LEFT JOIN (SELECT DISTINCT idempreendimento, empreendimento, corretor, imobiliaria, idcorretor, idimobiliaria FROM reservas.reservas_abril) r ON CAST(s.enterpriseId AS INTEGER) = r.idempreendimento
-
-        UNION ALL
-
-        -- Seção 2: Vendas Canceladas Sienge
-        SELECT
-            CAST(s.enterpriseId AS INTEGER) as enterpriseId,
-            COALESCE(r.empreendimento, CASE WHEN s.enterpriseId = '19' THEN 'Ondina II' ELSE 'Sienge Cancelada' END) as nome_empreendimento,
-            s.value,
-            CAST(s.issueDate AS DATE) as issueDate,
-            CAST(s.contractDate AS DATE) as contractDate,
-            'Sienge Cancelada' as origem,
-            COALESCE(r.corretor, s.brokers[1].name) as corretor,
-            COALESCE(r.imobiliaria, (SELECT imobiliaria FROM reservas.reservas_abril WHERE idimobiliaria = s.brokers[1].id LIMIT 1)) as imobiliaria,
-            s.customers[1].name as cliente,
-            s.customers[1].email as email,
-            s.customers[1].addresses[1].city as cidade,
-            s.customers[1].addresses[1].zipCode as cep_cliente,
-            s.customers[1].profession as profissao,
-            s.customers[1].cpf as documento_cliente,
-            s.customers[1].id as idcliente,
-            s.brokers[1].id as idcorretor,
-            (SELECT idimobiliaria FROM reservas.reservas_abril WHERE idimobiliaria = s.brokers[1].id LIMIT 1) as idimobiliaria,
-            s.customers[1].sex as sexo,
-            s.customers[1].civilStatus as estado_civil,
-            NULL as idade,
-            NULL as renda,
-            NULL as situacao_original,
-            NULL as data_venda,
-            NULL as valor_contrato_com_juros,
-            NULL as vencimento,
-            NULL as campanha,
-            NULL as midia,
-            NULL as tipovenda,
-            NULL as grupo,
-            NULL as regiao,
-            NULL as bloco,
-            NULL as unidade,
-            NULL as etapa,
-            -- NOVAS COLUNAS ADICIONADAS
-            (SELECT vpl_reserva FROM reservas.reservas_abril WHERE codigointerno = s.id LIMIT 1) as vpl_reserva,
-            (SELECT vpl_tabela FROM reservas.reservas_abril WHERE codigointerno = s.id LIMIT 1) as vpl_tabela,
-            (SELECT idreserva FROM reservas.reservas_abril WHERE codigointerno = s.id LIMIT 1) as idreserva
-        FROM reservas.sienge_vendas_canceladas s
-        LEFT JOIN (SELECT DISTINCT idempreendimento, empreendimento, corretor, imobiliaria, idcorretor, idimobiliaria FROM reservas.reservas_abril) r ON CAST(s.enterpriseId AS INTEGER) = r.idempreendimento
-
-        UNION ALL
-
-        -- Seção 3: Reservas Vera Cruz
-        SELECT
-            r.enterpriseId,
-            r.nome_empreendimento,
-            r.value,
-            r.issueDate,
-            r.contractDate,
-            r.origem,
-            r.corretor,
-            r.imobiliaria,
-            r.cliente,
-            r.email,
-            r.cidade,
-            r.cep_cliente,
-            r.renda,
-            r.sexo,
-            r.idade,
-            r.estado_civil,
-            r.documento_cliente,
-            r.idcliente,
-            r.idcorretor,
-            r.idimobiliaria,
-            r.situacao_original,
-            r.data_venda,
-            r.valor_contrato_com_juros,
-            r.vencimento,
-            r.campanha,
-            r.midia,
-            r.tipovenda,
-            r.grupo,
-            r.regiao,
-            r.bloco,
-            r.unidade,
-            r.etapa,
-            -- NOVAS COLUNAS ADICIONADAS (vêm direto da tabela reservas)
-            r.vpl_reserva,
-            r.vpl_tabela,
-            r.idreserva
-        FROM reservas.cv_vendas_consolidadas_vera_cruz r
-        """
+        from scripts.vendas_consolidadas import materializar_vendas_consolidadas, TABELA_VENDAS_CONSOLIDADAS
         
-        print("Executando atualizacao da view principal...")
-        conn.execute(sql_principal)
-        print("View principal atualizada com sucesso!")
+        print(f"Materializando {TABELA_VENDAS_CONSOLIDADAS}...")
+        total = materializar_vendas_consolidadas(conn)
+        print(f"View principal atualizada com sucesso! ({total:,} registros materializados)")
         
         return True
         
@@ -0,0 +1,43 @@
+"""
+Camada de consultas compartilhada pelos dashboards de vendas
+(dashboard/, vendas_consolidadas/ e streamlit_vendas/).
+
+Conexão, cache e construção de consultas ficam aqui; o utils/md_conn.py de
+cada app apenas carrega o .env do app e reexporta este pacote.
+"""
+
+from consultas_vendas.conexao import MotherDuckConnection, get_md_connection, versao_dados
+from consultas_vendas.filtros import build_date_filter, build_optional_filters
+from consultas_vendas.consultas import (
+    TABELA_VENDAS, TABELA_CUBO, TABELA_DIMENSOES, DIMENSOES_CUBO, EXPRESSOES_DIMENSAO, DIMENSOES_FILTRO,
+    cubo_disponivel, build_base_agregavel,
+    get_base_data, get_metas_data, get_vendas_with_metas, get_timeline_data,
+    get_kpis, get_metas_periodo, get_top_empreendimentos, get_analytics_by_dimension,
+    get_date_range, get_unique_values, get_analytics_corretor, get_analytics_imobiliaria,
+    get_filter_options
+)
+from consultas_vendas.painel import PainelVendas, get_painel_vendas
+from consultas_vendas.executor import ExecutorPaineis, ResultadoPainel
+from consultas_vendas.leads import (
+    TABELA_LEADS, LEADS_POR_PAGINA, CORRETORES_REMOVIDOS, MAPA_FUNIL, ETAPAS_FUNIL, ETAPAS_FUNIL_ATIVOS,
+    FiltrosLeads, ResumoFunil, sql_etapa_funil,
+    get_opcoes_filtros_leads, get_resumo_funil, get_contagens_status, get_leads_pagina,
+    get_funil_ativos, get_leads_ativos_pagina
+)
+
+__all__ = [
+    'MotherDuckConnection', 'get_md_connection', 'versao_dados',
+    'build_date_filter', 'build_optional_filters',
+    'TABELA_VENDAS', 'TABELA_CUBO', 'TABELA_DIMENSOES', 'DIMENSOES_CUBO', 'EXPRESSOES_DIMENSAO', 'DIMENSOES_FILTRO',
+    'cubo_disponivel', 'build_base_agregavel',
+    'get_base_data', 'get_metas_data', 'get_vendas_with_metas', 'get_timeline_data',
+    'get_kpis', 'get_metas_periodo', 'get_top_empreendimentos', 'get_analytics_by_dimension',
+    'get_date_range', 'get_unique_values', 'get_analytics_corretor', 'get_analytics_imobiliaria',
+    'get_filter_options',
+    'PainelVendas', 'get_painel_vendas',
+    'ExecutorPaineis', 'ResultadoPainel',
+    'TABELA_LEADS', 'LEADS_POR_PAGINA', 'CORRETORES_REMOVIDOS', 'MAPA_FUNIL', 'ETAPAS_FUNIL', 'ETAPAS_FUNIL_ATIVOS',
+    'FiltrosLeads', 'ResumoFunil', 'sql_etapa_funil',
+    'get_opcoes_filtros_leads', 'get_resumo_funil', 'get_contagens_status', 'get_leads_pagina',
+    'get_funil_ativos', 'get_leads_ativos_pagina',
+]
@@ -0,0 +1,98 @@
+"""
+Cache de resultados em disco compartilhado entre processos dos dashboards.
+Cada resultado vira um arquivo Parquet cuja chave é o SQL normalizado, os
+parâmetros e a versão dos dados; restarts e workers diferentes reaproveitam
+os mesmos arquivos. O tamanho total é limitado com descarte LRU (atime, marcado a
+cada leitura) e a idade de cada arquivo pelo mesmo DASHBOARD_TTL_CACHE do
+cache em memória (mtime = gravação).
+"""
+
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CACHE_DISCO_ATIVO = os.getenv('DASHBOARD_CACHE_DISCO', 'true').lower() == 'true'
+DIRETORIO_CACHE = Path(os.getenv('DASHBOARD_CACHE_DIR', Path(tempfile.gettempdir()) / 'consultas_vendas_cache'))
+TAMANHO_MAXIMO_BYTES = int(float(os.getenv('DASHBOARD_CACHE_DISCO_MB', '512')) * 1024 * 1024)
+IDADE_MAXIMA_SEGUNDOS = int(os.getenv('DASHBOARD_TTL_CACHE', '86400'))
+
+def chave_cache(sql: str, params: Optional[List], versao: str) -> str:
+    """Hash do SQL normalizado (espaços colapsados) + parâmetros + versão dos dados."""
+    sql_normalizado = ' '.join(sql.split())
+    conteudo = json.dumps([sql_normalizado, params or [], versao], default=str, ensure_ascii=False)
+    return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+def _arquivo(chave: str) -> Path:
+    return DIRETORIO_CACHE / f"{chave}.parquet"
+
+def ler(sql: str, params: Optional[List], versao: str) -> Optional[pd.DataFrame]:
+    """Retorna o resultado em cache (None se ausente ou ilegível)."""
+    if not CACHE_DISCO_ATIVO:
+        return None
+
+    arquivo = _arquivo(chave_cache(sql, params, versao))
+    try:
+        gravado_em = arquivo.stat().st_mtime
+        agora = time.time()
+        if agora - gravado_em > IDADE_MAXIMA_SEGUNDOS:
+            return None
+        df = pd.read_parquet(arquivo)
+        # Marca o uso para o descarte LRU, preservando a data de gravação
+        os.utime(arquivo, (agora, gravado_em))
+        return df
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Cache em disco ilegível ({arquivo.name}): {e}")
+        return None
+
+def gravar(sql: str, params: Optional[List], versao: str, df: pd.DataFrame):
+    """Grava o resultado (escrita atômica via arquivo temporário + rename) e aplica o limite de tamanho."""
+    if not CACHE_DISCO_ATIVO:
+        return
+
+    arquivo = _arquivo(chave_cache(sql, params, versao))
+    temporario = arquivo.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        DIRETORIO_CACHE.mkdir(parents=True, exist_ok=True)
+        df.to_parquet(temporario, index=False)
+        os.replace(temporario, arquivo)
+    except Exception as e:
+        # Tipos sem representação em Parquet ou disco indisponível: segue só com o cache em memória
+        logger.warning(f"Resultado não gravado no cache em disco: {e}")
+        temporario.unlink(missing_ok=True)
+        return
+
+    descartar_excedente()
+
+def descartar_excedente(tamanho_maximo: int = TAMANHO_MAXIMO_BYTES):
+    """Remove os arquivos menos usados recentemente até o cache caber no limite."""
+    arquivos = []
+    for caminho in DIRETORIO_CACHE.glob('*.parquet'):
+        try:
+            info = caminho.stat()
+        except FileNotFoundError:
+            continue
+        arquivos.append((info.st_atime, info.st_size, caminho))
+
+    total = sum(tamanho for _, tamanho, _ in arquivos)
+    for _, tamanho, caminho in sorted(arquivos):
+        if total <= tamanho_maximo:
+            break
+        # Outro processo pode ter removido o mesmo arquivo
+        caminho.unlink(missing_ok=True)
+        total -= tamanho
+
+def limpar():
+    """Apaga todo o cache em disco."""
+    for caminho in DIRETORIO_CACHE.glob('*.parquet'):
+        caminho.unlink(missing_ok=True)
@@ -0,0 +1,181 @@
+"""
+Conexão com o MotherDuck compartilhada pelos dashboards.
+Implementação única de conexão (st.cache_resource) e cache de consultas
+para todos os apps.
+
+O cache de consultas é versionado pelos dados: a chave inclui a versão lida
+das marcas gravadas na ingestão (change log dos loaders e estado de sync),
+então um resultado vale até os dados mudarem, e não por um TTL fixo.
+Consultas a tabelas que a ingestão não marca (metas, reservas_abril) também
+expiram em janelas curtas (TTL_TABELAS_SEM_MARCA). Atrás
+do cache em memória fica o cache em disco (cache_disco), compartilhado entre
+processos e preservado em restarts.
+
+As consultas usam o pool de cursores (pool.py): cada thread de sessão
+Streamlit executa no seu próprio cursor, em paralelo.
+"""
+
+import os
+import time
+import logging
+import duckdb
+import pandas as pd
+from typing import List, Optional
+import streamlit as st
+
+from consultas_vendas import cache_disco
+from consultas_vendas.pool import PoolCursores, erro_de_conexao
+
+logger = logging.getLogger(__name__)
+
+# Marcas gravadas pela ingestão: cada carga registra no change log e cada
+# atualização das vendas consolidadas/cubo grava o estado de sync
+SQL_VERSAO_DADOS = """
+SELECT
+    (SELECT MAX(registrado_em) FROM reservas.main.log_alteracoes) AS ultima_alteracao,
+    (SELECT MAX(atualizado_em) FROM reservas.main.sync_state) AS ultimo_sync
+"""
+
+# Intervalo (s) entre verificações da versão dos dados
+TTL_VERSAO_DADOS = int(os.getenv('DASHBOARD_TTL_VERSAO', '30'))
+# Validade máxima de um resultado em cache
+TTL_CACHE_CONSULTAS = int(os.getenv('DASHBOARD_TTL_CACHE', '86400'))
+# Tabelas mantidas fora dos loaders (sem change log nem sync_state): as
+# consultas que as leem expiram em janelas de TTL_TABELAS_SEM_MARCA segundos
+TABELAS_SEM_MARCA = ('meta_vendas_2025', 'reservas_abril')
+TTL_TABELAS_SEM_MARCA = int(os.getenv('DASHBOARD_TTL_SEM_MARCA', '300'))
+MAX_ENTRADAS_CACHE = int(os.getenv('DASHBOARD_CACHE_MAX_ENTRADAS', '1000'))
+
+class MotherDuckConnection:
+    """Classe para gerenciar conexões com MotherDuck."""
+    
+    def __init__(self):
+        self.token = self._get_token()
+        self.connection = None
+        self.pool = PoolCursores(self._abrir_conexao)
+    
+    def _get_token(self) -> str:
+        """Obtém o token do MotherDuck das variáveis de ambiente."""
+        # Primeiro tenta st.secrets (Streamlit Cloud)
+        try:
+            if hasattr(st, 'secrets') and 'MOTHERDUCK_TOKEN' in st.secrets:
+                return st.secrets['MOTHERDUCK_TOKEN']
+        except:
+            pass
+        
+        # Tentar diferentes nomes de variáveis conforme padrão do projeto
+        token = os.getenv('MOTHERDUCK_TOKEN') or os.getenv('Token_MD')
+        
+        if not token:
+            raise ValueError(
+                "Token do MotherDuck não encontrado. "
+                "Configure MOTHERDUCK_TOKEN ou Token_MD no arquivo .env"
+            )
+        
+        return token
+    
+    def _abrir_conexao(self):
+        """Abre a conexão base do pool."""
+        try:
+            connection_string = f"md:?motherduck_token={self.token}"
+            return duckdb.connect(connection_string)
+        except Exception as e:
+            st.error(f"❌ Erro ao conectar com MotherDuck: {str(e)}")
+            raise
+    
+    def connect(self):
+        """Estabelece conexão com MotherDuck."""
+        self.connection = self.pool.conexao_base()
+    
+    def disconnect(self):
+        """Fecha a conexão com MotherDuck."""
+        self.pool.fechar()
+        self.connection = None
+    
+    def reconnect(self):
+        """Relê o token (pode ter sido renovado) e reabre a conexão base e os cursores."""
+        self.token = self._get_token()
+        self.pool.reconectar()
+        self.connection = None
+    
+    def execute(self, sql: str, params: Optional[List] = None) -> pd.DataFrame:
+        """
+        Executa a consulta direto no MotherDuck, sem cache, num cursor exclusivo do pool.
+        
+        Em erro de conexão/autenticação (ex.: token expirado), reconecta e tenta mais uma vez.
+        """
+        try:
+            return self._executar(sql, params)
+        except Exception as e:
+            if not erro_de_conexao(e):
+                raise
+            logger.warning(f"Erro de conexão com o MotherDuck, reconectando: {e}")
+            self.reconnect()
+            return self._executar(sql, params)
+    
+    def _executar(self, sql: str, params: Optional[List] = None) -> pd.DataFrame:
+        with self.pool.cursor() as cursor:
+            if params:
+                return cursor.execute(sql, params).df()
+            return cursor.execute(sql).df()
+    
+    def run_query(self, sql: str, params: Optional[List] = None) -> pd.DataFrame:
+        """
+        Executa uma consulta SQL e retorna um DataFrame.
+        
+        O resultado fica em cache até a versão dos dados mudar (nova ingestão);
+        se a consulta lê uma das TABELAS_SEM_MARCA, no máximo TTL_TABELAS_SEM_MARCA.
+        
+        Args:
+            sql: Query SQL
+            params: Parâmetros para a query (opcional)
+            
+        Returns:
+            DataFrame com os resultados
+        """
+        return self._run_query_versionada(sql, params, versao_consulta(sql))
+    
+    @st.cache_data(ttl=TTL_CACHE_CONSULTAS, max_entries=MAX_ENTRADAS_CACHE, show_spinner=False)
+    def _run_query_versionada(_self, sql: str, params: Optional[List], versao: str) -> pd.DataFrame:
+        # Atrás do cache em memória, o cache em disco compartilhado entre processos
+        df = cache_disco.ler(sql, params, versao)
+        if df is not None:
+            return df
+        
+        try:
+            df = _self.execute(sql, params)
+        except Exception as e:
+            st.error(f"❌ Erro na consulta SQL: {str(e)}")
+            st.error(f"SQL: {sql}")
+            if params:
+                st.error(f"Parâmetros: {params}")
+            raise
+        
+        cache_disco.gravar(sql, params, versao, df)
+        return df
+
+# Instância global da conexão
+@st.cache_resource
+def get_md_connection():
+    """Retorna uma instância singleton da conexão MotherDuck."""
+    return MotherDuckConnection()
+
+def versao_consulta(sql: str) -> str:
+    """Versão dos dados usada na chave de cache de uma consulta"""
+    versao = versao_dados()
+    if any(tabela in sql for tabela in TABELAS_SEM_MARCA):
+        versao += f"|janela:{int(time.time() // TTL_TABELAS_SEM_MARCA)}"
+    return versao
+
+@st.cache_data(ttl=TTL_VERSAO_DADOS, show_spinner=False)
+def versao_dados() -> str:
+    """
+    Retorna a versão atual dos dados (verificada no máximo a cada TTL_VERSAO_DADOS).
+    
+    Sem as tabelas de controle, cai para janelas de 5 minutos (comportamento antigo).
+    """
+    try:
+        linha = get_md_connection().execute(SQL_VERSAO_DADOS).iloc[0]
+        return f"{linha['ultima_alteracao']}|{linha['ultimo_sync']}"
+    except Exception:
+        return f"janela:{int(time.time() // 300)}"
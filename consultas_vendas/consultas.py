@@ -0,0 +1,796 @@
+"""
+Consultas de vendas consolidadas usadas pelos dashboards.
+As agregações leem o rollup (cubo) quando disponível e a tabela detalhada caso contrário.
+"""
+
+import os
+import pandas as pd
+from typing import List, Optional, Dict, Any
+
+from consultas_vendas.conexao import get_md_connection
+from consultas_vendas.filtros import build_date_filter, build_optional_filters
+
+TABELA_VENDAS = "informacoes_consolidadas.sienge_vendas_consolidadas"
+TABELA_CUBO = "informacoes_consolidadas.main.vendas_consolidadas_cubo"
+TABELA_DIMENSOES = "informacoes_consolidadas.main.vendas_consolidadas_dimensoes"
+DIMENSOES_CUBO = {'contractDate', 'enterpriseId', 'nome_empreendimento', 'imobiliaria',
+                  'corretor', 'midia', 'tipovenda', 'origem'}
+
+# Expressões das dimensões na tabela detalhada (no cubo já vêm normalizadas)
+EXPRESSOES_DIMENSAO = {
+    'contractDate': "contractDate::DATE",
+    'imobiliaria': "COALESCE(NULLIF(TRIM(imobiliaria), ''), '—')",
+    'corretor': "COALESCE(NULLIF(TRIM(corretor), ''), '—')",
+}
+
+# Filtros da barra lateral, na ordem da tabela de dimensões
+DIMENSOES_FILTRO = ['nome_empreendimento', 'corretor', 'imobiliaria', 'midia', 'tipovenda']
+
+# Sufixo das colunas meta_<mês> de meta_vendas_2025, de janeiro a dezembro
+MESES = ('janeiro', 'fevereiro', 'marco', 'abril', 'maio', 'junho',
+         'julho', 'agosto', 'setembro', 'outubro', 'novembro', 'dezembro')
+
+def _tabela_consolidada_existe(nome: str) -> bool:
+    """Indica se a tabela existe em informacoes_consolidadas (DASHBOARD_USAR_CUBO=false força a tabela detalhada)."""
+    if os.getenv('DASHBOARD_USAR_CUBO', 'true').lower() != 'true':
+        return False
+    
+    md_conn = get_md_connection()
+    try:
+        result = md_conn.run_query("""
+        SELECT COUNT(*) AS total
+        FROM information_schema.tables
+        WHERE table_catalog = 'informacoes_consolidadas' AND table_name = ?
+        """, [nome])
+        return int(result.iloc[0]['total']) > 0
+    except Exception:
+        return False
+
+def cubo_disponivel() -> bool:
+    """Indica se o rollup existe (DASHBOARD_USAR_CUBO=false força a tabela detalhada)."""
+    return _tabela_consolidada_existe('vendas_consolidadas_cubo')
+
+def build_base_agregavel(dimensoes: List[str], start_date: str, end_date: str,
+                         optional_filter: str = "") -> str:
+    """
+    Constrói o SELECT base das consultas agregadas, roteando para o cubo.
+    
+    Retorna as dimensões pedidas e as medidas qtd_vendas, soma_valor,
+    menor_valor e maior_valor. Quando o cubo existe e cobre as dimensões, lê
+    o rollup; caso contrário, lê a tabela detalhada com uma venda por linha.
+    As consultas agregam sempre com SUM(qtd_vendas), SUM(soma_valor),
+    MIN(menor_valor) e MAX(maior_valor), válidas nas duas fontes.
+    
+    Args:
+        dimensoes: Colunas de agrupamento necessárias
+        start_date: Data inicial
+        end_date: Data final
+        optional_filter: Filtro de build_optional_filters (colunas do cubo)
+        
+    Returns:
+        String com o SELECT base
+    """
+    date_filter = build_date_filter(start_date, end_date)
+    
+    if set(dimensoes) <= DIMENSOES_CUBO and cubo_disponivel():
+        colunas = [*dimensoes, "qtd_vendas", "soma_valor", "menor_valor", "maior_valor"]
+        sql = f"""
+        SELECT {', '.join(colunas)}
+        FROM {TABELA_CUBO}
+        WHERE {date_filter}
+        """
+    else:
+        colunas = [f"{EXPRESSOES_DIMENSAO.get(d, d)} AS {d}" for d in dimensoes] + [
+            "1 AS qtd_vendas", "value::DOUBLE AS soma_valor",
+            "value::DOUBLE AS menor_valor", "value::DOUBLE AS maior_valor"
+        ]
+        sql = f"""
+        SELECT {', '.join(colunas)}
+        FROM {TABELA_VENDAS}
+        WHERE value IS NOT NULL
+          AND {date_filter}
+        """
+    
+    if optional_filter:
+        sql += f" AND {optional_filter}"
+    
+    return sql
+
+# Consultas agregadas sobre um SELECT base com as medidas qtd_vendas, soma_valor,
+# menor_valor e maior_valor (build_base_agregavel ou o conjunto do painel em lote)
+
+def sql_timeline(base: str) -> str:
+    """SQL da evolução mensal sobre o SELECT base."""
+    return f"""
+    WITH base AS ({base})
+    SELECT 
+        date_trunc('month', contractDate)::DATE AS mes,
+        SUM(qtd_vendas)::BIGINT AS qtd_vendas,
+        SUM(soma_valor) AS total_valor,
+        SUM(soma_valor) / SUM(qtd_vendas) AS ticket_medio
+    FROM base
+    GROUP BY date_trunc('month', contractDate)
+    ORDER BY mes
+    """
+
+def sql_kpis(base: str) -> str:
+    """SQL dos KPIs sobre o SELECT base."""
+    return f"""
+    WITH base AS ({base})
+    SELECT 
+        COALESCE(SUM(qtd_vendas), 0)::BIGINT AS total_vendas,
+        SUM(soma_valor) AS total_valor,
+        SUM(soma_valor) / SUM(qtd_vendas) AS ticket_medio,
+        MIN(menor_valor) AS menor_venda,
+        MAX(maior_valor) AS maior_venda
+    FROM base
+    """
+
+def sql_top_empreendimentos(base: str, limit: int = 10) -> str:
+    """SQL do ranking de empreendimentos sobre o SELECT base."""
+    return f"""
+    WITH base AS ({base})
+    SELECT 
+        nome_empreendimento,
+        SUM(qtd_vendas)::BIGINT AS qtd_vendas,
+        SUM(soma_valor) AS total_valor,
+        SUM(soma_valor) / SUM(qtd_vendas) AS ticket_medio
+    FROM base
+    GROUP BY nome_empreendimento
+    ORDER BY total_valor DESC
+    LIMIT {limit}
+    """
+
+def sql_analytics_corretor(base: str) -> str:
+    """SQL da análise por corretor sobre o SELECT base."""
+    return f"""
+    WITH base AS ({base}
+    ),
+    imob_rank AS (
+        SELECT
+            corretor,
+            imobiliaria,
+            SUM(qtd_vendas) AS qtd,
+            ROW_NUMBER() OVER (PARTITION BY corretor ORDER BY SUM(qtd_vendas) DESC) AS rn
+        FROM base
+        GROUP BY corretor, imobiliaria
+    ),
+    agg AS (
+        SELECT
+            corretor,
+            SUM(qtd_vendas)::BIGINT AS total_vendas,
+            SUM(soma_valor) AS total_valor,
+            SUM(soma_valor) / SUM(qtd_vendas) AS ticket_medio,
+            MIN(menor_valor) AS menor_venda,
+            MAX(maior_valor) AS maior_venda,
+            COUNT(DISTINCT nome_empreendimento) AS empreendimentos_unicos
+        FROM base
+        GROUP BY corretor
+    )
+    SELECT 
+        a.corretor,
+        COALESCE(ir.imobiliaria, '—') AS imobiliaria_principal,
+        a.total_vendas,
+        a.total_valor,
+        a.ticket_medio,
+        a.menor_venda,
+        a.maior_venda,
+        a.empreendimentos_unicos
+    FROM agg a
+    LEFT JOIN imob_rank ir
+      ON ir.corretor = a.corretor AND ir.rn = 1
+    ORDER BY a.total_valor DESC
+    """
+
+def sql_analytics_imobiliaria(base: str) -> str:
+    """SQL da análise por imobiliária sobre o SELECT base."""
+    return f"""
+    WITH base AS ({base})
+    SELECT 
+        imobiliaria,
+        SUM(qtd_vendas)::BIGINT AS total_vendas,
+        SUM(soma_valor) AS total_valor,
+        SUM(soma_valor) / SUM(qtd_vendas) AS ticket_medio,
+        MIN(menor_valor) AS menor_venda,
+        MAX(maior_valor) AS maior_venda,
+        COUNT(DISTINCT nome_empreendimento) AS empreendimentos_unicos,
+        COUNT(DISTINCT corretor) AS corretores_unicos
+    FROM base
+    GROUP BY imobiliaria
+    ORDER BY total_valor DESC
+    """
+
+def get_base_data(start_date: str, end_date: str, 
+                 midia: Optional[List[str]] = None,
+                 tipovenda: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Obtém dados base da tabela sienge_vendas_consolidadas com filtros aplicados.
+    
+    Args:
+        start_date: Data inicial
+        end_date: Data final
+        midia: Lista de mídias (opcional)
+        tipovenda: Lista de tipos de venda (opcional)
+        
+    Returns:
+        DataFrame com dados filtrados
+    """
+    md_conn = get_md_connection()
+    
+    # Construir filtros
+    date_filter = build_date_filter(start_date, end_date)
+    optional_filter, params = build_optional_filters(midia, tipovenda)
+    
+    # SQL base
+    sql = f"""
+    WITH base AS (
+        SELECT
+            enterpriseId,
+            nome_empreendimento,
+            COALESCE(NULLIF(TRIM(imobiliaria), ''), '—') AS imobiliaria,
+            COALESCE(NULLIF(TRIM(corretor), ''), '—') AS corretor,
+            COALESCE(NULLIF(TRIM(bloco), ''), '—') AS bloco,
+            COALESCE(NULLIF(TRIM(unidade), ''), '—') AS unidade,
+            midia,
+            tipovenda,
+            contractDate::DATE AS contractDate,
+            value::DOUBLE AS value,
+            origem
+        FROM informacoes_consolidadas.sienge_vendas_consolidadas
+        WHERE value IS NOT NULL
+          AND {date_filter}
+    """
+    
+    # Adicionar filtros opcionais
+    if optional_filter:
+        sql += f" AND {optional_filter}"
+    
+    sql += """
+    )
+    SELECT * FROM base
+    ORDER BY contractDate DESC, nome_empreendimento
+    """
+    
+    return md_conn.run_query(sql, params)
+
+def get_metas_data() -> pd.DataFrame:
+    """
+    Obtém dados da tabela meta_vendas_2025.
+    
+    Returns:
+        DataFrame com dados de metas
+    """
+    md_conn = get_md_connection()
+    
+    sql = """
+    SELECT 
+        "Empreendiemento" as nome_empreendimento,
+        "Codigo empreendimento" as codigo_empreendimento,
+        "jan/25" as meta_janeiro,
+        "fev/25" as meta_fevereiro,
+        "mar/25" as meta_marco,
+        "abr/25" as meta_abril,
+        "mai/25" as meta_maio,
+        "jun/25" as meta_junho,
+        "jul/25" as meta_julho,
+        "ago/25" as meta_agosto,
+        "set/25" as meta_setembro,
+        "out/25" as meta_outubro,
+        "nov/25" as meta_novembro,
+        "dez/25" as meta_dezembro
+    FROM informacoes_consolidadas.meta_vendas_2025
+    """
+    
+    return md_conn.run_query(sql)
+
+def get_vendas_with_metas(start_date: str, end_date: str,
+                         midia: Optional[List[str]] = None,
+                         tipovenda: Optional[List[str]] = None,
+                         empreendimento: Optional[str] = None,
+                         corretor: Optional[List[str]] = None,
+                         imobiliaria: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Obtém vendas com metas correspondentes.
+    
+    Args:
+        start_date: Data inicial
+        end_date: Data final
+        midia: Lista de mídias (opcional)
+        tipovenda: Lista de tipos de venda (opcional)
+        empreendimento: Nome do empreendimento (opcional)
+        corretor: Lista de corretores (opcional)
+        imobiliaria: Lista de imobiliárias (opcional)
+        
+    Returns:
+        DataFrame com vendas e metas
+    """
+    md_conn = get_md_connection()
+    
+    # Construir filtros
+    date_filter = build_date_filter(start_date, end_date)
+    optional_filter, params = build_optional_filters(midia, tipovenda, empreendimento, corretor, imobiliaria)
+    
+    sql = f"""
+    WITH vendas AS (
+        SELECT
+            enterpriseId,
+            nome_empreendimento,
+            COALESCE(NULLIF(TRIM(imobiliaria), ''), '—') AS imobiliaria,
+            COALESCE(NULLIF(TRIM(corretor), ''), '—') AS corretor,
+            midia,
+            tipovenda,
+            contractDate::DATE AS contractDate,
+            value::DOUBLE AS value,
+            EXTRACT(YEAR FROM contractDate) as ano,
+            EXTRACT(MONTH FROM contractDate) as mes
+        FROM informacoes_consolidadas.sienge_vendas_consolidadas
+        WHERE value IS NOT NULL
+          AND {date_filter}
+    """
+    
+    if optional_filter:
+        sql += f" AND {optional_filter}"
+    
+    sql += """
+    ),
+    metas AS (
+        SELECT 
+            "Codigo empreendimento" as codigo_empreendimento,
+            "Empreendiemento" as nome_empreendimento,
+            "jan/25" as meta_janeiro,
+            "fev/25" as meta_fevereiro,
+            "mar/25" as meta_marco,
+            "abr/25" as meta_abril,
+            "mai/25" as meta_maio,
+            "jun/25" as meta_junho,
+            "jul/25" as meta_julho,
+            "ago/25" as meta_agosto,
+            "set/25" as meta_setembro,
+            "out/25" as meta_outubro,
+            "nov/25" as meta_novembro,
+            "dez/25" as meta_dezembro
+        FROM informacoes_consolidadas.meta_vendas_2025
+    )
+    SELECT 
+        v.*,
+        CASE v.mes
+            WHEN 1 THEN CAST(m.meta_janeiro AS VARCHAR)
+            WHEN 2 THEN CAST(m.meta_fevereiro AS VARCHAR)
+            WHEN 3 THEN CAST(m.meta_marco AS VARCHAR)
+            WHEN 4 THEN CAST(m.meta_abril AS VARCHAR)
+            WHEN 5 THEN CAST(m.meta_maio AS VARCHAR)
+            WHEN 6 THEN CAST(m.meta_junho AS VARCHAR)
+            WHEN 7 THEN CAST(m.meta_julho AS VARCHAR)
+            WHEN 8 THEN CAST(m.meta_agosto AS VARCHAR)
+            WHEN 9 THEN CAST(m.meta_setembro AS VARCHAR)
+            WHEN 10 THEN CAST(m.meta_outubro AS VARCHAR)
+            WHEN 11 THEN CAST(m.meta_novembro AS VARCHAR)
+            WHEN 12 THEN CAST(m.meta_dezembro AS VARCHAR)
+        END as meta_mes
+    FROM vendas v
+    LEFT JOIN metas m ON v.enterpriseId = m.codigo_empreendimento
+    ORDER BY v.contractDate DESC, v.nome_empreendimento
+    """
+    
+    return md_conn.run_query(sql, params)
+
+def get_timeline_data(start_date: str, end_date: str,
+                     midia: Optional[List[str]] = None,
+                     tipovenda: Optional[List[str]] = None,
+                     empreendimento: Optional[str] = None,
+                     corretor: Optional[List[str]] = None,
+                     imobiliaria: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Obtém dados para timeline mensal.
+    
+    Args:
+        start_date: Data inicial
+        end_date: Data final
+        midia: Lista de mídias (opcional)
+        tipovenda: Lista de tipos de venda (opcional)
+        empreendimento: Nome do empreendimento (opcional)
+        
+    Returns:
+        DataFrame com dados mensais agregados
+    """
+    md_conn = get_md_connection()
+    
+    # Construir filtros
+    optional_filter, params = build_optional_filters(midia, tipovenda, empreendimento, corretor, imobiliaria)
+    
+    sql = sql_timeline(build_base_agregavel(['contractDate'], start_date, end_date, optional_filter))
+    
+    return md_conn.run_query(sql, params)
+
+def get_kpis(start_date: str, end_date: str,
+            midia: Optional[List[str]] = None,
+            tipovenda: Optional[List[str]] = None,
+            empreendimento: Optional[str] = None,
+            corretor: Optional[List[str]] = None,
+            imobiliaria: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Obtém KPIs principais.
+    
+    Args:
+        start_date: Data inicial
+        end_date: Data final
+        midia: Lista de mídias (opcional)
+        tipovenda: Lista de tipos de venda (opcional)
+        empreendimento: Nome do empreendimento (opcional)
+        corretor: Lista de corretores (opcional)
+        imobiliaria: Lista de imobiliárias (opcional)
+        
+    Returns:
+        Dicionário com KPIs
+    """
+    md_conn = get_md_connection()
+    
+    # Construir filtros
+    optional_filter, params = build_optional_filters(midia, tipovenda, empreendimento, corretor, imobiliaria)
+    
+    sql = sql_kpis(build_base_agregavel([], start_date, end_date, optional_filter))
+    
+    return kpis_para_dict(md_conn.run_query(sql, params))
+
+def kpis_para_dict(result: pd.DataFrame) -> Dict[str, Any]:
+    """Converte o resultado de sql_kpis no dicionário de KPIs."""
+    if len(result) > 0:
+        return {
+            'total_vendas': int(result.iloc[0]['total_vendas']),
+            'total_valor': float(result.iloc[0]['total_valor']),
+            'ticket_medio': float(result.iloc[0]['ticket_medio']),
+            'menor_venda': float(result.iloc[0]['menor_venda']),
+            'maior_venda': float(result.iloc[0]['maior_venda'])
+        }
+    else:
+        return {
+            'total_vendas': 0,
+            'total_valor': 0.0,
+            'ticket_medio': 0.0,
+            'menor_venda': 0.0,
+            'maior_venda': 0.0
+        }
+
+def get_metas_periodo(start_date: str, end_date: str, 
+                     empreendimento: Optional[str] = None) -> float:
+    """
+    Obtém meta total para o período selecionado.
+    
+    Args:
+        start_date: Data inicial
+        end_date: Data final
+        empreendimento: Nome do empreendimento (opcional)
+        
+    Returns:
+        Valor total da meta
+    """
+    md_conn = get_md_connection()
+    
+    # Converter datas para ano/mês
+    from datetime import datetime
+    start_dt = datetime.strptime(start_date, '%Y-%m-%d')
+    end_dt = datetime.strptime(end_date, '%Y-%m-%d')
+    
+    # Se empreendimento específico foi selecionado, precisamos buscar o enterpriseId correspondente
+    if empreendimento and empreendimento != "Todos":
+        # Buscar o enterpriseId do empreendimento selecionado
+        sql_emp = """
+        SELECT DISTINCT enterpriseId 
+        FROM informacoes_consolidadas.sienge_vendas_consolidadas 
+        WHERE nome_empreendimento = ?
+        LIMIT 1
+        """
+        emp_result = md_conn.run_query(sql_emp, [empreendimento])
+        
+        if len(emp_result) == 0:
+            return 0.0
+        
+        enterprise_id = emp_result.iloc[0]['enterpriseId']
+        
+        # Construir query para somar metas do período com filtro por enterpriseId
+        sql = f"""
+        SELECT 
+            "Codigo empreendimento" as codigo_empreendimento,
+            "Empreendiemento" as nome_empreendimento,
+            "jan/25" as meta_janeiro,
+            "fev/25" as meta_fevereiro,
+            "mar/25" as meta_marco,
+            "abr/25" as meta_abril,
+            "mai/25" as meta_maio,
+            "jun/25" as meta_junho,
+            "jul/25" as meta_julho,
+            "ago/25" as meta_agosto,
+            "set/25" as meta_setembro,
+            "out/25" as meta_outubro,
+            "nov/25" as meta_novembro,
+            "dez/25" as meta_dezembro
+        FROM informacoes_consolidadas.meta_vendas_2025
+        WHERE "Codigo empreendimento" = '{enterprise_id}'
+        """
+    else:
+        # Construir query para somar metas do período (todos os empreendimentos)
+        sql = """
+        SELECT 
+            "Codigo empreendimento" as codigo_empreendimento,
+            "Empreendiemento" as nome_empreendimento,
+            "jan/25" as meta_janeiro,
+            "fev/25" as meta_fevereiro,
+            "mar/25" as meta_marco,
+            "abr/25" as meta_abril,
+            "mai/25" as meta_maio,
+            "jun/25" as meta_junho,
+            "jul/25" as meta_julho,
+            "ago/25" as meta_agosto,
+            "set/25" as meta_setembro,
+            "out/25" as meta_outubro,
+            "nov/25" as meta_novembro,
+            "dez/25" as meta_dezembro
+        FROM informacoes_consolidadas.meta_vendas_2025
+        """
+    
+    result = md_conn.run_query(sql)
+    
+    if len(result) == 0:
+        return 0.0
+    
+    total_meta = 0.0
+    
+    for _, row in result.iterrows():
+        # Somar metas dos meses no período
+        for mes in range(1, 13):
+            if start_dt.month <= mes <= end_dt.month and start_dt.year <= 2025 <= end_dt.year:
+                col_name = f"meta_{MESES[mes - 1]}"
+                meta_valor = row[col_name]
+                if pd.notna(meta_valor) and meta_valor != 0:
+                    # Tratar formato brasileiro (vírgula como separador decimal)
+                    if isinstance(meta_valor, str):
+                        meta_valor = meta_valor.replace(',', '.')
+                    total_meta += float(meta_valor)
+    
+    return total_meta
+
+def get_top_empreendimentos(start_date: str, end_date: str,
+                           midia: Optional[List[str]] = None,
+                           tipovenda: Optional[List[str]] = None,
+                           empreendimento: Optional[str] = None,
+                           corretor: Optional[List[str]] = None,
+                           imobiliaria: Optional[List[str]] = None,
+                           limit: int = 10) -> pd.DataFrame:
+    """
+    Obtém top empreendimentos por valor e quantidade.
+    
+    Args:
+        start_date: Data inicial
+        end_date: Data final
+        midia: Lista de mídias (opcional)
+        tipovenda: Lista de tipos de venda (opcional)
+        empreendimento: Nome do empreendimento (opcional)
+        limit: Limite de resultados
+        
+    Returns:
+        DataFrame com top empreendimentos
+    """
+    md_conn = get_md_connection()
+    
+    # Construir filtros
+    optional_filter, params = build_optional_filters(midia, tipovenda, empreendimento, corretor, imobiliaria)
+    
+    sql = sql_top_empreendimentos(build_base_agregavel(['nome_empreendimento'], start_date, end_date, optional_filter), limit)
+    
+    return md_conn.run_query(sql, params)
+
+def get_analytics_by_dimension(start_date: str, end_date: str,
+                              dimension: str,
+                              midia: Optional[List[str]] = None,
+                              tipovenda: Optional[List[str]] = None,
+                              limit: int = 20) -> pd.DataFrame:
+    """
+    Obtém análises por dimensão específica (midia, tipovenda, imobiliaria, corretor).
+    
+    Args:
+        start_date: Data inicial
+        end_date: Data final
+        dimension: Dimensão para análise
+        midia: Lista de mídias (opcional)
+        tipovenda: Lista de tipos de venda (opcional)
+        limit: Limite de resultados
+        
+    Returns:
+        DataFrame com análises por dimensão
+    """
+    md_conn = get_md_connection()
+    
+    # Construir filtros
+    optional_filter, params = build_optional_filters(midia, tipovenda)
+    
+    # Validar dimensão
+    valid_dimensions = ['midia', 'tipovenda', 'imobiliaria', 'corretor']
+    if dimension not in valid_dimensions:
+        raise ValueError(f"Dimensão inválida. Use uma das: {valid_dimensions}")
+    
+    sql = f"""
+    WITH base AS ({build_base_agregavel([dimension], start_date, end_date, optional_filter)})
+    SELECT 
+        {dimension},
+        SUM(qtd_vendas)::BIGINT AS qtd_vendas,
+        SUM(soma_valor) AS total_valor,
+        SUM(soma_valor) / SUM(qtd_vendas) AS ticket_medio
+    FROM base
+    GROUP BY {dimension}
+    ORDER BY total_valor DESC
+    LIMIT {limit}
+    """
+    
+    return md_conn.run_query(sql, params)
+
+def get_date_range() -> tuple:
+    """
+    Obtém o range de datas disponível na tabela.
+    
+    Returns:
+        Tuple com (data_min, data_max)
+    """
+    md_conn = get_md_connection()
+    
+    if cubo_disponivel():
+        sql = f"""
+        SELECT 
+            MIN(contractDate) AS data_min,
+            MAX(contractDate) AS data_max
+        FROM {TABELA_CUBO}
+        """
+    else:
+        sql = f"""
+        SELECT 
+            MIN(contractDate) AS data_min,
+            MAX(contractDate) AS data_max
+        FROM {TABELA_VENDAS}
+        WHERE value IS NOT NULL
+        """
+    
+    result = md_conn.run_query(sql)
+    
+    if len(result) > 0:
+        return (
+            result.iloc[0]['data_min'].strftime('%Y-%m-%d'),
+            result.iloc[0]['data_max'].strftime('%Y-%m-%d')
+        )
+    else:
+        # Fallback para datas padrão
+        return ('2024-01-01', '2025-12-31')
+
+def get_unique_values(column: str) -> List[str]:
+    """
+    Obtém valores únicos de uma coluna para filtros.
+    
+    Args:
+        column: Nome da coluna
+        
+    Returns:
+        Lista de valores únicos
+    """
+    md_conn = get_md_connection()
+    
+    if column in DIMENSOES_CUBO and cubo_disponivel():
+        sql = f"""
+        SELECT DISTINCT {column} AS value
+        FROM {TABELA_CUBO}
+        WHERE {column} IS NOT NULL
+        ORDER BY value
+        """
+    else:
+        # Tratar campos que podem ser nulos
+        column_field = EXPRESSOES_DIMENSAO.get(column, column) if column in ['imobiliaria', 'corretor'] else column
+        sql = f"""
+        SELECT DISTINCT {column_field} AS value
+        FROM {TABELA_VENDAS}
+        WHERE value IS NOT NULL
+          AND {column_field} IS NOT NULL
+        ORDER BY value
+        """
+    
+    result = md_conn.run_query(sql)
+    return result['value'].tolist()
+
+def get_analytics_corretor(start_date: str, end_date: str,
+                          midia: Optional[List[str]] = None,
+                          tipovenda: Optional[List[str]] = None,
+                          empreendimento: Optional[str] = None,
+                          corretor: Optional[List[str]] = None,
+                          imobiliaria: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Obtém análise por corretor.
+    
+    Args:
+        start_date: Data inicial
+        end_date: Data final
+        midia: Lista de mídias (opcional)
+        tipovenda: Lista de tipos de venda (opcional)
+        empreendimento: Nome do empreendimento (opcional)
+        corretor: Lista de corretores (opcional)
+        imobiliaria: Lista de imobiliárias (opcional)
+        
+    Returns:
+        DataFrame com análise por corretor
+    """
+    md_conn = get_md_connection()
+    
+    # Construir filtros
+    optional_filter, params = build_optional_filters(midia, tipovenda, empreendimento, corretor, imobiliaria)
+    
+    sql = sql_analytics_corretor(build_base_agregavel(['corretor', 'imobiliaria', 'nome_empreendimento'], start_date, end_date, optional_filter))
+    
+    return md_conn.run_query(sql, params)
+
+def get_analytics_imobiliaria(start_date: str, end_date: str,
+                             midia: Optional[List[str]] = None,
+                             tipovenda: Optional[List[str]] = None,
+                             empreendimento: Optional[str] = None,
+                             corretor: Optional[List[str]] = None,
+                             imobiliaria: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Obtém análise por imobiliária.
+    
+    Args:
+        start_date: Data inicial
+        end_date: Data final
+        midia: Lista de mídias (opcional)
+        tipovenda: Lista de tipos de venda (opcional)
+        empreendimento: Nome do empreendimento (opcional)
+        corretor: Lista de corretores (opcional)
+        imobiliaria: Lista de imobiliárias (opcional)
+        
+    Returns:
+        DataFrame com análise por imobiliária
+    """
+    md_conn = get_md_connection()
+    
+    # Construir filtros
+    optional_filter, params = build_optional_filters(midia, tipovenda, empreendimento, corretor, imobiliaria)
+    
+    sql = sql_analytics_imobiliaria(build_base_agregavel(['imobiliaria', 'corretor', 'nome_empreendimento'], start_date, end_date, optional_filter))
+    
+    return md_conn.run_query(sql, params)
+
+def get_filter_options() -> Dict[str, Any]:
+    """
+    Obtém todas as opções dos filtros da barra lateral numa única consulta.
+    
+    Lê a tabela de dimensões mantida pela ingestão; sem ela, recorre a
+    get_date_range e get_unique_values.
+    
+    Returns:
+        Dicionário com data_min e data_max (YYYY-MM-DD) e a lista de valores
+        de cada dimensão de DIMENSOES_FILTRO
+    """
+    if not _tabela_consolidada_existe('vendas_consolidadas_dimensoes'):
+        data_min, data_max = get_date_range()
+        opcoes = {'data_min': data_min, 'data_max': data_max}
+        opcoes.update({dimensao: get_unique_values(dimensao) for dimensao in DIMENSOES_FILTRO})
+        return opcoes
+    
+    md_conn = get_md_connection()
+    
+    sql = f"""
+    SELECT dimensao, valor, data_min, data_max
+    FROM {TABELA_DIMENSOES}
+    WHERE valor IS NOT NULL OR dimensao = 'total'
+    ORDER BY dimensao, valor
+    """
+    
+    result = md_conn.run_query(sql)
+    total = result[result['dimensao'] == 'total']
+    
+    if len(total) > 0 and pd.notna(total.iloc[0]['data_min']):
+        opcoes = {
+            'data_min': total.iloc[0]['data_min'].strftime('%Y-%m-%d'),
+            'data_max': total.iloc[0]['data_max'].strftime('%Y-%m-%d')
+        }
+    else:
+        # Fallback para datas padrão
+        opcoes = {'data_min': '2024-01-01', 'data_max': '2025-12-31'}
+    
+    for dimensao in DIMENSOES_FILTRO:
+        opcoes[dimensao] = result.loc[result['dimensao'] == dimensao, 'valor'].tolist()
+    
+    return opcoes
@@ -0,0 +1,99 @@
+"""
+Execução paralela dos painéis dos dashboards.
+As consultas independentes de cada painel são enviadas a um pool de threads
+(cada uma usa seu próprio cursor do pool de conexões) e entregues na ordem em
+que terminam, para a página preencher cada painel assim que seus dados
+chegam. A latência percebida passa a ser a do painel mais lento, e não a soma.
+"""
+
+import os
+import time
+import logging
+import threading
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterator, Optional
+
+try:
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+except ImportError:
+    # Fora do Streamlit (scripts/testes) as threads não precisam do contexto da sessão
+    def get_script_run_ctx():
+        return None
+
+    def add_script_run_ctx(thread=None, ctx=None):
+        return thread
+
+logger = logging.getLogger(__name__)
+
+TRABALHADORES_PAINEIS = int(os.getenv('DASHBOARD_PAINEIS_THREADS', '6'))
+
+@dataclass
+class ResultadoPainel:
+    """Resultado de um painel: valor ou erro, e o tempo gasto na consulta."""
+    nome: str
+    valor: Any = None
+    erro: Optional[Exception] = None
+    duracao: float = 0.0
+
+class ExecutorPaineis:
+    """
+    Executa as consultas dos painéis em paralelo
+
+    Uso:
+        with ExecutorPaineis() as executor:
+            executor.enviar('kpis', get_kpis, data_inicial, data_final)
+            executor.enviar('metas', get_metas_periodo, data_inicial, data_final)
+            for resultado in executor.concluidos():
+                ...
+    """
+
+    def __init__(self, max_workers: int = TRABALHADORES_PAINEIS):
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='painel')
+        self._futuros = {}
+        # Contexto da sessão Streamlit, repassado às threads (cache, secrets)
+        self._contexto = get_script_run_ctx()
+        self.tempos: Dict[str, float] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def enviar(self, nome: str, funcao: Callable, *args, **kwargs):
+        """Agenda a consulta de um painel"""
+        futuro = self._executor.submit(self._executar, nome, funcao, *args, **kwargs)
+        self._futuros[futuro] = nome
+
+    def concluidos(self) -> Iterator[ResultadoPainel]:
+        """Entrega os resultados na ordem em que as consultas terminam"""
+        for futuro in as_completed(list(self._futuros)):
+            resultado = futuro.result()
+            self.tempos[resultado.nome] = resultado.duracao
+            if resultado.erro is not None:
+                logger.error(f"Painel '{resultado.nome}' falhou em {resultado.duracao:.2f}s: {resultado.erro}")
+            else:
+                logger.info(f"Painel '{resultado.nome}' carregado em {resultado.duracao:.2f}s")
+            yield resultado
+
+    def resumo_tempos(self) -> str:
+        """Tempos por painel, do mais lento ao mais rápido"""
+        return ' · '.join(
+            f"{nome} {duracao:.2f}s"
+            for nome, duracao in sorted(self.tempos.items(), key=lambda item: item[1], reverse=True)
+        )
+
+    def fechar(self):
+        """Aguarda as consultas pendentes e encerra as threads"""
+        self._executor.shutdown(wait=True)
+
+    def _executar(self, nome: str, funcao: Callable, *args, **kwargs) -> ResultadoPainel:
+        if self._contexto is not None:
+            add_script_run_ctx(threading.current_thread(), self._contexto)
+        inicio = time.perf_counter()
+        try:
+            valor = funcao(*args, **kwargs)
+            return ResultadoPainel(nome, valor=valor, duracao=time.perf_counter() - inicio)
+        except Exception as e:
+            return ResultadoPainel(nome, erro=e, duracao=time.perf_counter() - inicio)
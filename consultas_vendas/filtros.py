@@ -0,0 +1,67 @@
+"""
+Construção dos filtros SQL usados pelas consultas dos dashboards.
+"""
+
+from typing import List, Optional
+
+def build_date_filter(start_date: str, end_date: str) -> str:
+    """
+    Constrói filtro de data para consultas SQL.
+    
+    Args:
+        start_date: Data inicial (YYYY-MM-DD)
+        end_date: Data final (YYYY-MM-DD)
+        
+    Returns:
+        String com filtro SQL
+    """
+    return f"contractDate BETWEEN '{start_date}' AND '{end_date}'"
+
+def build_optional_filters(midia: Optional[List[str]] = None, 
+                          tipovenda: Optional[List[str]] = None,
+                          empreendimento: Optional[str] = None,
+                          corretor: Optional[List[str]] = None,
+                          imobiliaria: Optional[List[str]] = None) -> tuple:
+    """
+    Constrói filtros opcionais para midia, tipovenda, empreendimento, corretor e imobiliaria.
+    
+    Args:
+        midia: Lista de mídias para filtrar
+        tipovenda: Lista de tipos de venda para filtrar
+        empreendimento: Nome do empreendimento para filtrar
+        corretor: Lista de corretores para filtrar
+        imobiliaria: Lista de imobiliárias para filtrar
+        
+    Returns:
+        Tuple com (filtro_sql, parametros)
+    """
+    filters = []
+    params = []
+    
+    if midia and len(midia) > 0:
+        placeholders = ','.join(['?' for _ in midia])
+        filters.append(f"midia IN ({placeholders})")
+        params.extend(midia)
+    
+    if tipovenda and len(tipovenda) > 0:
+        placeholders = ','.join(['?' for _ in tipovenda])
+        filters.append(f"tipovenda IN ({placeholders})")
+        params.extend(tipovenda)
+    
+    if empreendimento and empreendimento != "Todos":
+        filters.append("nome_empreendimento = ?")
+        params.append(empreendimento)
+    
+    if corretor and len(corretor) > 0:
+        placeholders = ','.join(['?' for _ in corretor])
+        filters.append(f"COALESCE(NULLIF(TRIM(corretor), ''), '—') IN ({placeholders})")
+        params.extend(corretor)
+    
+    if imobiliaria and len(imobiliaria) > 0:
+        placeholders = ','.join(['?' for _ in imobiliaria])
+        filters.append(f"COALESCE(NULLIF(TRIM(imobiliaria), ''), '—') IN ({placeholders})")
+        params.extend(imobiliaria)
+    
+    filter_sql = " AND ".join(filters) if filters else ""
+    return filter_sql, params
+
@@ -0,0 +1,31 @@
+"""
+Etapas do funil de leads.
+Regra única do funil: as consultas da página de Leads geram o SQL a partir
+deste mapa (consultas_vendas.leads.sql_etapa_funil).
+
+- Situação atual normalizada (strip + lower) -> etapa pelo MAPA_FUNIL
+- "descartado" usa a etapa da situação anterior
+- Situação vazia ou fora do mapa -> "Leads"
+"""
+
+# Situação (normalizada) -> etapa do funil
+MAPA_FUNIL = {
+    "aguardando atendimento": "Leads",
+    "qualificação": "Leads",
+    "descoberta": "Leads",
+    "em atendimento": "Em atendimento",
+    "atendimento futuro": "Em atendimento",
+    "visita agendada": "Em atendimento",
+    "visita realizada": "Visita realizada",
+    "atendimento pos visita": "Visita realizada",
+    "atendimento pós visita": "Visita realizada",
+    "pre cadastro": "Com reserva",
+    "pre cadastro pos visita": "Com reserva",
+    "em pré-cadastro": "Com reserva",
+    "com reserva": "Com reserva",
+    "venda realizada": "Venda realizada"
+}
+
+ETAPAS_FUNIL = ["Leads", "Em atendimento", "Visita realizada", "Com reserva", "Venda realizada"]
+ETAPA_PADRAO = "Leads"
+SITUACAO_DESCARTADO = "descartado"
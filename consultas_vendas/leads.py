@@ -0,0 +1,346 @@
+"""
+Consultas da página de Leads (funil de leads).
+Filtros, exclusão de corretores e classificação das etapas do funil rodam em
+SQL no MotherDuck, pela conexão compartilhada (pool de cursores e cache
+versionado). A página recebe apenas as contagens agregadas do funil e a
+página de linhas exibida, em vez da tabela cv_leads inteira.
+"""
+
+from dataclasses import dataclass
+from datetime import date
+from typing import List, Optional, Dict, Any, Tuple
+
+import duckdb
+import pandas as pd
+
+from consultas_vendas.conexao import get_md_connection
+from consultas_vendas.funil import MAPA_FUNIL, ETAPAS_FUNIL, ETAPA_PADRAO, SITUACAO_DESCARTADO
+
+TABELA_LEADS = 'reservas.main.cv_leads'
+
+LEADS_POR_PAGINA = 100
+
+# Corretores removidos completamente dos dados da página
+CORRETORES_REMOVIDOS = [
+    "ODAIR DIAS DOS SANTOS",
+    "Sabrina M. da Silva dos Santos",
+    "Alex Anderson Fritzen da Silva",
+    "DAIANA PINHEIRO FÜHR",
+    "GRAZIELE GODOI",
+    "ROSANGELA CRISTINA BEVILAQUA",
+    "Alan Rafael Giombelli",
+    "Marcos Roberto ferla",
+    "JULIANO RAFAEL SIMON",
+    "HYORRANA LOPES",
+    "Sabrina maria da silva dos santos",
+    "VANESSA CARDOSO NAZARIN"
+]
+
+ETAPAS_FUNIL_ATIVOS = ["Leads", "Em atendimento", "Visita realizada", "Com reserva"]
+
+# Situações fora dos leads ativos (convertidos ou encerrados)
+SITUACOES_INATIVAS = ['descartado', 'em pré-cadastro', 'venda realizada', 'vencido']
+
+COLUNAS_STATUS = {
+    'em_atendimento': 'status_em_atendimento',
+    'visita_realizada': 'status_visita_realizada',
+    'com_reserva': 'status_reserva',
+    'venda_realizada': 'status_venda_realizada',
+}
+
+@dataclass
+class FiltrosLeads:
+    """Filtros da barra lateral aplicados aos funis de leads."""
+    data_inicio: date
+    data_fim: date
+    empreendimento: Optional[str] = None
+    midias: Optional[List[str]] = None
+    corretores: Optional[List[str]] = None
+
+@dataclass
+class ResumoFunil:
+    """Contagens do funil e distribuições por corretor e mídia."""
+    total: int
+    etapas: Dict[str, int]
+    por_corretor: pd.DataFrame
+    por_midia: pd.DataFrame
+    cancelamentos: pd.DataFrame
+
+def _literal(valor: str) -> str:
+    return "'" + valor.replace("'", "''") + "'"
+
+def _normalizar_situacao(coluna: str) -> str:
+    # Mesma normalização do str(x).strip().lower() aplicado antes em pandas
+    return f"LOWER(REGEXP_REPLACE({coluna}, '^\\s+|\\s+$', '', 'g'))"
+
+def _mapear_etapa(chave: str) -> str:
+    casos = '\n'.join(f"            WHEN {_literal(situacao)} THEN {_literal(etapa)}" for situacao, etapa in MAPA_FUNIL.items())
+    return f"""CASE {chave}
+{casos}
+            ELSE {_literal(ETAPA_PADRAO)}
+        END"""
+
+def sql_etapa_funil(situacao: str = 'Situacao', situacao_anterior: str = 'nome_situacao_anterior_lead') -> str:
+    """Expressão SQL da etapa do funil; "descartado" usa a etapa da situação anterior."""
+    atual = _normalizar_situacao(situacao)
+    anterior = _normalizar_situacao(situacao_anterior)
+    return f"""CASE WHEN {atual} = {_literal(SITUACAO_DESCARTADO)}
+        THEN {_mapear_etapa(anterior)}
+        ELSE {_mapear_etapa(atual)}
+    END"""
+
+def sql_leads_base() -> str:
+    """Leads padronizados, já sem os corretores removidos e com a etapa do funil."""
+    return f"""
+    SELECT
+        Idlead AS idlead,
+        Data_cad AS data_cad,
+        data_consolidada,
+        Referencia_data AS referencia_data,
+        Situacao AS situacao_nome,
+        Imobiliaria AS imobiliaria,
+        COALESCE(NULLIF(TRIM(Corretor_consolidado), ''), '—') AS corretor_consolidado,
+        COALESCE(NULLIF(TRIM(Midia_consolidada), ''), '—') AS midia_consolidada,
+        nome_situacao_anterior_lead,
+        gestor,
+        empreendimento_ultimo,
+        status_em_atendimento,
+        status_visita_realizada,
+        status_reserva,
+        status_venda_realizada,
+        motivo_cancelamento_consolidada,
+        {sql_etapa_funil()} AS funil_etapa
+    FROM {TABELA_LEADS}
+    WHERE COALESCE(NULLIF(TRIM(Corretor_consolidado), ''), '—') NOT IN ({', '.join(_literal(c) for c in CORRETORES_REMOVIDOS)})
+    """
+
+def build_filtros_leads(filtros: FiltrosLeads) -> Tuple[str, List]:
+    """
+    Constrói o filtro SQL dos leads (período por data_consolidada, empreendimento, mídias e corretores).
+
+    Returns:
+        Tuple com (filtro_sql, parametros)
+    """
+    condicoes = ["CAST(data_consolidada AS DATE) BETWEEN ? AND ?"]
+    params: List[Any] = [filtros.data_inicio, filtros.data_fim]
+
+    if filtros.empreendimento and filtros.empreendimento != "Todos":
+        condicoes.append("empreendimento_ultimo = ?")
+        params.append(filtros.empreendimento)
+
+    if filtros.midias:
+        placeholders = ','.join(['?' for _ in filtros.midias])
+        condicoes.append(f"midia_consolidada IN ({placeholders})")
+        params.extend(filtros.midias)
+
+    if filtros.corretores:
+        placeholders = ','.join(['?' for _ in filtros.corretores])
+        condicoes.append(f"corretor_consolidado IN ({placeholders})")
+        params.extend(filtros.corretores)
+
+    return " AND ".join(condicoes), params
+
+def get_opcoes_filtros_leads(data_inicio: date, data_fim: date) -> Dict[str, List[str]]:
+    """
+    Opções da barra lateral numa única consulta.
+
+    Returns:
+        Dicionário com empreendimento e imobiliaria (todos os leads) e
+        midia e corretor (leads do período)
+    """
+    md_conn = get_md_connection()
+
+    sql = f"""
+    WITH leads AS ({sql_leads_base()}),
+    periodo AS (
+        SELECT * FROM leads WHERE CAST(data_consolidada AS DATE) BETWEEN ? AND ?
+    )
+    SELECT DISTINCT 'empreendimento' AS dimensao, empreendimento_ultimo AS valor FROM leads WHERE empreendimento_ultimo IS NOT NULL
+    UNION ALL
+    SELECT DISTINCT 'imobiliaria', imobiliaria FROM leads WHERE imobiliaria IS NOT NULL
+    UNION ALL
+    SELECT DISTINCT 'midia', midia_consolidada FROM periodo
+    UNION ALL
+    SELECT DISTINCT 'corretor', corretor_consolidado FROM periodo
+    """
+
+    result = md_conn.run_query(sql, [data_inicio, data_fim])
+    return {
+        dimensao: sorted(result.loc[result['dimensao'] == dimensao, 'valor'].tolist())
+        for dimensao in ('empreendimento', 'imobiliaria', 'midia', 'corretor')
+    }
+
+def get_resumo_funil(filtros: FiltrosLeads) -> ResumoFunil:
+    """
+    Contagens por etapa do funil e distribuições por corretor, mídia e motivo de cancelamento.
+
+    Uma consulta traz os leads filtrados agregados por corretor, mídia, etapa e
+    motivo de cancelamento; as distribuições são calculadas localmente.
+    """
+    md_conn = get_md_connection()
+
+    filtro_sql, params = build_filtros_leads(filtros)
+    sql = f"""
+    WITH leads AS ({sql_leads_base()})
+    SELECT
+        corretor_consolidado,
+        midia_consolidada,
+        funil_etapa,
+        NULLIF(motivo_cancelamento_consolidada, '') AS motivo_cancelamento,
+        COUNT(idlead) AS leads
+    FROM leads
+    WHERE {filtro_sql}
+    GROUP BY ALL
+    """
+    agregado = md_conn.run_query(sql, params)
+
+    local = duckdb.connect()
+    try:
+        local.register('agregado', agregado)
+
+        etapas = dict(local.execute("SELECT funil_etapa, SUM(leads)::BIGINT FROM agregado GROUP BY 1").fetchall())
+
+        por_corretor = local.execute("""
+            SELECT
+                corretor_consolidado AS corretor,
+                SUM(leads)::BIGINT AS "Leads",
+                SUM(leads) FILTER (WHERE funil_etapa = 'Venda realizada')::BIGINT AS "Venda realizada",
+                SUM(leads) FILTER (WHERE motivo_cancelamento IS NOT NULL)::BIGINT AS "Total Cancelamentos"
+            FROM agregado
+            GROUP BY 1
+            ORDER BY "Leads" DESC
+        """).df()
+
+        por_midia = local.execute("""
+            SELECT
+                midia_consolidada AS "Mídia",
+                SUM(leads)::BIGINT AS "Total Leads",
+                SUM(leads) FILTER (WHERE funil_etapa = 'Venda realizada')::BIGINT AS "Venda realizada"
+            FROM agregado
+            GROUP BY 1
+        """).df()
+
+        cancelamentos = local.execute("""
+            SELECT
+                corretor_consolidado AS corretor,
+                motivo_cancelamento AS motivo,
+                SUM(leads)::BIGINT AS quantidade
+            FROM agregado
+            WHERE motivo_cancelamento IS NOT NULL
+            GROUP BY 1, 2
+        """).df()
+    finally:
+        local.close()
+
+    for tabela, colunas in ((por_corretor, ["Venda realizada", "Total Cancelamentos"]), (por_midia, ["Venda realizada"])):
+        tabela[colunas] = tabela[colunas].fillna(0).astype('int64')
+
+    return ResumoFunil(
+        total=int(agregado['leads'].sum()) if not agregado.empty else 0,
+        etapas={etapa: int(etapas.get(etapa, 0)) for etapa in ETAPAS_FUNIL},
+        por_corretor=por_corretor,
+        por_midia=por_midia,
+        cancelamentos=cancelamentos
+    )
+
+def get_contagens_status(filtros: FiltrosLeads) -> Dict[str, int]:
+    """Total de leads e quantos estão com cada coluna de status = 'sim' (funil novo)."""
+    md_conn = get_md_connection()
+
+    filtro_sql, params = build_filtros_leads(filtros)
+    contagens = ',\n        '.join(
+        f"COUNT(*) FILTER (WHERE LOWER({coluna}) = 'sim') AS {nome}" for nome, coluna in COLUNAS_STATUS.items()
+    )
+    sql = f"""
+    WITH leads AS ({sql_leads_base()})
+    SELECT
+        COUNT(*) AS total,
+        {contagens}
+    FROM leads
+    WHERE {filtro_sql}
+    """
+
+    linha = md_conn.run_query(sql, params).iloc[0]
+    return {coluna: int(linha[coluna]) for coluna in ['total', *COLUNAS_STATUS]}
+
+def get_leads_pagina(filtros: FiltrosLeads, pagina: int = 1, por_pagina: int = LEADS_POR_PAGINA) -> pd.DataFrame:
+    """Página de leads detalhados, dos mais recentes para os mais antigos."""
+    md_conn = get_md_connection()
+
+    filtro_sql, params = build_filtros_leads(filtros)
+    sql = f"""
+    WITH leads AS ({sql_leads_base()})
+    SELECT idlead, situacao_nome, nome_situacao_anterior_lead, funil_etapa, gestor,
+           imobiliaria, empreendimento_ultimo, data_consolidada
+    FROM leads
+    WHERE {filtro_sql}
+    ORDER BY data_consolidada DESC, idlead
+    LIMIT ? OFFSET ?
+    """
+
+    return md_conn.run_query(sql, [*params, por_pagina, (max(pagina, 1) - 1) * por_pagina])
+
+def _filtros_ativos(imobiliaria: Optional[str], empreendimento: Optional[str]) -> Tuple[str, List]:
+    # Situação vazia continua entre os ativos
+    condicoes = [f"COALESCE({_normalizar_situacao('Situacao')}, '') NOT IN ({', '.join(_literal(s) for s in SITUACOES_INATIVAS)})"]
+    params: List[Any] = []
+
+    if imobiliaria and imobiliaria != "Todas":
+        condicoes.append("Imobiliaria = ?")
+        params.append(imobiliaria)
+
+    if empreendimento and empreendimento != "Todos":
+        condicoes.append("empreendimento_ultimo = ?")
+        params.append(empreendimento)
+
+    return " AND ".join(condicoes), params
+
+def get_funil_ativos(imobiliaria: Optional[str] = None, empreendimento: Optional[str] = None) -> Dict[str, int]:
+    """
+    Foto atual dos leads ativos (sem filtro de data nem exclusão de corretores).
+
+    Returns:
+        Dicionário com o total de leads ativos e a contagem de cada etapa de ETAPAS_FUNIL_ATIVOS
+    """
+    md_conn = get_md_connection()
+
+    filtro_sql, params = _filtros_ativos(imobiliaria, empreendimento)
+    sql = f"""
+    SELECT {sql_etapa_funil()} AS funil_etapa, COUNT(*) AS leads
+    FROM {TABELA_LEADS}
+    WHERE {filtro_sql}
+    GROUP BY 1
+    """
+
+    result = md_conn.run_query(sql, params)
+    etapas = dict(zip(result['funil_etapa'], result['leads']))
+    contagens = {'total': int(result['leads'].sum()) if not result.empty else 0}
+    contagens.update({etapa: int(etapas.get(etapa, 0)) for etapa in ETAPAS_FUNIL_ATIVOS})
+    return contagens
+
+def get_leads_ativos_pagina(imobiliaria: Optional[str] = None, empreendimento: Optional[str] = None,
+                            pagina: int = 1, por_pagina: int = LEADS_POR_PAGINA) -> pd.DataFrame:
+    """Página de leads ativos detalhados, com o tempo ativo (dias desde a data consolidada)."""
+    md_conn = get_md_connection()
+
+    filtro_sql, params = _filtros_ativos(imobiliaria, empreendimento)
+    sql = f"""
+    SELECT Idlead AS idlead,
+           Situacao AS situacao_nome,
+           nome_situacao_anterior_lead,
+           {sql_etapa_funil()} AS funil_etapa,
+           gestor,
+           Imobiliaria AS imobiliaria,
+           empreendimento_ultimo,
+           data_consolidada
+    FROM {TABELA_LEADS}
+    WHERE {filtro_sql}
+    ORDER BY data_consolidada DESC, Idlead
+    LIMIT ? OFFSET ?
+    """
+
+    df = md_conn.run_query(sql, [*params, por_pagina, (max(pagina, 1) - 1) * por_pagina]).copy()
+    df["data_consolidada"] = pd.to_datetime(df["data_consolidada"], errors="coerce")
+    dias_ativo = (pd.Timestamp.now() - df["data_consolidada"]).dt.days
+    df["tempo_ativo"] = dias_ativo.map(lambda d: f"{int(d)} dias" if pd.notna(d) else "-")
+    return df
@@ -0,0 +1,138 @@
+"""
+Consulta em lote dos painéis do dashboard de vendas.
+Uma única ida ao MotherDuck traz o conjunto filtrado (no grão dia x
+empreendimento x corretor x imobiliária, lido do cubo quando disponível) e as
+linhas de VPL; KPIs, evolução mensal, rankings, análises e origem House x
+Externa são calculados localmente num DuckDB em memória.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Dict, Any
+
+import duckdb
+import pandas as pd
+
+from consultas_vendas.conexao import get_md_connection
+from consultas_vendas.filtros import build_optional_filters
+from consultas_vendas.consultas import (
+    TABELA_VENDAS, build_base_agregavel, kpis_para_dict,
+    sql_timeline, sql_kpis, sql_top_empreendimentos,
+    sql_analytics_corretor, sql_analytics_imobiliaria
+)
+
+DIMENSOES_PAINEL = ['contractDate', 'nome_empreendimento', 'corretor', 'imobiliaria']
+
+ORIGEM_INTERNA = 'Venda Interna (Prati)'
+ORIGEM_EXTERNA = 'Venda Externa (Imobiliárias)'
+
+@dataclass
+class PainelVendas:
+    """Dados de todos os painéis do dashboard de vendas para um conjunto de filtros."""
+    kpis: Dict[str, Any]
+    timeline: pd.DataFrame
+    top_empreendimentos: pd.DataFrame
+    analytics_corretor: pd.DataFrame
+    analytics_imobiliaria: pd.DataFrame
+    vendas_origem: pd.DataFrame
+    vpl: pd.DataFrame
+
+def sql_painel_vendas(start_date: str, end_date: str, optional_filter: str = "") -> str:
+    """
+    SQL único do painel: conjunto agregado filtrado ('painel') + linhas de VPL ('vpl').
+
+    O VPL mantém a regra dos quadros de VPL: período por data_venda, sem os
+    filtros opcionais, apenas vendas com VPL de reserva e de tabela preenchidos.
+    Parâmetros: os de build_optional_filters seguidos de start_date e end_date.
+    """
+    dimensoes = ', '.join(DIMENSOES_PAINEL)
+    return f"""
+    WITH base AS ({build_base_agregavel(DIMENSOES_PAINEL, start_date, end_date, optional_filter)}),
+    painel AS (
+        SELECT
+            'painel' AS conjunto,
+            {dimensoes},
+            SUM(qtd_vendas) AS qtd_vendas,
+            SUM(soma_valor) AS soma_valor,
+            MIN(menor_valor) AS menor_valor,
+            MAX(maior_valor) AS maior_valor
+        FROM base
+        GROUP BY {dimensoes}
+    ),
+    vpl AS (
+        SELECT
+            'vpl' AS conjunto,
+            corretor,
+            imobiliaria,
+            TRY_CAST(vpl_reserva AS DOUBLE) AS vpl_reserva,
+            TRY_CAST(vpl_tabela AS DOUBLE) AS vpl_tabela
+        FROM {TABELA_VENDAS}
+        WHERE data_venda >= ? AND data_venda <= ?
+          AND TRY_CAST(vpl_reserva AS DOUBLE) <> 0
+          AND TRY_CAST(vpl_tabela AS DOUBLE) <> 0
+    )
+    SELECT * FROM painel
+    UNION ALL BY NAME
+    SELECT * FROM vpl
+    """
+
+def get_painel_vendas(start_date: str, end_date: str,
+                      midia: Optional[List[str]] = None,
+                      tipovenda: Optional[List[str]] = None,
+                      empreendimento: Optional[str] = None,
+                      corretor: Optional[List[str]] = None,
+                      imobiliaria: Optional[List[str]] = None,
+                      limit_top: int = 10) -> PainelVendas:
+    """
+    Obtém os dados de todos os painéis com uma única consulta ao MotherDuck.
+
+    Args:
+        start_date: Data inicial
+        end_date: Data final
+        midia: Lista de mídias (opcional)
+        tipovenda: Lista de tipos de venda (opcional)
+        empreendimento: Nome do empreendimento (opcional)
+        corretor: Lista de corretores (opcional)
+        imobiliaria: Lista de imobiliárias (opcional)
+        limit_top: Limite do ranking de empreendimentos
+
+    Returns:
+        PainelVendas com os resultados de cada painel
+    """
+    md_conn = get_md_connection()
+
+    optional_filter, params = build_optional_filters(midia, tipovenda, empreendimento, corretor, imobiliaria)
+    resultado = md_conn.run_query(
+        sql_painel_vendas(start_date, end_date, optional_filter),
+        [*params, start_date, end_date]
+    )
+
+    conjunto_painel = resultado[resultado['conjunto'] == 'painel'][['conjunto', *DIMENSOES_PAINEL, 'qtd_vendas', 'soma_valor', 'menor_valor', 'maior_valor']]
+    conjunto_vpl = resultado[resultado['conjunto'] == 'vpl'][['corretor', 'imobiliaria', 'vpl_reserva', 'vpl_tabela']]
+
+    # Agregações locais: o conjunto já está filtrado e reduzido ao grão do painel
+    local = duckdb.connect()
+    try:
+        local.register('painel', conjunto_painel)
+        base = "SELECT * FROM painel"
+
+        return PainelVendas(
+            kpis=kpis_para_dict(local.execute(sql_kpis(base)).df()),
+            timeline=local.execute(sql_timeline(base)).df(),
+            top_empreendimentos=local.execute(sql_top_empreendimentos(base, limit_top)).df(),
+            analytics_corretor=local.execute(sql_analytics_corretor(base)).df(),
+            analytics_imobiliaria=local.execute(sql_analytics_imobiliaria(base)).df(),
+            vendas_origem=local.execute(f"""
+                SELECT
+                    nome_empreendimento,
+                    CASE WHEN UPPER(imobiliaria) LIKE '%PRATI%' THEN '{ORIGEM_INTERNA}'
+                         ELSE '{ORIGEM_EXTERNA}' END AS tipo_venda_origem,
+                    SUM(qtd_vendas)::BIGINT AS qtd_vendas,
+                    SUM(soma_valor) AS total_valor
+                FROM painel
+                GROUP BY ALL
+                ORDER BY nome_empreendimento, tipo_venda_origem
+            """).df(),
+            vpl=conjunto_vpl.reset_index(drop=True)
+        )
+    finally:
+        local.close()
@@ -0,0 +1,159 @@
+"""
+Pool de cursores DuckDB para as sessões Streamlit.
+Cada thread retira um cursor exclusivo (conexão própria sobre a mesma base
+MotherDuck), então consultas de usuários diferentes rodam em paralelo em vez
+de disputar uma única conexão. O pool limita o número de cursores, verifica
+cursores ociosos antes de reutilizá-los e descarta todos ao reconectar.
+"""
+
+import os
+import time
+import queue
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+import duckdb
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_POOL = int(os.getenv('DASHBOARD_POOL_TAMANHO', '8'))
+# Espera máxima (s) por um cursor livre quando o pool está cheio
+ESPERA_POOL = float(os.getenv('DASHBOARD_POOL_ESPERA', '60'))
+# Cursores ociosos há mais que isso (s) são testados com SELECT 1 antes do uso
+VERIFICAR_APOS = float(os.getenv('DASHBOARD_POOL_VERIFICAR_APOS', '300'))
+
+class PoolEsgotado(Exception):
+    """Nenhum cursor livre dentro do tempo de espera"""
+
+def erro_de_conexao(erro: Exception) -> bool:
+    """Indica se o erro é de conexão/autenticação (e não da consulta em si)"""
+    if isinstance(erro, (duckdb.ConnectionException, duckdb.IOException)):
+        return True
+    mensagem = str(erro).lower()
+    return any(termo in mensagem for termo in ('token', 'unauthenticated', 'unauthorized', 'connection'))
+
+class PoolCursores:
+    """
+    Pool de cursores sobre uma conexão base criada sob demanda
+
+    Uso:
+        pool = PoolCursores(lambda: duckdb.connect('md:'))
+        with pool.cursor() as cur:
+            cur.execute('SELECT 1').fetchall()
+    """
+
+    def __init__(self, conectar: Callable[[], duckdb.DuckDBPyConnection], tamanho: int = TAMANHO_POOL):
+        self._conectar = conectar
+        self._tamanho = max(1, tamanho)
+        self._lock = threading.Lock()
+        self._livres: queue.LifoQueue = queue.LifoQueue()
+        self._criados = 0
+        self._geracao = 0
+        self._base: Optional[duckdb.DuckDBPyConnection] = None
+
+    def conexao_base(self) -> duckdb.DuckDBPyConnection:
+        """Conexão base (abre na primeira chamada e após reconectar)"""
+        with self._lock:
+            if self._base is None:
+                self._base = self._conectar()
+            return self._base
+
+    @contextmanager
+    def cursor(self):
+        """Retira um cursor exclusivo para a thread atual e devolve ao final"""
+        cursor, geracao = self._retirar()
+        try:
+            yield cursor
+        except Exception as e:
+            # Após queda ou token expirado o cursor não volta ao pool
+            if erro_de_conexao(e):
+                self._descartar(cursor)
+            else:
+                self._devolver(cursor, geracao)
+            raise
+        self._devolver(cursor, geracao)
+
+    def reconectar(self):
+        """Descarta a conexão base e todos os cursores (ex.: token expirado)"""
+        with self._lock:
+            self._geracao += 1
+            base, self._base = self._base, None
+        self._esvaziar()
+        if base is not None:
+            try:
+                base.close()
+            except Exception:
+                pass
+        logger.info("Pool de conexões MotherDuck reiniciado")
+
+    def fechar(self):
+        """Fecha a conexão base e os cursores livres"""
+        self.reconectar()
+
+    def _retirar(self):
+        limite = time.monotonic() + ESPERA_POOL
+        while True:
+            try:
+                cursor, geracao, ultimo_uso = self._livres.get_nowait()
+            except queue.Empty:
+                novo = self._criar()
+                if novo is not None:
+                    return novo
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    raise PoolEsgotado(f"Nenhuma conexão livre no pool ({self._tamanho}) em {ESPERA_POOL:.0f}s")
+                try:
+                    cursor, geracao, ultimo_uso = self._livres.get(timeout=restante)
+                except queue.Empty:
+                    continue
+
+            if geracao == self._geracao and self._saudavel(cursor, ultimo_uso):
+                return cursor, geracao
+            self._descartar(cursor)
+
+    def _criar(self):
+        with self._lock:
+            if self._criados >= self._tamanho:
+                return None
+            self._criados += 1
+            geracao = self._geracao
+        try:
+            return self.conexao_base().cursor(), geracao
+        except Exception:
+            with self._lock:
+                self._criados -= 1
+            raise
+
+    def _saudavel(self, cursor, ultimo_uso: float) -> bool:
+        if time.monotonic() - ultimo_uso < VERIFICAR_APOS:
+            return True
+        try:
+            cursor.execute("SELECT 1").fetchall()
+            return True
+        except Exception as e:
+            logger.warning(f"Cursor ocioso descartado: {e}")
+            return False
+
+    def _devolver(self, cursor, geracao: int):
+        if geracao != self._geracao:
+            self._descartar(cursor)
+            return
+        self._livres.put((cursor, geracao, time.monotonic()))
+
+    def _descartar(self, cursor):
+        with self._lock:
+            self._criados -= 1
+        try:
+            cursor.close()
+        except Exception:
+            pass
+
+    def _esvaziar(self):
+        while True:
+            try:
+                cursor, _, _ = self._livres.get_nowait()
+            except queue.Empty:
+                return
+            self._descartar(cursor)
@@ -1,9 +1,7 @@
 import streamlit as st
-import duckdb
-import pandas as pd
 import plotly.graph_objects as go
 from datetime import datetime
-import os
+import math
 import sys
 from pathlib import Path
 
@@ -24,6 +22,18 @@ except ImportError as e:
     st.stop()
 
 from utils import display_navigation
+from utils.md_conn import (
+    FiltrosLeads,
+    ETAPAS_FUNIL,
+    ETAPAS_FUNIL_ATIVOS,
+    LEADS_POR_PAGINA,
+    get_opcoes_filtros_leads,
+    get_resumo_funil,
+    get_contagens_status,
+    get_leads_pagina,
+    get_funil_ativos,
+    get_leads_ativos_pagina
+)
 
 # Display navigation bar (includes logo)
 display_navigation()
@@ -35,72 +45,6 @@ st.set_page_config(page_title="Leads - Funil de Vendas", page_icon="📊", layou
 
 st.title("📊 Funil de Leads (Versão Antiga)")
 
-# Carregar token do MotherDuck de forma segura
-MOTHERDUCK_TOKEN = st.secrets.get("MOTHERDUCK_TOKEN", os.getenv("MOTHERDUCK_TOKEN", ""))
-if not MOTHERDUCK_TOKEN:
-    st.error("Token do MotherDuck não configurado. Verifique as configurações de secrets.")
-    st.stop()
-
-# Load all data with broad date range for filtering
-def get_all_leads_duckdb():
-    con = duckdb.connect(f"md:reservas?token={MOTHERDUCK_TOKEN}")
-    query = """
-    SELECT 
-        Idlead as idlead,
-        Data_cad as data_cad,
-        data_consolidada,
-        Referencia_data as referencia_data,
-        Situacao as situacao_nome,
-        Imobiliaria as imobiliaria,
-        COALESCE(NULLIF(TRIM(Corretor_consolidado), ''), '—') AS corretor_consolidado,
-        COALESCE(NULLIF(TRIM(Midia_consolidada), ''), '—') AS midia_consolidada,
-        nome_situacao_anterior_lead,
-        gestor,
-        empreendimento_ultimo,
-        status_em_atendimento,
-        status_visita_realizada,
-        status_reserva,
-        status_venda_realizada,
-        motivo_cancelamento_consolidada
-    FROM cv_leads
-    ORDER BY data_consolidada DESC
-    """
-    df = con.execute(query).df()
-    con.close()
-    return df
-
-@st.cache_data
-def load_data():
-    return get_all_leads_duckdb()
-
-leads_df = load_data()
-
-if leads_df.empty:
-    st.warning("Nenhum dado retornado do Mother Duck.")
-    st.stop()
-
-# =============================================================================
-# REMOÇÃO DE CORRETORES ESPECÍFICOS
-# =============================================================================
-# Lista de corretores a serem removidos completamente dos dados
-corretores_removidos = [
-    "ODAIR DIAS DOS SANTOS",
-    "Sabrina M. da Silva dos Santos",
-    "Alex Anderson Fritzen da Silva",
-    "DAIANA PINHEIRO FÜHR",
-    "GRAZIELE GODOI",
-    "ROSANGELA CRISTINA BEVILAQUA",
-    "Alan Rafael Giombelli",
-    "Marcos Roberto ferla",
-    "JULIANO RAFAEL SIMON",
-    "HYORRANA LOPES",
-    "Sabrina maria da silva dos santos",
-    "VANESSA CARDOSO NAZARIN"
-]
-
-# Remover leads desses corretores do conjunto de dados
-leads_df = leads_df[~leads_df['corretor_consolidado'].isin(corretores_removidos)]
-
 # Sidebar for filters
 st.sidebar.header("Filtros")
 
@@ -108,34 +52,23 @@ st.sidebar.header("Filtros")
 data_inicio = st.sidebar.date_input("Data Inicial", value=datetime(2022, 4, 13).date())
 data_fim = st.sidebar.date_input("Data Final", value=datetime.now().date())
 
+# Opções dos filtros (já sem os corretores removidos, ver CORRETORES_REMOVIDOS)
+opcoes_filtros = get_opcoes_filtros_leads(data_inicio, data_fim)
+
+if not any(opcoes_filtros.values()):
+    st.warning("Nenhum dado retornado do Mother Duck.")
+    st.stop()
+
 # Empreendimento filter
-empreendimentos = sorted(leads_df['empreendimento_ultimo'].dropna().unique())
+empreendimentos = opcoes_filtros['empreendimento']
 selected_empreendimento = st.sidebar.selectbox("Empreendimento de Interesse", ["Todos"] + list(empreendimentos))
 
-# Mídia filter (baseado em midia_consolidada)
-if 'midia_consolidada' in leads_df.columns:
-    # Primeiro aplicar filtros de data para obter mídias disponíveis no período
-    leads_periodo = leads_df[
-        (leads_df['data_consolidada'].dt.date >= data_inicio) &
-        (leads_df['data_consolidada'].dt.date <= data_fim)
-    ]
-    midias = sorted(leads_periodo.get('midia_consolidada', pd.Series(dtype=str)).dropna().unique())
-else:
-    midias = []
+# Mídia filter (baseado em midia_consolidada) - apenas mídias com leads no período
+midias = opcoes_filtros['midia']
 selected_midias = st.sidebar.multiselect("Mídia", midias, default=[], help="Baseada na última movimentação de mídia registrada")
 
 # Corretor filter (opcional, múltipla escolha) - apenas corretores com leads no período
-if 'corretor_consolidado' in leads_df.columns:
-    # Primeiro aplicar filtros de data para obter corretores disponíveis no período
-    leads_periodo = leads_df[
-        (leads_df['data_consolidada'].dt.date >= data_inicio) &
-        (leads_df['data_consolidada'].dt.date <= data_fim)
-    ]
-    corretores = sorted(leads_periodo.get('corretor_consolidado', pd.Series(dtype=str)).dropna().unique())
-    
-    # Corretores já foram removidos dos dados, então não precisamos filtrar aqui
-else:
-    corretores = []
+corretores = opcoes_filtros['corretor']
 selected_corretores = st.sidebar.multiselect("Corretor", corretores, default=[], help="Consolida corretor + corretor_ultimo")
 
 # =============================================================================
@@ -161,75 +94,17 @@ data_fim_novo = st.sidebar.date_input(
     help="Data final (máximo: hoje)"
 )
 
-# Apply filters using data_consolidada
-filtered_df = leads_df[
-    (leads_df['data_consolidada'].dt.date >= data_inicio) &
-    (leads_df['data_consolidada'].dt.date <= data_fim)
-].copy()
-
-if selected_empreendimento != "Todos":
-    filtered_df = filtered_df[filtered_df['empreendimento_ultimo'] == selected_empreendimento]
-
-# Aplicar filtro de mídia, quando houver seleção
-if 'midia_consolidada' in filtered_df.columns and len(selected_midias) > 0:
-    filtered_df = filtered_df[filtered_df['midia_consolidada'].isin(selected_midias)]
-
-# Aplicar filtro de corretor, quando houver seleção
-if 'corretor_consolidado' in filtered_df.columns and len(selected_corretores) > 0:
-    filtered_df = filtered_df[filtered_df['corretor_consolidado'].isin(selected_corretores)]
-
-# Mapeamento do funil baseado na tabela "de" (situação atual) -> "para" (etapa), com especial para "descartado" usando anterior
-mapa_funil = {
-    "aguardando atendimento": "Leads",
-    "qualificação": "Leads",
-    "descoberta": "Leads",
-    "em atendimento": "Em atendimento",
-    "atendimento futuro": "Em atendimento",
-    "visita agendada": "Em atendimento",
-    "visita realizada": "Visita realizada",
-    "atendimento pos visita": "Visita realizada",
-    "atendimento pós visita": "Visita realizada",
-    "pre cadastro": "Com reserva",
-    "pre cadastro pos visita": "Com reserva",
-    "em pré-cadastro": "Com reserva",
-    "com reserva": "Com reserva",
-    "venda realizada": "Venda realizada"
-}
-
-def get_funil_etapa(prev_situacao, curr_situacao):
-    # Normalizar entradas
-    if pd.isna(curr_situacao):
-        curr_key = None
-    else:
-        curr_key = str(curr_situacao).strip().lower()
-    
-    # Caso especial: "descartado" sempre usa etapa da situação anterior
-    if curr_key == "descartado":
-        if pd.isna(prev_situacao):
-            return "Leads"
-        prev_key = str(prev_situacao).strip().lower()
-        return mapa_funil.get(prev_key, "Leads")
-    
-    # Para outras situações, usa mapeamento da atual
-    if curr_key is None:
-        return "Leads"
-    return mapa_funil.get(curr_key, "Leads")
-
-filtered_df["funil_etapa"] = filtered_df.apply(lambda row: get_funil_etapa(row['nome_situacao_anterior_lead'], row['situacao_nome']), axis=1)
+# Filtros, exclusão de corretores e etapa do funil são aplicados em SQL (consultas_vendas.leads)
+filtros = FiltrosLeads(data_inicio, data_fim, selected_empreendimento, selected_midias, selected_corretores)
+resumo_funil = get_resumo_funil(filtros)
 
-funil_etapas = [
-    "Leads",
-    "Em atendimento",
-    "Visita realizada",
-    "Com reserva",
-    "Venda realizada"
-]
+funil_etapas = ETAPAS_FUNIL
 
 # Calcular as contagens iniciais para cada etapa
-initial_etapa_counts = {etapa: filtered_df[filtered_df["funil_etapa"] == etapa].shape[0] for etapa in funil_etapas}
+initial_etapa_counts = resumo_funil.etapas
 
 etapa_counts = []
-total_leads_remaining = filtered_df.shape[0]
+total_leads_remaining = resumo_funil.total
 
 for i, etapa in enumerate(funil_etapas):
     current_stage_count = initial_etapa_counts.get(etapa, 0)
@@ -288,33 +163,20 @@ st.markdown("## 📊 Funil de Leads (Versão Nova)")
 # Filtros específicos para o novo funil (movidos para sidebar)
 # Será implementado na sidebar
 
-# Aplicar filtros específicos para o novo funil
-filtered_df_novo = leads_df[
-    (leads_df['data_consolidada'].dt.date >= data_inicio_novo) &
-    (leads_df['data_consolidada'].dt.date <= data_fim_novo)
-].copy()
-
-# Aplicar outros filtros (empreendimento, mídia, corretor) se selecionados
-if selected_empreendimento != "Todos":
-    filtered_df_novo = filtered_df_novo[filtered_df_novo['empreendimento_ultimo'] == selected_empreendimento]
-
-if selected_midias:
-    filtered_df_novo = filtered_df_novo[filtered_df_novo['midia_consolidada'].isin(selected_midias)]
-
-if selected_corretores:
-    filtered_df_novo = filtered_df_novo[filtered_df_novo['corretor_consolidado'].isin(selected_corretores)]
+# Aplicar filtros específicos para o novo funil (período próprio + empreendimento, mídia e corretor)
+filtros_novo = FiltrosLeads(data_inicio_novo, data_fim_novo, selected_empreendimento, selected_midias, selected_corretores)
+contagens_status = get_contagens_status(filtros_novo)
 
 # Funil baseado nas novas colunas de status
 def render_novo_funil_status():
     # Contar leads por status usando as novas colunas (com filtros específicos)
-    total_leads = len(filtered_df_novo)
-    
+    total_leads = contagens_status['total']
     
     # Contar por status usando as colunas específicas (buscar por "sim" em qualquer variação)
-    em_atendimento = len(filtered_df_novo[filtered_df_novo.get('status_em_atendimento', '').str.lower() == 'sim'])
-    visita_realizada = len(filtered_df_novo[filtered_df_novo.get('status_visita_realizada', '').str.lower() == 'sim'])
-    com_reserva = len(filtered_df_novo[filtered_df_novo.get('status_reserva', '').str.lower() == 'sim'])
-    venda_realizada = len(filtered_df_novo[filtered_df_novo.get('status_venda_realizada', '').str.lower() == 'sim'])
+    em_atendimento = contagens_status['em_atendimento']
+    visita_realizada = contagens_status['visita_realizada']
+    com_reserva = contagens_status['com_reserva']
+    venda_realizada = contagens_status['venda_realizada']
     
     # Criar dados para o funil
     funil_etapas_novo = ["Leads", "Em atendimento", "Visita realizada", "Com reserva", "Venda realizada"]
@@ -355,7 +217,7 @@ def render_novo_funil_status():
     col5.metric(label="Venda realizada", value=venda_realizada, help=tooltip_texts_novo['Venda realizada'])
 
 # Mostrar informações do período selecionado
-st.info(f"📊 **Período de Análise**: {data_inicio_novo.strftime('%d/%m/%Y')} a {data_fim_novo.strftime('%d/%m/%Y')} | **Total de Leads**: {len(filtered_df_novo):,}")
+st.info(f"📊 **Período de Análise**: {data_inicio_novo.strftime('%d/%m/%Y')} a {data_fim_novo.strftime('%d/%m/%Y')} | **Total de Leads**: {contagens_status['total']:,}")
 
 # Renderizar o novo funil
 render_novo_funil_status()
@@ -367,42 +229,18 @@ render_novo_funil_status()
 st.markdown("---")
 st.subheader("Análise de Funil — Distribuições por Corretor e Mídia")
 
-# Garantir colunas necessárias
-for col in ["corretor_consolidado", "midia_consolidada"]:
-    if col not in filtered_df.columns:
-        filtered_df[col] = '—'
-
-base_df = filtered_df.copy()
-
 # Tabela por Corretor (todos os leads filtrados)
 st.markdown("**Por Corretor**", help="Coluna corretor: Consolida corretor + corretor_ultimo")
 
-if base_df.empty:
+if resumo_funil.total == 0:
     st.info("Sem leads no topo do funil para o filtro atual.")
 else:
-    por_corretor = (
-        base_df.groupby("corretor_consolidado")["idlead"].count().reset_index(name="Leads")
-        .sort_values("Leads", ascending=False)
-    )
-    # Renomear coluna para "corretor"
-    por_corretor = por_corretor.rename(columns={"corretor_consolidado": "corretor"})
+    # Leads, vendas realizadas e cancelamentos por corretor já vêm agregados
+    por_corretor = resumo_funil.por_corretor.copy()
     
     # Ocultar informações do corretor "Odair Dias dos Santos"
     por_corretor = por_corretor[por_corretor["corretor"] != "ODAIR DIAS DOS SANTOS"]
     
-    # Adicionar colunas de situação/etapa
-    for corretor in por_corretor["corretor"]:
-        mask = base_df["corretor_consolidado"] == corretor
-        
-        # Venda realizada
-        venda_realizada = base_df[mask & (base_df["funil_etapa"] == "Venda realizada")]["idlead"].count()
-        por_corretor.loc[por_corretor["corretor"] == corretor, "Venda realizada"] = venda_realizada
-        
-        # Total cancelamentos
-        cancelamentos = base_df[mask & base_df['motivo_cancelamento_consolidada'].notna() & 
-                               (base_df['motivo_cancelamento_consolidada'] != '')]["idlead"].count()
-        por_corretor.loc[por_corretor["corretor"] == corretor, "Total Cancelamentos"] = cancelamentos
-    
     total_topo = max(int(por_corretor["Leads"].sum()), 1)
     por_corretor["% Leads"] = (por_corretor["Leads"] / total_topo * 100).round(1)
     
@@ -433,20 +271,15 @@ else:
 # =============================================================================
 st.markdown("---")
 with st.expander("📊 **Ver Detalhes dos Motivos de Cancelamento por Corretor**"):
-    # Filtrar apenas leads com cancelamentos
-    leads_cancelados = base_df[base_df['motivo_cancelamento_consolidada'].notna() & 
-                              (base_df['motivo_cancelamento_consolidada'] != '')].copy()
+    # Cancelamentos por corretor e motivo (agregados em SQL)
+    cancelamentos = resumo_funil.cancelamentos
     
-    if leads_cancelados.empty:
+    if cancelamentos.empty:
         st.info("Nenhum cancelamento encontrado para o período selecionado.")
     else:
         # Análise por corretor
-        cancelamentos_por_corretor = leads_cancelados.groupby('corretor_consolidado').agg({
-            'idlead': 'count',
-            'motivo_cancelamento_consolidada': lambda x: x.value_counts().to_dict()
-        }).reset_index()
-        
-        cancelamentos_por_corretor.columns = ['Corretor', 'Total Cancelamentos', 'Motivos Detalhados']
+        cancelamentos_por_corretor = cancelamentos.groupby('corretor')['quantidade'].sum().reset_index()
+        cancelamentos_por_corretor.columns = ['Corretor', 'Total Cancelamentos']
         
         # Corretores já foram removidos dos dados, então não precisamos filtrar aqui
         
@@ -457,9 +290,9 @@ with st.expander("📊 **Ver Detalhes dos Motivos de Cancelamento por Corretor**
             st.markdown(f"**{row['Corretor']}** - {row['Total Cancelamentos']} cancelamentos")
             
             # Criar tabela de motivos para este corretor
-            motivos_df = pd.DataFrame(list(row['Motivos Detalhados'].items()), 
-                                    columns=['Motivo', 'Quantidade'])
-            motivos_df = motivos_df.sort_values('Quantidade', ascending=False)
+            motivos_df = cancelamentos[cancelamentos['corretor'] == row['Corretor']][['motivo', 'quantidade']]
+            motivos_df.columns = ['Motivo', 'Quantidade']
+            motivos_df = motivos_df.sort_values('Quantidade', ascending=False).reset_index(drop=True)
             
             # Calcular percentual
             total = motivos_df['Quantidade'].sum()
@@ -472,20 +305,11 @@ with st.expander("📊 **Ver Detalhes dos Motivos de Cancelamento por Corretor**
 # Tabela por Mídia (todos os leads filtrados) - com mais espaço horizontal
 st.markdown("**Por Mídia**", help="Coluna Mídia: Baseada na última movimentação de mídia registrada")
 
-if base_df.empty:
+if resumo_funil.total == 0:
     st.info("Sem leads no topo do funil para o filtro atual.")
 else:
-    # Contar leads por mídia
-    por_midia = base_df.groupby("midia_consolidada")["idlead"].count().reset_index()
-    por_midia.columns = ["Mídia", "Total Leads"]
-    
-    # Adicionar colunas de situação/etapa
-    for mídia in por_midia["Mídia"]:
-        mask = base_df["midia_consolidada"] == mídia
-        
-        # Venda realizada
-        venda_realizada = base_df[mask & (base_df["funil_etapa"] == "Venda realizada")]["idlead"].count()
-        por_midia.loc[por_midia["Mídia"] == mídia, "Venda realizada"] = venda_realizada
+    # Leads e vendas realizadas por mídia já vêm agregados
+    por_midia = resumo_funil.por_midia.copy()
     
     # Calcular percentuais
     total_topo_m = max(int(por_midia["Total Leads"].sum()), 1)
@@ -511,12 +335,12 @@ else:
 
 st.markdown("---")
 st.subheader("Leads detalhados")
-# Exibir dados usando data_consolidada
-display_columns = ["idlead", "situacao_nome", "nome_situacao_anterior_lead", "funil_etapa", "gestor", "imobiliaria", "empreendimento_ultimo", "data_consolidada"]
-st.dataframe(
-    filtered_df[display_columns].sort_values("data_consolidada", ascending=False),
-    use_container_width=True
-)
+# Apenas a página exibida é consultada (ordenada por data_consolidada)
+total_paginas = max(math.ceil(resumo_funil.total / LEADS_POR_PAGINA), 1)
+pagina_leads = st.number_input("Página", min_value=1, max_value=total_paginas, value=1, step=1, key="pagina_leads")
+leads_pagina = get_leads_pagina(filtros, pagina_leads)
+st.caption(f"Página {pagina_leads} de {total_paginas} | {resumo_funil.total:,} leads")
+st.dataframe(leads_pagina, use_container_width=True)
 
 
 # =============================================================================
@@ -528,108 +352,24 @@ st.markdown("## 📊 Funil de Leads Ativos")
 # Tooltip informativo sobre a seção Leads Ativos
 st.info("ℹ️ **Importante**: Esta seção mostra a foto atual de todos os leads ativos. Os filtros de data da página principal não se aplicam aqui.")
 
-# Carregar dados completos para leads ativos (sem filtros de data)
-def get_leads_ativos_data():
-    con = duckdb.connect(f"md:reservas?token={MOTHERDUCK_TOKEN}")
-    query = """
-    SELECT Idlead as idlead,
-           Data_cad as data_cad,
-           data_consolidada,
-           Referencia_data as referencia_data,
-           Situacao as situacao_nome,
-           Imobiliaria as imobiliaria,
-           nome_situacao_anterior_lead,
-           gestor,
-           empreendimento_ultimo
-    FROM cv_leads
-    ORDER BY data_consolidada DESC
-    """
-    df = con.execute(query).df()
-    con.close()
-    return df
-
 # Sidebar para filtros específicos de Leads Ativos
 st.sidebar.markdown("---")
 st.sidebar.markdown("### Filtros - Leads Ativos")
 
 # Imobiliaria filter para leads ativos
-imobiliarias_ativos = sorted(leads_df['imobiliaria'].dropna().unique())
+imobiliarias_ativos = opcoes_filtros['imobiliaria']
 selected_imobiliaria_ativos = st.sidebar.selectbox("Imobiliária (Leads Ativos)", ["Todas"] + list(imobiliarias_ativos))
 
 # Empreendimento filter para leads ativos
-empreendimentos_ativos = sorted(leads_df['empreendimento_ultimo'].dropna().unique())
+empreendimentos_ativos = opcoes_filtros['empreendimento']
 selected_empreendimento_ativos = st.sidebar.selectbox("Empreendimento (Leads Ativos)", ["Todos"] + list(empreendimentos_ativos))
 
-# Carregar dados para leads ativos
-leads_ativos_df = get_leads_ativos_data()
-
-# Aplicar filtros específicos para leads ativos
-filtered_ativos_df = leads_ativos_df.copy()
-
-if selected_imobiliaria_ativos != "Todas":
-    filtered_ativos_df = filtered_ativos_df[filtered_ativos_df['imobiliaria'] == selected_imobiliaria_ativos]
-
-if selected_empreendimento_ativos != "Todos":
-    filtered_ativos_df = filtered_ativos_df[filtered_ativos_df['empreendimento_ultimo'] == selected_empreendimento_ativos]
-
-# Exclude converted leads: Descartado, Em Pré-Cadastro, Venda realizada, Vencido
-exclude_situations = ['descartado', 'em pré-cadastro', 'venda realizada', 'vencido']
-filtered_ativos_df = filtered_ativos_df[~filtered_ativos_df['situacao_nome'].str.lower().str.strip().isin(exclude_situations)]
-
-# Mapeamento do funil para leads ativos
-mapa_funil_ativos = {
-    "aguardando atendimento": "Leads",
-    "qualificação": "Leads",
-    "descoberta": "Leads",
-    "em atendimento": "Em atendimento",
-    "atendimento futuro": "Em atendimento",
-    "visita agendada": "Em atendimento",
-    "visita realizada": "Visita realizada",
-    "atendimento pos visita": "Visita realizada",
-    "atendimento pós visita": "Visita realizada",
-    "pre cadastro": "Com reserva",
-    "pre cadastro pos visita": "Com reserva",
-    "em pré-cadastro": "Com reserva",
-    "com reserva": "Com reserva",
-    "venda realizada": "Venda realizada"
-}
-
-def get_funil_etapa_ativos(prev_situacao, curr_situacao):
-    # Normalizar entradas
-    if pd.isna(curr_situacao):
-        curr_key = None
-    else:
-        curr_key = str(curr_situacao).strip().lower()
-    
-    # Caso especial: "descartado" sempre usa etapa da situação anterior
-    if curr_key == "descartado":
-        if pd.isna(prev_situacao):
-            return "Leads"
-        prev_key = str(prev_situacao).strip().lower()
-        return mapa_funil_ativos.get(prev_key, "Leads")
-    
-    # Para outras situações, usa mapeamento da atual
-    if curr_key is None:
-        return "Leads"
-    return mapa_funil_ativos.get(curr_key, "Leads")
-
-filtered_ativos_df["funil_etapa"] = filtered_ativos_df.apply(lambda row: get_funil_etapa_ativos(row['nome_situacao_anterior_lead'], row['situacao_nome']), axis=1)
-
-funil_etapas_ativos = [
-    "Leads",
-    "Em atendimento",
-    "Visita realizada",
-    "Com reserva"
-]
+# Contagens dos leads ativos: exclui convertidos/encerrados (Descartado, Em Pré-Cadastro, Venda realizada, Vencido)
+funil_ativos = get_funil_ativos(selected_imobiliaria_ativos, selected_empreendimento_ativos)
 
-etapa_counts_ativos = [filtered_ativos_df[filtered_ativos_df["funil_etapa"] == etapa].shape[0] for etapa in funil_etapas_ativos]
+funil_etapas_ativos = ETAPAS_FUNIL_ATIVOS
 
-# Calcular tempo ativo (dias desde a data consolidada até hoje)
-filtered_ativos_df["data_consolidada"] = pd.to_datetime(filtered_ativos_df["data_consolidada"], errors="coerce")
-now_ts = pd.Timestamp.now()
-filtered_ativos_df["dias_ativo"] = (now_ts - filtered_ativos_df["data_consolidada"]).dt.days
-# Formatar como "X dias" para exibição
-filtered_ativos_df["tempo_ativo"] = filtered_ativos_df["dias_ativo"].apply(lambda d: f"{int(d)} dias" if pd.notna(d) else "-")
+etapa_counts_ativos = [funil_ativos[etapa] for etapa in funil_etapas_ativos]
 
 # Gráfico de funil para leads ativos
 fig_ativos = go.Figure(go.Funnel(
@@ -641,7 +381,7 @@ st.plotly_chart(fig_ativos, use_container_width=True)
 
 st.markdown("---")
 # Cartão de total de leads ativos (todas as situações consideradas ativas)
-total_ativos = int(filtered_ativos_df.shape[0])
+total_ativos = funil_ativos['total']
 col_total, col1, col2, col3, col4 = st.columns(5)
 
 tooltip_texts_ativos = {
@@ -660,9 +400,9 @@ col4.metric(label="Com reserva", value=etapa_counts_ativos[3], help=tooltip_text
 
 st.markdown("---")
 st.subheader("Leads ativos detalhados")
-# Exibir dados de leads ativos usando data_consolidada
-display_columns_ativos = ["idlead", "situacao_nome", "nome_situacao_anterior_lead", "funil_etapa", "gestor", "imobiliaria", "empreendimento_ultimo", "data_consolidada", "tempo_ativo"]
-st.dataframe(
-    filtered_ativos_df[display_columns_ativos].sort_values("data_consolidada", ascending=False),
-    use_container_width=True
-)
\ No newline at end of file
+# Apenas a página exibida é consultada, com o tempo ativo calculado (dias desde a data consolidada)
+total_paginas_ativos = max(math.ceil(total_ativos / LEADS_POR_PAGINA), 1)
+pagina_ativos = st.number_input("Página", min_value=1, max_value=total_paginas_ativos, value=1, step=1, key="pagina_leads_ativos")
+leads_ativos_pagina = get_leads_ativos_pagina(selected_imobiliaria_ativos, selected_empreendimento_ativos, pagina_ativos)
+st.caption(f"Página {pagina_ativos} de {total_paginas_ativos} | {total_ativos:,} leads ativos")
+st.dataframe(leads_ativos_pagina, use_container_width=True)
@@ -8,7 +8,6 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, date, timedelta
-from typing import List, Optional
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
@@ -28,17 +27,10 @@ except ImportError as e:
 
 # Importar utilitários locais
 from utils.md_conn import (
-    get_md_connection, 
-    get_date_range, 
-    get_kpis, 
-    get_timeline_data,
-    get_top_empreendimentos,
-    get_unique_values,
-    get_vendas_with_metas,
+    get_filter_options,
     get_metas_periodo,
-    get_analytics_by_dimension,
-    get_analytics_corretor,
-    get_analytics_imobiliaria
+    get_painel_vendas,
+    ExecutorPaineis
 )
 from utils.formatters import (
     format_currency, 
@@ -156,15 +148,14 @@ def render_kpis(kpis: dict):
             help="Menor valor de venda individual"
         )
 
-def render_metas_section(data_inicial: str, data_final: str, empreendimento: str):
+def render_metas_section(meta_periodo: float, kpis: dict):
     """Renderiza seção de metas."""
     st.subheader("🎯 Análise de Metas")
     
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        # Calcular meta do período
-        meta_periodo = get_metas_periodo(data_inicial, data_final, empreendimento)
+        # Meta do período
         st.metric(
             "Meta do Período",
             format_compact_currency(meta_periodo),
@@ -173,7 +164,6 @@ def render_metas_section(data_inicial: str, data_final: str, empreendimento: str
     
     with col2:
         # Calcular atingimento
-        kpis = st.session_state.get('kpis', {})
         valor_vendas = kpis.get('total_valor', 0)
         atingimento = (valor_vendas / meta_periodo * 100) if meta_periodo > 0 else 0
         
@@ -297,29 +287,18 @@ def render_top_empreendimentos(top_empreendimentos: pd.DataFrame):
         
         st.plotly_chart(fig, use_container_width=True)
 
-def render_house_analysis(data_inicial: str, data_final: str, 
-                         midia_selecionada: List[str], tipovenda_selecionada: List[str],
-                         empreendimento_selecionado: str, corretor_selecionado: List[str],
-                         imobiliaria_selecionada: List[str]):
-    """Renderiza análise House vs Imobiliárias."""
+def render_house_analysis(vendas_origem: pd.DataFrame):
+    """Renderiza análise House vs Imobiliárias (vendas já agregadas por empreendimento e origem)."""
     st.subheader("🏠 Análise Vendas House x Imobiliárias")
     
-    # Obter dados com análise de origem
-    vendas_data = get_vendas_with_metas(data_inicial, data_final, midia_selecionada, tipovenda_selecionada, empreendimento_selecionado, corretor_selecionado, imobiliaria_selecionada)
-    
-    if vendas_data.empty:
+    if vendas_origem.empty:
         st.warning("Nenhum dado disponível para o período selecionado.")
         return
     
-    # Classificar vendas como House (Prati) ou Externa
-    vendas_data['tipo_venda_origem'] = vendas_data['imobiliaria'].apply(
-        lambda x: 'Venda Interna (Prati)' if 'PRATI' in str(x).upper() else 'Venda Externa (Imobiliárias)'
-    )
-    
     # Análise agregada
-    analise_origem = vendas_data.groupby('tipo_venda_origem').agg({
-        'value': ['count', 'sum', 'mean']
-    }).round(2)
+    analise_origem = vendas_origem.groupby('tipo_venda_origem')[['qtd_vendas', 'total_valor']].sum()
+    analise_origem['ticket_medio'] = analise_origem['total_valor'] / analise_origem['qtd_vendas']
+    analise_origem = analise_origem.round(2)
     
     analise_origem.columns = ['Quantidade', 'Valor Total', 'Ticket Médio']
     analise_origem['Valor Total'] = analise_origem['Valor Total'].apply(format_currency)
@@ -333,8 +312,8 @@ def render_house_analysis(data_inicial: str, data_final: str,
     
     with col1:
         fig_pizza = px.pie(
-            vendas_data,
-            values='value',
+            vendas_origem,
+            values='total_valor',
             names='tipo_venda_origem',
             title='Distribuição por Origem (Valor)'
         )
@@ -342,8 +321,8 @@ def render_house_analysis(data_inicial: str, data_final: str,
     
     with col2:
         # Taxa House (calculada por valor, não por quantidade)
-        total_valor = vendas_data['value'].sum()
-        valor_house = vendas_data[vendas_data['tipo_venda_origem'] == 'Venda Interna (Prati)']['value'].sum()
+        total_valor = vendas_origem['total_valor'].sum()
+        valor_house = vendas_origem[vendas_origem['tipo_venda_origem'] == 'Venda Interna (Prati)']['total_valor'].sum()
         taxa_house = (valor_house / total_valor * 100) if total_valor > 0 else 0
         
         st.metric(
@@ -352,38 +331,27 @@ def render_house_analysis(data_inicial: str, data_final: str,
             help=f"Percentual de vendas e mútuos realizados pela Prati: {taxa_house:.1f}%\n\nRegra: Calculado pelo valor das vendas"
         )
 
-def render_empreendimentos_estratificados(data_inicial: str, data_final: str,
-                                         midia_selecionada: List[str], tipovenda_selecionada: List[str],
-                                         empreendimento_selecionado: str, corretor_selecionado: List[str],
-                                         imobiliaria_selecionada: List[str]):
-    """Renderiza tabela estratificada por empreendimento."""
+def render_empreendimentos_estratificados(vendas_origem: pd.DataFrame):
+    """Renderiza tabela estratificada por empreendimento (vendas já agregadas por empreendimento e origem)."""
     st.subheader("🏢 Vendas por Empreendimento (House x Externa)")
     
-    # Obter dados
-    vendas_data = get_vendas_with_metas(data_inicial, data_final, midia_selecionada, tipovenda_selecionada, empreendimento_selecionado, corretor_selecionado, imobiliaria_selecionada)
-    
-    if vendas_data.empty:
+    if vendas_origem.empty:
         st.warning("Nenhum dado disponível para o período selecionado.")
         return
     
-    # Classificar vendas
-    vendas_data['tipo_venda_origem'] = vendas_data['imobiliaria'].apply(
-        lambda x: 'Venda Interna (Prati)' if 'PRATI' in str(x).upper() else 'Venda Externa (Imobiliárias)'
-    )
-    
     # Criar pivot table
-    quantidade = vendas_data.pivot_table(
+    quantidade = vendas_origem.pivot_table(
         index='nome_empreendimento',
         columns='tipo_venda_origem',
-        values='value',
-        aggfunc='count',
+        values='qtd_vendas',
+        aggfunc='sum',
         fill_value=0
     ).reset_index()
     
-    valor = vendas_data.pivot_table(
+    valor = vendas_origem.pivot_table(
         index='nome_empreendimento',
         columns='tipo_venda_origem',
-        values='value',
+        values='total_valor',
         aggfunc='sum',
         fill_value=0
     ).reset_index()
@@ -414,14 +382,14 @@ def render_empreendimentos_estratificados(data_inicial: str, data_final: str,
     estratificacao['Taxa House (%)'] = estratificacao['Taxa House (%)'].apply(lambda v: f"{v:.1f}%")
     
     # Calcular totais
-    total_valor_interno = vendas_data[vendas_data['tipo_venda_origem'] == 'Venda Interna (Prati)']['value'].sum()
-    total_valor_externo = vendas_data[vendas_data['tipo_venda_origem'] == 'Venda Externa (Imobiliárias)']['value'].sum()
+    total_valor_interno = vendas_origem[vendas_origem['tipo_venda_origem'] == 'Venda Interna (Prati)']['total_valor'].sum()
+    total_valor_externo = vendas_origem[vendas_origem['tipo_venda_origem'] == 'Venda Externa (Imobiliárias)']['total_valor'].sum()
     taxa_house_total = (total_valor_interno / (total_valor_interno + total_valor_externo) * 100) if (total_valor_interno + total_valor_externo) > 0 else 0
 
     totais = pd.DataFrame([{
         'Empreendimento': 'Total',
-        'Quantidade (Interna)': vendas_data[vendas_data['tipo_venda_origem'] == 'Venda Interna (Prati)']['value'].count(),
-        'Quantidade (Externa)': vendas_data[vendas_data['tipo_venda_origem'] == 'Venda Externa (Imobiliárias)']['value'].count(),
+        'Quantidade (Interna)': vendas_origem[vendas_origem['tipo_venda_origem'] == 'Venda Interna (Prati)']['qtd_vendas'].sum(),
+        'Quantidade (Externa)': vendas_origem[vendas_origem['tipo_venda_origem'] == 'Venda Externa (Imobiliárias)']['qtd_vendas'].sum(),
         'Valor Total (Interna)': format_currency(total_valor_interno),
         'Valor Total (Externa)': format_currency(total_valor_externo),
         'Taxa House (%)': f"{taxa_house_total:.1f}%"
@@ -451,11 +419,13 @@ def main():
     # Sidebar para filtros
     st.sidebar.header("🔍 Filtros")
     
+    # Opções de todos os filtros (período e valores) numa única consulta
+    opcoes_filtros = get_filter_options()
+    
     # Obter range de datas disponível
     try:
-        data_min, data_max = get_date_range()
-        data_min = datetime.strptime(data_min, '%Y-%m-%d').date()
-        data_max = datetime.strptime(data_max, '%Y-%m-%d').date()
+        data_min = datetime.strptime(opcoes_filtros['data_min'], '%Y-%m-%d').date()
+        data_max = datetime.strptime(opcoes_filtros['data_max'], '%Y-%m-%d').date()
     except:
         # Fallback para datas padrão
         data_min = date(2025, 1, 1)
@@ -519,75 +489,84 @@ def main():
     """, unsafe_allow_html=True)
     
     # Filtro de empreendimento
-    empreendimentos = ["Todos"] + get_unique_values('nome_empreendimento')
+    empreendimentos = ["Todos"] + opcoes_filtros['nome_empreendimento']
     empreendimento_selecionado = st.sidebar.selectbox("Empreendimento", empreendimentos)
     
     # Filtros opcionais
     st.sidebar.subheader("Filtros Opcionais")
     
-    midias_disponiveis = get_unique_values('midia')
+    midias_disponiveis = opcoes_filtros['midia']
     midia_selecionada = st.sidebar.multiselect("Mídia", midias_disponiveis)
     
-    tipos_venda_disponiveis = get_unique_values('tipovenda')
+    tipos_venda_disponiveis = opcoes_filtros['tipovenda']
     tipovenda_selecionada = st.sidebar.multiselect("Tipo de Venda", tipos_venda_disponiveis)
     
     # Filtros adicionais
     st.sidebar.subheader("Filtros Adicionais")
     
-    corretores_disponiveis = get_unique_values('corretor')
+    corretores_disponiveis = opcoes_filtros['corretor']
     corretor_selecionado = st.sidebar.multiselect("Corretor", corretores_disponiveis)
     
-    imobiliarias_disponiveis = get_unique_values('imobiliaria')
+    imobiliarias_disponiveis = opcoes_filtros['imobiliaria']
     imobiliaria_selecionada = st.sidebar.multiselect("Imobiliária", imobiliarias_disponiveis)
     
     # Converter datas para string
     data_inicial_str = data_inicial.strftime('%Y-%m-%d')
     data_final_str = data_final.strftime('%Y-%m-%d')
     
-    # Carregar dados com loading
-    with st.spinner("🔄 Carregando dados..."):
-        try:
-            # Carregar KPIs
-            kpis = get_kpis(data_inicial_str, data_final_str, midia_selecionada, tipovenda_selecionada, empreendimento_selecionado, corretor_selecionado, imobiliaria_selecionada)
-            st.session_state.kpis = kpis
+    # Espaços dos painéis na ordem da página, preenchidos conforme os dados chegam
+    secoes = ['kpis', 'metas', 'top_empreendimentos', 'house', 'estratificacao', 'corretor', 'imobiliaria']
+    espacos = {}
+    for i, secao in enumerate(secoes):
+        if i > 0:
+            st.markdown("---")
+        espacos[secao] = st.empty()
+        espacos[secao].info("🔄 Carregando...")
+    
+    # Painéis (uma única consulta) e metas rodam em paralelo
+    resultados = {}
+    with ExecutorPaineis() as executor:
+        executor.enviar('painel', get_painel_vendas, data_inicial_str, data_final_str, midia_selecionada, tipovenda_selecionada, empreendimento_selecionado, corretor_selecionado, imobiliaria_selecionada, limit_top=10)
+        executor.enviar('metas', get_metas_periodo, data_inicial_str, data_final_str, empreendimento_selecionado)
+        
+        for resultado in executor.concluidos():
+            resultados[resultado.nome] = resultado
             
-            # Carregar timeline
-            timeline_data = get_timeline_data(data_inicial_str, data_final_str, midia_selecionada, tipovenda_selecionada, empreendimento_selecionado, corretor_selecionado, imobiliaria_selecionada)
-            st.session_state.timeline_data = timeline_data
-            
-            # Carregar top empreendimentos
-            top_empreendimentos = get_top_empreendimentos(data_inicial_str, data_final_str, midia_selecionada, tipovenda_selecionada, empreendimento_selecionado, corretor_selecionado, imobiliaria_selecionada, limit=10)
-            st.session_state.top_empreendimentos = top_empreendimentos
-            
-        except Exception as e:
-            st.error(f"❌ Erro ao carregar dados: {str(e)}")
-            return
-    
-    # Renderizar seções principais
-    render_kpis(kpis)
-    st.markdown("---")
-    
-    render_metas_section(data_inicial_str, data_final_str, empreendimento_selecionado)
-    st.markdown("---")
-    
-    # Gráfico de evolução mensal removido conforme solicitado
-    # render_timeline(timeline_data)
-    # st.markdown("---")
-    
-    render_top_empreendimentos(top_empreendimentos)
-    st.markdown("---")
-    
-    render_house_analysis(data_inicial_str, data_final_str, midia_selecionada, tipovenda_selecionada, empreendimento_selecionado, corretor_selecionado, imobiliaria_selecionada)
-    st.markdown("---")
-    
-    render_empreendimentos_estratificados(data_inicial_str, data_final_str, midia_selecionada, tipovenda_selecionada, empreendimento_selecionado, corretor_selecionado, imobiliaria_selecionada)
-    st.markdown("---")
-    
-    # Quadros Analíticos
-    render_analytics_corretor(data_inicial_str, data_final_str, midia_selecionada, tipovenda_selecionada, empreendimento_selecionado, corretor_selecionado, imobiliaria_selecionada)
-    st.markdown("---")
-    
-    render_analytics_imobiliaria(data_inicial_str, data_final_str, midia_selecionada, tipovenda_selecionada, empreendimento_selecionado, corretor_selecionado, imobiliaria_selecionada)
+            if resultado.nome == 'painel':
+                if resultado.erro is not None:
+                    espacos['kpis'].error(f"❌ Erro ao carregar dados: {str(resultado.erro)}")
+                    for secao in secoes[1:]:
+                        espacos[secao].empty()
+                    continue
+                
+                painel = resultado.valor
+                st.session_state.kpis = painel.kpis
+                st.session_state.timeline_data = painel.timeline
+                st.session_state.top_empreendimentos = painel.top_empreendimentos
+                
+                with espacos['kpis'].container():
+                    render_kpis(painel.kpis)
+                # Gráfico de evolução mensal removido conforme solicitado
+                # render_timeline(painel.timeline)
+                with espacos['top_empreendimentos'].container():
+                    render_top_empreendimentos(painel.top_empreendimentos)
+                with espacos['house'].container():
+                    render_house_analysis(painel.vendas_origem)
+                with espacos['estratificacao'].container():
+                    render_empreendimentos_estratificados(painel.vendas_origem)
+                # Quadros Analíticos
+                with espacos['corretor'].container():
+                    render_analytics_corretor(painel.analytics_corretor, painel.vpl)
+                with espacos['imobiliaria'].container():
+                    render_analytics_imobiliaria(painel.analytics_imobiliaria)
+    
+    # Metas dependem da meta do período e do total vendido (KPIs do painel)
+    metas, painel_resultado = resultados['metas'], resultados['painel']
+    if metas.erro is not None:
+        espacos['metas'].error(f"❌ Erro ao carregar metas: {str(metas.erro)}")
+    elif painel_resultado.erro is None:
+        with espacos['metas'].container():
+            render_metas_section(metas.valor, painel_resultado.valor.kpis)
     
     # Footer
     st.markdown("---")
@@ -598,18 +577,13 @@ def main():
         ⏰ Atualizado em: {data_atual}
     </div>
     """.format(data_atual=datetime.now().strftime('%d/%m/%Y %H:%M:%S')), unsafe_allow_html=True)
+    st.caption(f"⏱️ Tempo por painel: {executor.resumo_tempos()}")
 
-def render_analytics_corretor(data_inicial: str, data_final: str, 
-                             midia_selecionada: List[str], tipovenda_selecionada: List[str],
-                             empreendimento_selecionado: str, corretor_selecionado: List[str],
-                             imobiliaria_selecionada: List[str]):
-    """Renderiza quadro analítico por corretor."""
+def render_analytics_corretor(analytics_data: pd.DataFrame, vendas_vpl: pd.DataFrame):
+    """Renderiza quadro analítico por corretor e os detalhes de VPL."""
     st.subheader("👨‍💼 Análise por Corretor")
     
-    # Obter dados
     try:
-        analytics_data = get_analytics_corretor(data_inicial, data_final, midia_selecionada, tipovenda_selecionada, empreendimento_selecionado, corretor_selecionado, imobiliaria_selecionada)
-        
         if analytics_data.empty:
             st.warning("Nenhum dado disponível para análise por corretor.")
             return
@@ -773,13 +747,8 @@ def render_analytics_corretor(data_inicial: str, data_final: str,
         # Expander 1: VPL por Corretor
         with st.expander("📊 Ver Detalhes do VPL por Corretor", expanded=False):
             try:
-                # Carregar dados de vendas
-                conn = get_md_connection()
-                vendas_df = conn.run_query("""
-                    SELECT corretor, vpl_reserva, vpl_tabela
-                    FROM informacoes_consolidadas.sienge_vendas_consolidadas
-                    WHERE data_venda >= ? AND data_venda <= ?
-                """, [data_inicial, data_final])
+                # Vendas com VPL do período (carregadas junto com os demais painéis)
+                vendas_df = vendas_vpl[['corretor', 'vpl_reserva', 'vpl_tabela']]
                 
                 if not vendas_df.empty:
                     vpl_corretor = calcular_vpl_por_corretor(vendas_df)
@@ -802,13 +771,8 @@ def render_analytics_corretor(data_inicial: str, data_final: str,
         # Expander 2: VPL por Imobiliária
         with st.expander("📊 Ver Detalhes do VPL por Imobiliária", expanded=False):
             try:
-                # Carregar dados de vendas
-                conn = get_md_connection()
-                vendas_df = conn.run_query("""
-                    SELECT imobiliaria, vpl_reserva, vpl_tabela
-                    FROM informacoes_consolidadas.sienge_vendas_consolidadas
-                    WHERE data_venda >= ? AND data_venda <= ?
-                """, [data_inicial, data_final])
+                # Vendas com VPL do período (carregadas junto com os demais painéis)
+                vendas_df = vendas_vpl[['imobiliaria', 'vpl_reserva', 'vpl_tabela']]
                 
                 if not vendas_df.empty:
                     vpl_imobiliaria = calcular_vpl_por_imobiliaria(vendas_df)
@@ -831,17 +795,11 @@ def render_analytics_corretor(data_inicial: str, data_final: str,
     except Exception as e:
         st.error(f"❌ Erro ao carregar análise por corretor: {str(e)}")
 
-def render_analytics_imobiliaria(data_inicial: str, data_final: str, 
-                                 midia_selecionada: List[str], tipovenda_selecionada: List[str],
-                                 empreendimento_selecionado: str, corretor_selecionado: List[str],
-                                 imobiliaria_selecionada: List[str]):
+def render_analytics_imobiliaria(analytics_data: pd.DataFrame):
     """Renderiza quadro analítico por imobiliária."""
     st.subheader("🏢 Análise por Imobiliária")
     
-    # Obter dados
     try:
-        analytics_data = get_analytics_imobiliaria(data_inicial, data_final, midia_selecionada, tipovenda_selecionada, empreendimento_selecionado, corretor_selecionado, imobiliaria_selecionada)
-        
         if analytics_data.empty:
             st.warning("Nenhum dado disponível para análise por imobiliária.")
             return
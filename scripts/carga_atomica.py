@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Carga atômica (blue/green) de tabelas no MotherDuck
+- A carga é feita numa tabela de staging ({tabela}__staging), nunca na tabela lida
+  pelos dashboards
+- O staging é validado (contagem de linhas, schema, queda brusca de volume)
+- A troca é feita numa única transação: tabela atual -> {tabela}__anterior,
+  staging -> tabela. Leitores nunca veem a tabela ausente ou pela metade
+- A versão anterior fica retida para rollback instantâneo:
+    python -m scripts.carga_atomica reverter main.cv_leads
+"""
+
+import os
+import sys
+import logging
+from typing import List, Optional
+
+import pandas as pd
+
+from scripts.sync_state import garantir_tabela_log, registrar_alteracoes
+
+logger = logging.getLogger(__name__)
+
+SUFIXO_STAGING = '__staging'
+SUFIXO_ANTERIOR = '__anterior'
+
+class ErroValidacaoCarga(Exception):
+    """Staging reprovado na validação; a tabela atual é mantida"""
+
+def _partes(tabela: str):
+    """'schema.nome' ou 'banco.schema.nome' -> (prefixo, nome)"""
+    prefixo, _, nome = tabela.rpartition('.')
+    return prefixo or 'main', nome
+
+def tabela_existe(conn, tabela: str) -> bool:
+    """Verifica se a tabela existe (schema.nome no banco atual, ou banco.schema.nome)"""
+    prefixo, nome = _partes(tabela)
+    banco, _, schema = prefixo.rpartition('.')
+    return conn.execute(
+        "SELECT COUNT(*) FROM information_schema.tables "
+        "WHERE table_catalog = COALESCE(?, current_database()) AND table_schema = ? AND table_name = ?",
+        [banco or None, schema, nome]
+    ).fetchone()[0] > 0
+
+def _colunas(conn, tabela: str) -> List[str]:
+    return [r[0] for r in conn.execute(f"DESCRIBE {tabela}").fetchall()]
+
+def verificar_queda_volume(tabela: str, linhas: int, atuais: int):
+    """
+    Recusa uma carga que deixaria a tabela com menos de (1 - CARGA_QUEDA_MAXIMA)
+    das linhas atuais (padrão 0.5 = queda de até 50%)
+
+    Raises:
+        ErroValidacaoCarga: Se a queda passar do limite
+    """
+    queda_maxima = float(os.environ.get('CARGA_QUEDA_MAXIMA', '0.5'))
+    if atuais and linhas < atuais * (1 - queda_maxima):
+        raise ErroValidacaoCarga(
+            f"{tabela}: nova carga com {linhas} linhas contra {atuais} atuais "
+            f"(queda acima de {queda_maxima:.0%})"
+        )
+
+def validar_staging(conn, staging: str, tabela: str, linhas_esperadas: Optional[int] = None):
+    """
+    Valida o staging antes da troca
+
+    - Contagem de linhas igual à do DataFrame carregado (quando informada)
+    - Nenhuma coluna da tabela atual desaparece (CARGA_PERMITIR_REMOCAO_COLUNAS=true libera)
+    - Volume não cai mais que CARGA_QUEDA_MAXIMA (padrão 0.5 = 50%) em relação à tabela atual
+
+    Raises:
+        ErroValidacaoCarga: Se alguma verificação falhar
+    """
+    linhas = conn.execute(f"SELECT COUNT(*) FROM {staging}").fetchone()[0]
+    if linhas_esperadas is not None and linhas != linhas_esperadas:
+        raise ErroValidacaoCarga(f"{tabela}: staging com {linhas} linhas, esperado {linhas_esperadas}")
+
+    if not tabela_existe(conn, tabela):
+        return
+
+    removidas = set(_colunas(conn, tabela)) - set(_colunas(conn, staging))
+    if removidas and os.environ.get('CARGA_PERMITIR_REMOCAO_COLUNAS', 'false').lower() != 'true':
+        raise ErroValidacaoCarga(f"{tabela}: colunas ausentes na nova carga: {sorted(removidas)}")
+
+    atuais = conn.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0]
+    verificar_queda_volume(tabela, linhas, atuais)
+
+def trocar_tabelas(conn, staging: str, tabela: str, registrar_log: bool = False):
+    """
+    Promove o staging a tabela numa única transação, retendo a versão anterior
+
+    Com `registrar_log`, o change log (main.log_alteracoes) recebe a substituição
+    da tabela inteira na mesma transação.
+    """
+    prefixo, nome = _partes(tabela)
+    anterior = f"{prefixo}.{nome}{SUFIXO_ANTERIOR}"
+    if registrar_log:
+        garantir_tabela_log(conn)
+    conn.execute("BEGIN TRANSACTION")
+    try:
+        if registrar_log:
+            registrar_alteracoes(conn, tabela)
+        conn.execute(f"DROP TABLE IF EXISTS {anterior}")
+        if tabela_existe(conn, tabela):
+            conn.execute(f"ALTER TABLE {tabela} RENAME TO {nome}{SUFIXO_ANTERIOR}")
+        conn.execute(f"ALTER TABLE {staging} RENAME TO {nome}")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+def substituir_tabela_atomica(conn, df: pd.DataFrame, tabela: str) -> int:
+    """
+    Substitui a tabela pelo DataFrame via staging + validação + troca atômica
+
+    Returns:
+        int: Registros na tabela após a troca
+
+    Raises:
+        ErroValidacaoCarga: Staging reprovado (a tabela atual não é alterada)
+    """
+    nome_view = f"df_{_partes(tabela)[1]}"
+
+    conn.register(nome_view, df)
+    try:
+        return _publicar(conn, f"SELECT * FROM {nome_view}", tabela, len(df), registrar_log=True)
+    finally:
+        conn.unregister(nome_view)
+
+def materializar_consulta_atomica(conn, consulta: str, tabela: str) -> int:
+    """
+    Materializa o resultado de uma consulta SQL na tabela via staging + validação + troca atômica
+
+    Returns:
+        int: Registros na tabela após a troca
+
+    Raises:
+        ErroValidacaoCarga: Staging reprovado (a tabela atual não é alterada)
+    """
+    return _publicar(conn, consulta, tabela)
+
+def _publicar(conn, consulta: str, tabela: str, linhas_esperadas: Optional[int] = None,
+              registrar_log: bool = False) -> int:
+    prefixo, nome = _partes(tabela)
+    staging = f"{prefixo}.{nome}{SUFIXO_STAGING}"
+    conn.execute(f"CREATE OR REPLACE TABLE {staging} AS {consulta}")
+
+    try:
+        validar_staging(conn, staging, tabela, linhas_esperadas)
+    except ErroValidacaoCarga:
+        conn.execute(f"DROP TABLE IF EXISTS {staging}")
+        raise
+
+    trocar_tabelas(conn, staging, tabela, registrar_log)
+    total = conn.sql(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0]
+    logger.info(f"{tabela}: nova versão publicada ({total:,} linhas), anterior em {nome}{SUFIXO_ANTERIOR}")
+    return total
+
+def reverter_tabela(conn, tabela: str):
+    """Rollback: troca a tabela atual pela versão anterior retida (e vice-versa)"""
+    prefixo, nome = _partes(tabela)
+    anterior = f"{prefixo}.{nome}{SUFIXO_ANTERIOR}"
+    if not tabela_existe(conn, anterior):
+        raise ValueError(f"Sem versão anterior para {tabela}")
+
+    temporaria = f"{nome}__revertendo"
+    conn.execute("BEGIN TRANSACTION")
+    try:
+        conn.execute(f"ALTER TABLE {tabela} RENAME TO {temporaria}")
+        conn.execute(f"ALTER TABLE {anterior} RENAME TO {nome}")
+        conn.execute(f"ALTER TABLE {prefixo}.{temporaria} RENAME TO {nome}{SUFIXO_ANTERIOR}")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    logger.info(f"{tabela}: revertida para a versão anterior")
+
+    # O change log fica no banco padrão da conexão; para tabelas de outro banco
+    # (informacoes_consolidadas) ele não pode entrar na transação dos renames,
+    # pois uma transação só escreve num banco
+    garantir_tabela_log(conn)
+    registrar_alteracoes(conn, tabela)
+
+def remover_colunas_descontinuadas(conn, tabela: str, colunas: List[str]) -> List[str]:
+    """
+    Remove da tabela colunas que a fonte deixou de produzir
+
+    Upsert e merge só acrescentam colunas; sem esta migração uma coluna
+    descontinuada ficaria na tabela com NULL nas linhas novas.
+
+    Returns:
+        List[str]: Colunas efetivamente removidas
+    """
+    existentes = set(_colunas(conn, tabela))
+    removidas = [coluna for coluna in colunas if coluna in existentes]
+    for coluna in removidas:
+        conn.execute(f'ALTER TABLE {tabela} DROP COLUMN "{coluna}"')
+        logger.info(f"{tabela}: coluna descontinuada {coluna} removida")
+    return removidas
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or sys.argv[1] != 'reverter':
+        print("Uso: python -m scripts.carga_atomica reverter <schema.tabela>")
+        sys.exit(1)
+
+    from dotenv import load_dotenv
+    from scripts.sync_state import conectar_motherduck
+
+    load_dotenv()
+    conn = conectar_motherduck()
+    if conn is None:
+        print("❌ MOTHERDUCK_TOKEN não encontrado")
+        sys.exit(1)
+    try:
+        reverter_tabela(conn, sys.argv[2])
+        print(f"✅ {sys.argv[2]} revertida para a versão anterior")
+    finally:
+        conn.close()
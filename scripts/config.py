@@ -175,4 +175,15 @@ def get_all_rate_limits() -> Dict[str, int]:
         'sienge_vendas_canceladas': 50,
         'sienge_contratos_suprimentos': 50,
         'sienge_pedidos_compras': 50
-    }
\ No newline at end of file
+    }
+
+def get_rate_limit_groups() -> Dict[str, str]:
+    """Retorna o grupo de rate limit de cada API (APIs do mesmo grupo compartilham o orçamento)"""
+    return {
+        # Mesmas credenciais CVCRM (email, token) => mesmo limite de 60 req/min
+        'cv_vendas': 'cvcrm',
+        'cv_repasses': 'cvcrm',
+        'cv_leads': 'cvcrm',
+        'cv_repasses_workflow': 'cvcrm',
+        'cv_vgv_empreendimentos': 'cvcrm'
+    }
@@ -13,7 +13,7 @@ Baseado no código fornecido pelo usuário:
 import asyncio
 import logging
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import pandas as pd
 
 from scripts.orchestrator import make_api_request
@@ -32,15 +32,21 @@ class CVLeadsAPIClient:
         if not self.config:
             raise ValueError("Configuração da API CV Leads não encontrada")
     
-    async def get_pagina(self, pagina: int = 1, registros_por_pagina: int = 500) -> Dict[str, Any]:
+    async def get_pagina(self, pagina: int = 1, registros_por_pagina: int = 500,
+                         a_partir_data_referencia: Optional[str] = None) -> Dict[str, Any]:
         """
         Busca uma página dos leads do CV.
+
+        Com `a_partir_data_referencia` (YYYY-MM-DD) traz apenas leads alterados desde a data.
         """
         endpoint = ""  # base_url já aponta direto para /cvdw/leads
         params = {
             'pagina': pagina,
             'registros_por_pagina': registros_por_pagina
         }
+        if a_partir_data_referencia:
+            params['a_partir_data_referencia'] = a_partir_data_referencia
+            params['ate_data_referencia'] = datetime.now().strftime('%Y-%m-%d')
 
         logger.info(f"Buscando CV Leads - Página {pagina}")
         return await make_api_request('cv_leads', endpoint, params)
@@ -50,7 +56,8 @@ class CVLeadsAPIClient:
                            imobiliaria_match: str = "Prati",
                            include_empty_imobiliaria: bool = True,
                            max_paginas: int = 5000,
-                           sleep_between_calls: float = 0.0) -> List[Dict[str, Any]]:
+                           sleep_between_calls: float = 0.0,
+                           a_partir_data_referencia: Optional[str] = None) -> Tuple[List[Dict[str, Any]], bool]:
         """
         Busca todos os leads com paginação automática e filtros.
         
@@ -60,20 +67,29 @@ class CVLeadsAPIClient:
             include_empty_imobiliaria: Incluir registros com imobiliária vazia
             max_paginas: Limite máximo de páginas
             sleep_between_calls: Delay entre chamadas (segundos)
+            a_partir_data_referencia: Busca apenas leads alterados desde esta data (modo incremental)
+
+        Returns:
+            Tuple[List[Dict], bool]: Leads e se a paginação chegou ao fim dos dados
+                (False quando parou por erro ou pelo limite de páginas)
         """
         pagina = 1
+        completo = False
         results: List[Dict[str, Any]] = []
         total_processed = 0
         total_filtered = 0
         paginas_vazias = 0
         max_paginas_vazias = 3
 
-        logger.info("=== BUSCANDO LEADS SEM FILTRO DE DATA ===")
+        if a_partir_data_referencia:
+            logger.info(f"=== BUSCANDO LEADS ALTERADOS DESDE {a_partir_data_referencia} (INCREMENTAL) ===")
+        else:
+            logger.info("=== BUSCANDO LEADS SEM FILTRO DE DATA ===")
         logger.info(f"Filtro imobiliária: '{imobiliaria_match}' (incluir vazias: {include_empty_imobiliaria})")
 
         while pagina <= max_paginas:
             try:
-                result = await self.get_pagina(pagina, registros_por_pagina)
+                result = await self.get_pagina(pagina, registros_por_pagina, a_partir_data_referencia)
                 
                 if not result['success']:
                     error_msg = result.get('error', 'Erro desconhecido')
@@ -82,6 +98,7 @@ class CVLeadsAPIClient:
                     # Se for erro 404, pode ser fim dos dados
                     if '404' in str(error_msg) or 'not found' in str(error_msg).lower():
                         logger.info("Fim dos dados detectado (erro 404)")
+                        completo = True
                         break
                     break
 
@@ -99,6 +116,7 @@ class CVLeadsAPIClient:
                     
                     if paginas_vazias >= max_paginas_vazias:
                         logger.info(f"Fim da paginação: {paginas_vazias} páginas vazias consecutivas")
+                        completo = True
                         break
                 else:
                     paginas_vazias = 0  # Reset contador de páginas vazias
@@ -168,10 +186,12 @@ class CVLeadsAPIClient:
                     # Condições de parada
                     if len(dados) < registros_por_pagina:
                         logger.info("Página com menos registros que o tamanho da página, parando.")
+                        completo = True
                         break
                     
                     if total_pages and pagina >= total_pages:
                         logger.info(f"Alcançou o total de páginas ({total_pages}), parando.")
+                        completo = True
                         break
 
                 pagina += 1
@@ -186,8 +206,10 @@ class CVLeadsAPIClient:
         logger.info(f"Total de registros processados: {total_processed}")
         logger.info(f"Total de registros filtrados (Prati + vazias): {total_filtered}")
         logger.info(f"Registros finais salvos: {len(results)}")
+        if not completo:
+            logger.warning(f"Paginação de leads interrompida na página {pagina} - coleta incompleta")
         
-        return results
+        return results, completo
 
 def processar_dados_cv_leads(dados: List[Dict[str, Any]]) -> pd.DataFrame:
     """
@@ -433,20 +455,39 @@ def processar_dados_cv_leads(dados: List[Dict[str, Any]]) -> pd.DataFrame:
     logger.info(f"Dados processados - CV Leads: {len(df)} registros")
     return df
 
-async def obter_dados_cv_leads() -> pd.DataFrame:
-    """Obtém todos os dados de leads do CV com paginação automática."""
-    logger.info("Buscando dados do CV Leads (todas as páginas)")
+async def obter_dados_cv_leads_janela(a_partir_data_referencia: Optional[str] = None) -> Tuple[pd.DataFrame, bool]:
+    """
+    Obtém os dados de leads do CV com paginação automática.
+
+    Args:
+        a_partir_data_referencia: Se informado, busca apenas leads alterados desde
+            esta data (YYYY-MM-DD); caso contrário, todos os leads
+
+    Returns:
+        Tuple[pd.DataFrame, bool]: Leads processados e se a coleta chegou ao fim
+            dos dados (só então a watermark pode avançar)
+    """
+    if a_partir_data_referencia:
+        logger.info(f"Buscando dados do CV Leads alterados desde {a_partir_data_referencia}")
+    else:
+        logger.info("Buscando dados do CV Leads (todas as páginas)")
 
     client = CVLeadsAPIClient()
-    dados = await client.get_all_leads(
+    dados, completo = await client.get_all_leads(
         registros_por_pagina=500,
         imobiliaria_match="Prati",
         include_empty_imobiliaria=True,
         max_paginas=5000,
-        sleep_between_calls=0.0
+        sleep_between_calls=0.0,
+        a_partir_data_referencia=a_partir_data_referencia
     )
 
-    return processar_dados_cv_leads(dados)
+    return processar_dados_cv_leads(dados), completo
+
+async def obter_dados_cv_leads(a_partir_data_referencia: Optional[str] = None) -> pd.DataFrame:
+    """Obtém os dados de leads do CV (ver obter_dados_cv_leads_janela)."""
+    df, _ = await obter_dados_cv_leads_janela(a_partir_data_referencia)
+    return df
 
 if __name__ == "__main__":
     # Teste da API do CV Leads
@@ -14,7 +14,7 @@ Adaptação do M do Power BI:
 import asyncio
 import logging
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import pandas as pd
 import duckdb
 import os
@@ -84,20 +84,29 @@ class CVRepassesAPIClient:
         logger.info(f"Buscando CV Repasses - Página {pagina}")
         return await make_api_request('cv_repasses', endpoint, params)
 
-    async def get_all(self, a_partir: str = '2020-01-01', ate: Optional[str] = None) -> List[Dict[str, Any]]:
+    async def get_all(self, a_partir: str = '2020-01-01', ate: Optional[str] = None) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Busca todas as páginas da janela [a_partir, ate]
+
+        Returns:
+            Tuple[List[Dict], bool]: Repasses e se a janela foi buscada até o fim
+                (False quando uma página falhou e a paginação parou no meio)
+        """
         pagina = 1
         todos: List[Dict[str, Any]] = []
         vazias = 0
         max_vazias = 3
+        completo = False
         while True:
             result = await self.get_pagina(pagina, a_partir, ate)
             if not result.get('success'):
-                logger.error(f"Erro na página {pagina}: {result.get('error')}")
+                logger.error(f"Erro na página {pagina}: {result.get('error')} - janela incompleta")
                 break
             dados = result.get('data', {}).get('dados', [])
             if not dados:
                 vazias += 1
                 if vazias >= max_vazias:
+                    completo = True
                     break
             else:
                 vazias = 0
@@ -105,7 +114,7 @@ class CVRepassesAPIClient:
             pagina += 1
             await asyncio.sleep(0.2)
         logger.info(f"Total repasses: {len(todos)}")
-        return todos
+        return todos, completo
 
 
 def _montar_mapa_de_para(df_de_para: Optional[pd.DataFrame]) -> Dict[str, str]:
@@ -206,13 +215,28 @@ def carregar_de_para_motherduck() -> Optional[pd.DataFrame]:
         return None
 
 
-async def obter_dados_cv_repasses() -> pd.DataFrame:
+async def obter_dados_cv_repasses(a_partir: str = '2020-01-01', ate: Optional[str] = None) -> pd.DataFrame:
     client = CVRepassesAPIClient()
-    dados = await client.get_all()
+    dados, _ = await client.get_all(a_partir, ate)
     de_para = carregar_de_para_motherduck()
     return processar_cv_repasses(dados, de_para)
 
 
+async def obter_dados_cv_repasses_janela(a_partir: str, ate: Optional[str] = None) -> Tuple[pd.DataFrame, List[Any], bool]:
+    """
+    Busca apenas a janela [a_partir, ate] de data de referência.
+
+    Retorna o DataFrame processado, os ids de todos os repasses recebidos —
+    inclusive os descartados pelo filtro (Distrato, Cancelado...), que devem
+    ser removidos da tabela na mesclagem — e se a janela foi buscada até o fim.
+    """
+    client = CVRepassesAPIClient()
+    dados, completo = await client.get_all(a_partir, ate)
+    ids_recebidos = [d.get('idrepasse') for d in dados if d.get('idrepasse') is not None]
+    de_para = carregar_de_para_motherduck()
+    return processar_cv_repasses(dados, de_para), ids_recebidos, completo
+
+
 if __name__ == '__main__':
     async def _test():
         df = await obter_dados_cv_repasses()
@@ -12,15 +12,13 @@ Baseado no código fornecido pelo usuário:
 
 import asyncio
 import logging
-import time
 import os
 from datetime import datetime, date
 from typing import Dict, List, Any, Optional
 import pandas as pd
-import requests
-import json
 
 from scripts.config import get_api_config
+from scripts.sienge_paginacao import buscar_periodo_paralelo
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
@@ -42,72 +40,45 @@ class ContratosSuprimentosSiengeAPIClient:
         self.base_url = "https://api.sienge.com.br/pratiemp/public/api/v1/supply-contracts/all"
         self.headers = self.config.headers
     
-    async def buscar_contratos_periodo(self, data_inicio: str, data_fim: str, limit: int = 200) -> List[Dict]:
+    async def buscar_contratos_periodo(self, data_inicio: str, data_fim: str, limit: int = 200,
+                                       meses_por_janela: Optional[int] = None, max_concorrencia: int = 4) -> List[Dict]:
         """
         Busca contratos de suprimentos para um período específico
         
+        contractStartDate e contractEndDate podem ser aplicados como limites
+        independentes (início e fim do contrato): em janelas, um contrato que
+        atravessa a fronteira não cairia em nenhuma delas. Por isso o período é
+        buscado numa janela só; resultSetMetadata.count define os offsets
+        restantes, buscados em paralelo (via orquestrador, sem bloquear o event loop).
+        
         Args:
             data_inicio (str): Data de início no formato YYYY-MM-DD
             data_fim (str): Data de fim no formato YYYY-MM-DD
             limit (int): Limite de registros por requisição (máximo 200)
+            meses_por_janela (int): Tamanho das janelas em meses (None = período inteiro)
+            max_concorrencia (int): Requisições simultâneas
             
         Returns:
             List[Dict]: Lista de contratos encontrados
         """
-        todos_contratos = []
-        offset = 0
-        
-        while True:
+        def montar_params(inicio: str, fim: str, limit: int, offset: int) -> Dict[str, Any]:
             # Parâmetros da requisição baseados no código M
-            params = {
-                'contractStartDate': data_inicio,
-                'contractEndDate': data_fim,
+            return {
+                'contractStartDate': inicio,
+                'contractEndDate': fim,
                 'limit': limit,
                 'offset': offset,
                 'statusApproval': 'A',  # Aprovados
                 'authorization': 'T'    # Autorizados
             }
-            
-            try:
-                logger.info(f"Buscando contratos - Offset: {offset}, Limit: {limit}")
-                response = requests.get(self.base_url, headers=self.headers, params=params, timeout=30)
-                response.raise_for_status()
-                
-                data = response.json()
-                
-                # Verifica se há resultados
-                if 'results' not in data or not data['results']:
-                    logger.info("Nenhum resultado encontrado ou fim dos dados")
-                    break
-                
-                # Adiciona os resultados à lista
-                todos_contratos.extend(data['results'])
-                
-                # Verifica se há mais páginas
-                metadata = data.get('resultSetMetadata', {})
-                total_count = metadata.get('count', 0)
-                current_offset = metadata.get('offset', 0)
-                current_limit = metadata.get('limit', limit)
-                
-                logger.info(f"Total de registros: {total_count}, Processados: {len(todos_contratos)}")
-                
-                # Se não há mais dados ou atingiu o total
-                if len(todos_contratos) >= total_count or len(data['results']) < limit:
-                    break
-                
-                offset += limit
-                
-                # Pequena pausa para não sobrecarregar a API
-                await asyncio.sleep(0.5)
-                
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Erro na requisição: {e}")
-                break
-            except json.JSONDecodeError as e:
-                logger.error(f"Erro ao decodificar JSON: {e}")
-                break
         
-        return todos_contratos
+        return await buscar_periodo_paralelo(
+            'sienge_contratos_suprimentos', montar_params, data_inicio, data_fim,
+            limit=limit,
+            meses_por_janela=meses_por_janela,
+            max_concorrencia=max_concorrencia,
+            chave=lambda c: (c.get('documentId'), c.get('contractNumber'))
+        )
     
     def processar_dados(self, contratos: List[Dict]) -> pd.DataFrame:
         """
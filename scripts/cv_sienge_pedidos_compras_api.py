@@ -12,15 +12,13 @@ Baseado no código fornecido pelo usuário:
 
 import asyncio
 import logging
-import time
 import os
 from datetime import datetime, date
 from typing import Dict, List, Any, Optional
 import pandas as pd
-import requests
-import json
 
 from scripts.config import get_api_config
+from scripts.sienge_paginacao import buscar_periodo_paralelo
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
@@ -42,72 +40,44 @@ class PedidosComprasSiengeAPIClient:
         self.base_url = "https://api.sienge.com.br/pratiemp/public/api/v1/purchase-orders"
         self.headers = self.config.headers
     
-    async def buscar_pedidos_periodo(self, data_inicio: str, data_fim: str, limit: int = 200) -> List[Dict]:
+    async def buscar_pedidos_periodo(self, data_inicio: str, data_fim: str, limit: int = 200,
+                                     meses_por_janela: int = 3, max_concorrencia: int = 4) -> List[Dict]:
         """
         Busca pedidos de compras para um período específico
         
+        O período é dividido em janelas (padrão: trimestres) buscadas em paralelo
+        (startDate/endDate filtram um único campo, a data do pedido, então cada
+        pedido cai em exatamente uma janela); em cada janela, resultSetMetadata.count define os offsets restantes,
+        também buscados em paralelo (via orquestrador, sem bloquear o event loop).
+        
         Args:
             data_inicio (str): Data de início no formato YYYY-MM-DD
             data_fim (str): Data de fim no formato YYYY-MM-DD
             limit (int): Limite de registros por requisição (máximo 200)
+            meses_por_janela (int): Tamanho de cada janela de datas em meses
+            max_concorrencia (int): Requisições simultâneas
             
         Returns:
             List[Dict]: Lista de pedidos encontrados
         """
-        todos_pedidos = []
-        offset = 0
-        
-        while True:
-            # Parâmetros da requisição baseados no código M do Power BI
-            params = {
-                'startDate': data_inicio,
-                'endDate': data_fim,
+        def montar_params(inicio: str, fim: str, limit: int, offset: int) -> Dict[str, Any]:
+            # Parâmetros da requisição baseados no código M
+            return {
+                'startDate': inicio,
+                'endDate': fim,
                 'authorized': 'true',
                 'statusApproval': 'APPROVED',
                 'limit': limit,
                 'offset': offset
             }
-            
-            try:
-                logger.info(f"Buscando pedidos - Offset: {offset}, Limit: {limit}")
-                response = requests.get(self.base_url, headers=self.headers, params=params, timeout=30)
-                response.raise_for_status()
-                
-                data = response.json()
-                
-                # Verifica se há resultados
-                if 'results' not in data or not data['results']:
-                    logger.info("Nenhum resultado encontrado ou fim dos dados")
-                    break
-                
-                # Adiciona os resultados à lista
-                todos_pedidos.extend(data['results'])
-                
-                # Verifica se há mais páginas
-                metadata = data.get('resultSetMetadata', {})
-                total_count = metadata.get('count', 0)
-                current_offset = metadata.get('offset', 0)
-                current_limit = metadata.get('limit', limit)
-                
-                logger.info(f"Total de registros: {total_count}, Processados: {len(todos_pedidos)}")
-                
-                # Se não há mais dados ou atingiu o total
-                if len(todos_pedidos) >= total_count or len(data['results']) < limit:
-                    break
-                
-                offset += limit
-                
-                # Pequena pausa para não sobrecarregar a API
-                await asyncio.sleep(0.5)
-                
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Erro na requisição: {e}")
-                break
-            except json.JSONDecodeError as e:
-                logger.error(f"Erro ao decodificar JSON: {e}")
-                break
         
-        return todos_pedidos
+        return await buscar_periodo_paralelo(
+            'sienge_pedidos_compras', montar_params, data_inicio, data_fim,
+            limit=limit,
+            meses_por_janela=meses_por_janela,
+            max_concorrencia=max_concorrencia,
+            chave=lambda p: p.get('id')
+        )
     
     def processar_dados(self, pedidos: List[Dict]) -> pd.DataFrame:
         """
@@ -13,7 +13,7 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 import pandas as pd
 
-from scripts.orchestrator import make_api_request
+from scripts.orchestrator import make_api_request, ErroColetaIncompleta
 from scripts.config import get_api_config
 
 # Configurar logging
@@ -43,8 +43,74 @@ class CVVendasAPIClient:
         logger.info(f"Buscando CV Vendas - Página {pagina}")
         return await make_api_request('cv_vendas', endpoint, params)
     
-    async def get_all_vendas(self) -> List[Dict[str, Any]]:
-        """Busca todas as vendas com rate limiting otimizado e lógica robusta"""
+    async def get_all_vendas(self, max_concorrencia: int = 5) -> List[Dict[str, Any]]:
+        """
+        Busca todas as vendas em paralelo, guiado por 'total_de_paginas'.
+
+        Lê o total de páginas da primeira resposta e busca as demais com
+        concorrência limitada; o ritmo fica a cargo do RateLimiter do
+        orquestrador (60 req/min). Se a API não informar o total, usa a
+        paginação sequencial.
+
+        Args:
+            max_concorrencia: Número máximo de páginas em voo simultaneamente
+
+        Raises:
+            ErroColetaIncompleta: Se alguma página continuar sem dados após a
+                nova tentativa (o snapshot parcial apagaria reservas no upsert)
+        """
+        primeira = await self.get_pagina(1)
+        if not primeira['success']:
+            raise ErroColetaIncompleta(f"CV Vendas: erro na página 1: {primeira.get('error', 'Erro desconhecido')}")
+
+        total_paginas = primeira['data'].get('total_de_paginas')
+        try:
+            total_paginas = int(total_paginas)
+        except (TypeError, ValueError):
+            logger.warning("Resposta sem 'total_de_paginas' - usando paginação sequencial")
+            return await self.get_all_vendas_sequencial()
+
+        paginas: Dict[int, List[Dict[str, Any]]] = {1: primeira['data'].get('dados', [])}
+        logger.info(f"CV Vendas: {total_paginas} páginas (concorrência {max_concorrencia})")
+
+        semaforo = asyncio.Semaphore(max_concorrencia)
+
+        async def buscar(pagina: int) -> None:
+            async with semaforo:
+                result = await self.get_pagina(pagina)
+            if result['success']:
+                paginas[pagina] = result['data'].get('dados', [])
+            else:
+                logger.warning(f"Falha na página {pagina}: {result.get('error', result.get('status_code'))}")
+
+        await asyncio.gather(*(buscar(p) for p in range(2, total_paginas + 1)))
+
+        # Segunda tentativa, sequencial, para páginas que falharam
+        faltantes = [p for p in range(2, total_paginas + 1) if p not in paginas]
+        for pagina in faltantes:
+            await buscar(pagina)
+
+        faltantes = [p for p in range(2, total_paginas + 1) if p not in paginas]
+        if faltantes:
+            raise ErroColetaIncompleta(
+                f"CV Vendas: {len(faltantes)} de {total_paginas} páginas sem dados após nova tentativa: {faltantes[:20]}"
+            )
+
+        # Remontar na ordem das páginas
+        todos_dados: List[Dict[str, Any]] = []
+        for pagina in sorted(paginas):
+            todos_dados.extend(paginas[pagina])
+
+        logger.info(f"Total de registros CV Vendas: {len(todos_dados)} em {len(paginas)} páginas")
+        return todos_dados
+
+    async def get_all_vendas_sequencial(self) -> List[Dict[str, Any]]:
+        """
+        Busca todas as vendas com rate limiting otimizado e lógica robusta
+
+        Raises:
+            ErroColetaIncompleta: Se uma página falhar antes do fim dos dados
+        """
         pagina = 1
         todos_dados: List[Dict[str, Any]] = []
         paginas_vazias = 0
@@ -79,7 +145,7 @@ class CVVendasAPIClient:
                     if '404' in str(error_msg) or 'not found' in str(error_msg).lower():
                         logger.info("Fim dos dados detectado (erro 404)")
                         break
-                    break
+                    raise ErroColetaIncompleta(f"CV Vendas: erro na página {pagina}: {error_msg}")
 
                 dados = result['data'].get('dados', [])
                 
@@ -105,9 +171,10 @@ class CVVendasAPIClient:
                 pagina += 1
                 await asyncio.sleep(delay_base)  # Rate limiting inteligente
 
+            except ErroColetaIncompleta:
+                raise
             except Exception as e:
-                logger.error(f"Erro na página {pagina}: {str(e)}")
-                break
+                raise ErroColetaIncompleta(f"CV Vendas: erro na página {pagina}: {e}") from e
 
         logger.info(f"Total de registros CV Vendas: {len(todos_dados)} em {pagina-1} páginas")
         return todos_dados
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Executor de tarefas assíncronas em DAG
+Usado pela atualização diária para coletar as fontes em paralelo:
+- Cada tarefa tem timeout próprio (uma fonte lenta não derruba as demais)
+- Dependências explícitas: a tarefa só começa quando as dependências terminam
+  e recebe os resultados delas
+- Grupos de concorrência: limita quantas tarefas do mesmo host/credencial
+  rodam ao mesmo tempo (o rate limit continua no orquestrador)
+- Tempo total = caminho mais lento do DAG, não a soma das fontes
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+STATUS_OK = 'ok'
+STATUS_ERRO = 'erro'
+STATUS_TIMEOUT = 'timeout'
+STATUS_IGNORADA = 'ignorada'
+
+@dataclass
+class TarefaDAG:
+    """
+    Uma tarefa do DAG
+
+    `executar` recebe um dict {nome_dependencia: resultado} e retorna o resultado
+    da tarefa. Tarefas `obrigatorias` que falham marcam a execução como falha.
+    """
+    nome: str
+    executar: Callable[[Dict[str, Any]], Awaitable[Any]]
+    depende_de: List[str] = field(default_factory=list)
+    timeout: float = 300.0
+    grupo: Optional[str] = None
+    obrigatoria: bool = False
+
+@dataclass
+class ResultadoTarefa:
+    """Resultado da execução de uma tarefa"""
+    nome: str
+    status: str
+    resultado: Any = None
+    erro: Optional[str] = None
+    duracao: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.status == STATUS_OK
+
+class DAGRunner:
+    """Executa um conjunto de TarefaDAG respeitando dependências, timeouts e grupos"""
+
+    def __init__(self, tarefas: List[TarefaDAG], limites_grupo: Optional[Dict[str, int]] = None):
+        self.tarefas = {t.nome: t for t in tarefas}
+        if len(self.tarefas) != len(tarefas):
+            raise ValueError("Nomes de tarefas duplicados no DAG")
+        self.limites_grupo = limites_grupo or {}
+        self._validar()
+
+    def _validar(self):
+        """Verifica dependências inexistentes e ciclos"""
+        for tarefa in self.tarefas.values():
+            faltando = [d for d in tarefa.depende_de if d not in self.tarefas]
+            if faltando:
+                raise ValueError(f"Tarefa '{tarefa.nome}' depende de tarefas inexistentes: {faltando}")
+
+        visitando, visitadas = set(), set()
+
+        def visitar(nome: str):
+            if nome in visitadas:
+                return
+            if nome in visitando:
+                raise ValueError(f"Ciclo de dependências envolvendo '{nome}'")
+            visitando.add(nome)
+            for dep in self.tarefas[nome].depende_de:
+                visitar(dep)
+            visitando.discard(nome)
+            visitadas.add(nome)
+
+        for nome in self.tarefas:
+            visitar(nome)
+
+    async def executar(self) -> Dict[str, ResultadoTarefa]:
+        """
+        Executa todas as tarefas com asyncio.gather
+
+        Returns:
+            Dict[str, ResultadoTarefa]: Resultado por nome de tarefa
+        """
+        semaforos = {grupo: asyncio.Semaphore(limite) for grupo, limite in self.limites_grupo.items()}
+        concluidas = {nome: asyncio.Event() for nome in self.tarefas}
+        resultados: Dict[str, ResultadoTarefa] = {}
+
+        async def rodar(tarefa: TarefaDAG) -> ResultadoTarefa:
+            try:
+                for dep in tarefa.depende_de:
+                    await concluidas[dep].wait()
+
+                deps_com_falha = [d for d in tarefa.depende_de if not resultados[d].ok]
+                if deps_com_falha:
+                    logger.warning(f"DAG: '{tarefa.nome}' ignorada - dependências com falha: {deps_com_falha}")
+                    resultado = ResultadoTarefa(tarefa.nome, STATUS_IGNORADA,
+                                                erro=f"dependências com falha: {deps_com_falha}")
+                else:
+                    resultado = await self._rodar_tarefa(tarefa, semaforos.get(tarefa.grupo), resultados)
+                resultados[tarefa.nome] = resultado
+                return resultado
+            finally:
+                concluidas[tarefa.nome].set()
+
+        inicio = time.monotonic()
+        await asyncio.gather(*(rodar(t) for t in self.tarefas.values()))
+        logger.info(f"DAG: {len(self.tarefas)} tarefas em {time.monotonic() - inicio:.1f}s")
+        return {nome: resultados[nome] for nome in self.tarefas}
+
+    async def _rodar_tarefa(self, tarefa: TarefaDAG, semaforo: Optional[asyncio.Semaphore],
+                            resultados: Dict[str, ResultadoTarefa]) -> ResultadoTarefa:
+        """Executa uma tarefa com timeout, dentro do grupo de concorrência"""
+        entradas = {dep: resultados[dep].resultado for dep in tarefa.depende_de}
+
+        async def chamar():
+            inicio = time.monotonic()
+            try:
+                valor = await asyncio.wait_for(tarefa.executar(entradas), timeout=tarefa.timeout)
+                return ResultadoTarefa(tarefa.nome, STATUS_OK, resultado=valor,
+                                       duracao=time.monotonic() - inicio)
+            except asyncio.TimeoutError:
+                logger.error(f"DAG: '{tarefa.nome}' excedeu o timeout de {tarefa.timeout:.0f}s")
+                return ResultadoTarefa(tarefa.nome, STATUS_TIMEOUT, erro=f"timeout de {tarefa.timeout:.0f}s",
+                                       duracao=time.monotonic() - inicio)
+            except Exception as e:
+                logger.error(f"DAG: '{tarefa.nome}' falhou: {e}")
+                return ResultadoTarefa(tarefa.nome, STATUS_ERRO, erro=str(e),
+                                       duracao=time.monotonic() - inicio)
+
+        if semaforo is None:
+            return await chamar()
+        async with semaforo:
+            return await chamar()
+
+def imprimir_resumo_dag(resultados: Dict[str, ResultadoTarefa]):
+    """Imprime status e duração de cada tarefa"""
+    print("\nResumo das tarefas:")
+    for resultado in resultados.values():
+        detalhe = f" - {resultado.erro}" if resultado.erro else ""
+        print(f"   - {resultado.nome}: {resultado.status} ({resultado.duracao:.1f}s){detalhe}")
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Registro declarativo das fontes de dados do MotherDuck
+Cada Fonte declara coletor, transformador, tabela destino, chave primária e
+estratégia de carga (replace/merge/append). Os scripts de atualização apenas
+escolhem quais fontes executar e chamam scripts.motor_fontes.executar_fontes.
+"""
+
+import os
+import asyncio
+import weakref
+from datetime import datetime
+from typing import Any, Dict, List
+
+from scripts.motor_fontes import (
+    Fonte, Coleta, ConfigIncremental, JanelaColeta,
+    ESTRATEGIA_MERGE, ESTRATEGIA_UPSERT
+)
+
+# Coletores (imports tardios: cada API só é carregada quando a fonte executa)
+
+async def _coletar_cv_vendas(janela: JanelaColeta):
+    from scripts.cv_vendas_api import CVVendasAPIClient
+    # get_all_vendas levanta ErroColetaIncompleta se faltar alguma página
+    return Coleta(await CVVendasAPIClient().get_all_vendas(), completa=True)
+
+def _transformar_cv_vendas(dados):
+    from scripts.cv_vendas_api import processar_dados_cv_vendas
+    return processar_dados_cv_vendas(dados)
+
+async def _coletar_cv_repasses(janela: JanelaColeta):
+    from scripts.cv_repasses_api import obter_dados_cv_repasses_janela
+    df, ids_recebidos, completa = await obter_dados_cv_repasses_janela(janela.a_partir or '2020-01-01', janela.ate)
+    # Ids recebidos incluem repasses que saíram do filtro (removidos na mesclagem incremental)
+    return Coleta(df, chaves_removidas=ids_recebidos if janela.incremental else None, completa=completa)
+
+async def _coletar_cv_leads(janela: JanelaColeta):
+    from scripts.cv_leads_api import obter_dados_cv_leads_janela
+    df, completa = await obter_dados_cv_leads_janela(janela.a_partir)
+    return Coleta(df, completa=completa)
+
+async def _coletar_cv_repasses_workflow(janela: JanelaColeta):
+    from scripts.cv_repasses_workflow_api import obter_dados_cv_repasses_workflow
+    return await obter_dados_cv_repasses_workflow()
+
+async def _coletar_vgv_empreendimentos(janela: JanelaColeta):
+    from scripts.cv_vgv_empreendimentos_api import obter_dados_vgv_empreendimentos
+    return await obter_dados_vgv_empreendimentos(1, 20)
+
+async def _coletar_sienge_contratos_suprimentos(janela: JanelaColeta):
+    from scripts.cv_sienge_contratos_suprimentos_api import obter_dados_sienge_contratos_suprimentos
+    return await obter_dados_sienge_contratos_suprimentos("2020-01-01")
+
+async def _coletar_sienge_pedidos_compras(janela: JanelaColeta):
+    from scripts.cv_sienge_pedidos_compras_api import obter_dados_sienge_pedidos_compras
+    # buscar_periodo_paralelo levanta ErroColetaIncompleta se alguma página falhar
+    return Coleta(await obter_dados_sienge_pedidos_compras("2020-01-01"), completa=True)
+
+# Uma execução do SiengeScheduler (cota diária, ledger e lista de empreendimentos)
+# por event loop, compartilhada pelas fontes de vendas realizadas e canceladas.
+# Os empreendimentos vêm de main.cv_vendas: as fontes dependem de cv_vendas
+_execucoes_sienge_vendas = weakref.WeakKeyDictionary()
+
+async def _coletar_sienge_vendas(janela: JanelaColeta, situacao: str, coluna: str):
+    from scripts.sienge_scheduler import obter_dados_sienge_vendas_agendado, SITUACOES
+    loop = asyncio.get_running_loop()
+    execucao = _execucoes_sienge_vendas.get(loop)
+    if execucao is None or situacao not in execucao['pendentes']:
+        execucao = {
+            'tarefa': loop.create_task(obter_dados_sienge_vendas_agendado(janela.ate)),
+            'pendentes': set(SITUACOES),
+        }
+        _execucoes_sienge_vendas[loop] = execucao
+    execucao['pendentes'].discard(situacao)
+    # shield: o timeout de uma fonte não cancela a execução usada pela outra
+    dados = await asyncio.shield(execucao['tarefa'])
+
+    # Cota insuficiente ou erro em algum empreendimento: substitui só os consultados
+    resultado = dados['resultado'][situacao]
+    return Coleta(dados[coluna], completa=resultado.completo, particoes=resultado.empreendimentos_ok)
+
+async def _coletar_sienge_vendas_realizadas(janela: JanelaColeta):
+    return await _coletar_sienge_vendas(janela, 'SOLD', 'vendas_realizadas')
+
+async def _coletar_sienge_vendas_canceladas(janela: JanelaColeta):
+    return await _coletar_sienge_vendas(janela, 'CANCELED', 'vendas_canceladas')
+
+def config_relatorio() -> Dict[str, Any]:
+    """Configuração do relatório (download automático) a partir das variáveis de ambiente"""
+    return {
+        'nome_fonte': 'relatorio_sistema_principal',
+        'login_url': os.environ.get('RELATORIO_LOGIN_URL', ''),
+        'url': os.environ.get('RELATORIO_URL', ''),
+        'username_field': os.environ.get('RELATORIO_USERNAME_FIELD', 'email'),
+        'password_field': os.environ.get('RELATORIO_PASSWORD_FIELD', 'senha'),
+        'username': os.environ.get('RELATORIO_USERNAME', ''),
+        'password': os.environ.get('RELATORIO_PASSWORD', ''),
+        'tipo_arquivo': os.environ.get('RELATORIO_TIPO_ARQUIVO', 'csv'),
+        'seletor_botao_download': os.environ.get('RELATORIO_BOTAO_DOWNLOAD', '#btn-download-csv'),
+        'separador_csv': os.environ.get('RELATORIO_SEPARADOR', ';'),
+        'encoding': os.environ.get('RELATORIO_ENCODING', 'utf-8'),
+        'filtros': {
+            'data_inicio': (datetime.now().replace(day=1)).strftime('%Y-%m-%d'),  # Primeiro dia do mês
+            'data_fim': datetime.now().strftime('%Y-%m-%d'),  # Hoje
+            'campo_data_inicio': os.environ.get('RELATORIO_CAMPO_DATA_INICIO', 'data_inicio'),
+            'campo_data_fim': os.environ.get('RELATORIO_CAMPO_DATA_FIM', 'data_fim')
+        },
+        'mapeamento_colunas': {
+            'id': 'ID_Relatorio',
+            'data': 'Data_Relatorio',
+            'valor': 'Valor_Relatorio',
+            'cliente': 'Cliente_Relatorio'
+        },
+        'tipos_dados': {
+            'ID_Relatorio': 'int64',
+            'Data_Relatorio': 'datetime',
+            'Valor_Relatorio': 'numeric'
+        },
+        # Fallback para extração da tela
+        'tabela_selector': os.environ.get('RELATORIO_TABELA_SELECTOR', '#tabela-dados'),
+        'aguardar_elemento': os.environ.get('RELATORIO_AGUARDAR_ELEMENTO', '#tabela-dados tbody tr')
+    }
+
+async def _coletar_relatorio(janela: JanelaColeta):
+    from scripts.relatorio_download_api import obter_dados_relatorio_download
+    return await obter_dados_relatorio_download(config_relatorio())
+
+FONTES: Dict[str, Fonte] = {fonte.nome: fonte for fonte in [
+    Fonte('cv_vendas', 'CV Vendas', _coletar_cv_vendas, 'main.cv_vendas',
+          transformar=_transformar_cv_vendas, chave='idreserva', estrategia=ESTRATEGIA_UPSERT,
+          grupo='cvcrm', timeout=300, obrigatoria=True),
+    Fonte('cv_repasses', 'CV Repasses', _coletar_cv_repasses, 'main.cv_repasses',
+          chave='idrepasse', estrategia=ESTRATEGIA_MERGE,
+          incremental=ConfigIncremental('CV_REPASSES', overlap_dias=7),
+          grupo='cvcrm', timeout=300),
+    Fonte('cv_leads', 'CV Leads', _coletar_cv_leads, 'main.cv_leads',
+          chave='Idlead', estrategia=ESTRATEGIA_MERGE,
+          incremental=ConfigIncremental('CV_LEADS', overlap_dias=1, coluna_watermark='referencia_data'),
+          colunas_descontinuadas=['funil_etapa'],  # etapa do funil calculada em consultas_vendas
+          grupo='cvcrm', timeout=840),
+    Fonte('cv_repasses_workflow', 'CV Repasses Workflow', _coletar_cv_repasses_workflow,
+          'main.cv_repasses_workflow', grupo='cvcrm', timeout=300),
+    Fonte('cv_vgv_empreendimentos', 'VGV Empreendimentos', _coletar_vgv_empreendimentos,
+          'main.cv_vgv_empreendimentos', grupo='cvcrm', timeout=180),
+    Fonte('sienge_contratos_suprimentos', 'Sienge Contratos Suprimentos', _coletar_sienge_contratos_suprimentos,
+          'main.sienge_contratos_suprimentos', grupo='sienge', timeout=300),
+    Fonte('sienge_pedidos_compras', 'Sienge Pedidos Compras', _coletar_sienge_pedidos_compras,
+          'main.sienge_pedidos_compras', chave='ID_Pedido', estrategia=ESTRATEGIA_UPSERT,
+          grupo='sienge', timeout=300),
+    Fonte('sienge_vendas_realizadas', 'Sienge Vendas Realizadas', _coletar_sienge_vendas_realizadas,
+          'main.sienge_vendas_realizadas', chave='id', estrategia=ESTRATEGIA_UPSERT,
+          coluna_particao='enterpriseId', grupo='sienge_bulk', timeout=900,
+          depende_de=['cv_vendas']),
+    Fonte('sienge_vendas_canceladas', 'Sienge Vendas Canceladas', _coletar_sienge_vendas_canceladas,
+          'main.sienge_vendas_canceladas', chave='id', estrategia=ESTRATEGIA_UPSERT,
+          coluna_particao='enterpriseId', grupo='sienge_bulk', timeout=900,
+          depende_de=['cv_vendas']),
+    Fonte('relatorio_download', 'Relatório Download', _coletar_relatorio,
+          'main.relatorio_download', grupo='relatorio', timeout=300),
+]}
+
+# Conjuntos usados pelos scripts de atualização
+FONTES_DIARIAS = [
+    'cv_vendas', 'cv_repasses', 'cv_leads', 'cv_repasses_workflow', 'cv_vgv_empreendimentos',
+    'sienge_contratos_suprimentos', 'sienge_pedidos_compras', 'relatorio_download',
+]
+FONTES_COMPLETAS = [
+    'cv_vendas', 'cv_repasses', 'cv_leads', 'cv_repasses_workflow', 'cv_vgv_empreendimentos',
+    'sienge_vendas_realizadas', 'sienge_vendas_canceladas',
+]
+
+def obter_fontes(nomes: List[str]) -> List[Fonte]:
+    """Fontes registradas pelos nomes (na ordem informada)"""
+    faltando = [nome for nome in nomes if nome not in FONTES]
+    if faltando:
+        raise KeyError(f"Fontes não registradas: {faltando}")
+    return [FONTES[nome] for nome in nomes]
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Motor de execução das fontes declaradas em scripts/fontes.py
+Cada fonte declara coletor, transformador, tabela destino, chave e estratégia
+de carga; o motor executa qualquer subconjunto delas:
+- Coleta em paralelo via DAGRunner (timeout, dependências e grupos por fonte)
+- Sync incremental (sync_state) para fontes com ConfigIncremental
+- Upload em streaming via UploadWorker assim que cada fonte termina
+- Estratégias de carga: replace, upsert (snapshot por chave, com remoções),
+  merge (janela incremental por chave) e append
+"""
+
+import os
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import pandas as pd
+
+from scripts.dag_runner import DAGRunner, TarefaDAG, ResultadoTarefa, imprimir_resumo_dag
+from scripts.upload_worker import UploadWorker, ResultadoUpload, substituir_tabela
+from scripts.carga_atomica import tabela_existe, remover_colunas_descontinuadas, SUFIXO_ANTERIOR, SUFIXO_STAGING
+from scripts.sync_state import (
+    conectar_motherduck, ler_estado_sync, salvar_estado_sync, planejar_sync,
+    calcular_watermark, mesclar_por_chave, aplicar_upsert, substituir_particoes, garantir_tabela_log,
+    registrar_alteracoes, MODO_COMPLETO, MODO_INCREMENTAL
+)
+
+logger = logging.getLogger(__name__)
+
+ESTRATEGIA_REPLACE = 'replace'
+ESTRATEGIA_UPSERT = 'upsert'
+ESTRATEGIA_MERGE = 'merge'
+ESTRATEGIA_APPEND = 'append'
+
+# Tarefas simultâneas por grupo (fontes do mesmo host/credencial)
+LIMITES_GRUPO_PADRAO = {'cvcrm': 3, 'sienge': 2, 'sienge_bulk': 1, 'relatorio': 1}
+
+@dataclass
+class ConfigIncremental:
+    """
+    Sync incremental de uma fonte (estado em main.sync_state)
+
+    Variáveis de ambiente: {prefixo_env}_INCREMENTAL, {prefixo_env}_FULL_REFRESH_DAYS
+    e {prefixo_env}_OVERLAP_DAYS. Sem `coluna_watermark`, a watermark é a data
+    final da janela coletada.
+    """
+    prefixo_env: str
+    overlap_dias: int = 1
+    dias_carga_completa: int = 7
+    coluna_watermark: Optional[str] = None
+
+@dataclass
+class JanelaColeta:
+    """Modo e período da coleta, passados ao coletor"""
+    modo: str = MODO_COMPLETO
+    a_partir: Optional[str] = None
+    ate: str = field(default_factory=lambda: datetime.now().strftime('%Y-%m-%d'))
+
+    @property
+    def incremental(self) -> bool:
+        return self.modo == MODO_INCREMENTAL
+
+@dataclass
+class Coleta:
+    """
+    Retorno do coletor quando há mais que os dados (ex.: chaves que saíram do filtro)
+
+    `completa` só é True quando o coletor confirma que buscou a janela inteira;
+    sem essa confirmação (inclusive coletores que retornam só os dados) a
+    watermark da fonte não avança. Numa coleta parcial, `particoes` lista os
+    valores de Fonte.coluna_particao buscados por inteiro (ex.: empreendimentos
+    consultados dentro da cota do Sienge): só essas partições são substituídas.
+    """
+    dados: Any
+    chaves_removidas: Optional[List[Any]] = None
+    completa: bool = False
+    particoes: Optional[List[Any]] = None
+
+@dataclass
+class Fonte:
+    """
+    Declaração de uma fonte de dados
+
+    `colunas_descontinuadas` lista colunas que a fonte não produz mais; são
+    removidas da tabela existente antes da carga.
+    """
+    nome: str
+    descricao: str
+    coletar: Callable[[JanelaColeta], Awaitable[Any]]
+    tabela: str
+    transformar: Optional[Callable[[Any], pd.DataFrame]] = None
+    chave: Optional[str] = None
+    estrategia: str = ESTRATEGIA_REPLACE
+    incremental: Optional[ConfigIncremental] = None
+    grupo: Optional[str] = None
+    timeout: float = 300.0
+    obrigatoria: bool = False
+    depende_de: List[str] = field(default_factory=list)
+    coluna_particao: Optional[str] = None
+    colunas_descontinuadas: List[str] = field(default_factory=list)
+
+@dataclass
+class ResultadoExecucao:
+    """Resultado da execução de um conjunto de fontes"""
+    tarefas: Dict[str, ResultadoTarefa]
+    uploads: Dict[str, ResultadoUpload]
+    obrigatorias: List[str]
+
+    @property
+    def falhas_obrigatorias(self) -> List[str]:
+        return [nome for nome in self.obrigatorias if not self.tarefas[nome].ok]
+
+    @property
+    def falhas_upload(self) -> List[str]:
+        return [r.nome for r in self.uploads.values() if not r.sucesso]
+
+    @property
+    def sucesso(self) -> bool:
+        return not self.falhas_obrigatorias and not self.falhas_upload
+
+    def registros(self, nome: str) -> int:
+        """Registros coletados pela fonte (0 se falhou)"""
+        resultado = self.tarefas.get(nome)
+        return resultado.resultado if resultado is not None and resultado.ok else 0
+
+def planejar_janela(fonte: Fonte, forcar_completa: bool = False) -> JanelaColeta:
+    """Decide entre carga completa e incremental para a fonte"""
+    config = fonte.incremental
+    if config is None or forcar_completa:
+        return JanelaColeta()
+    if os.environ.get(f'{config.prefixo_env}_INCREMENTAL', 'true').lower() != 'true':
+        return JanelaColeta()
+
+    modo, a_partir = planejar_sync(
+        ler_estado_sync(fonte.nome),
+        dias_carga_completa=int(os.environ.get(f'{config.prefixo_env}_FULL_REFRESH_DAYS', config.dias_carga_completa)),
+        overlap_dias=int(os.environ.get(f'{config.prefixo_env}_OVERLAP_DAYS', config.overlap_dias))
+    )
+    return JanelaColeta(modo=modo, a_partir=a_partir)
+
+def carregar_fonte(conn, fonte: Fonte, df: pd.DataFrame, janela: JanelaColeta,
+                   chaves_removidas: Optional[List[Any]] = None, completa: bool = False,
+                   particoes: Optional[List[Any]] = None) -> str:
+    """
+    Carrega o DataFrame na tabela da fonte conforme a estratégia
+
+    - upsert: o DataFrame é o snapshot; só linhas novas/alteradas são
+      reescritas e, se a coleta foi `completa`, chaves ausentes são removidas;
+      coleta parcial com `particoes` substitui apenas essas partições
+    - merge: janela incremental; mescla por chave sem detectar remoções (a
+      carga completa de uma fonte merge é aplicada como upsert)
+    - Tabela inexistente ou chave ausente no DataFrame: replace
+
+    A watermark (fontes incrementais) só é gravada quando a coleta foi
+    `completa`; uma janela interrompida é refeita na próxima execução.
+
+    Executado pelo UploadWorker (em thread, com a conexão dele).
+
+    Returns:
+        str: Mensagem para o log
+    """
+    estrategia = fonte.estrategia
+    if estrategia == ESTRATEGIA_MERGE and not janela.incremental:
+        estrategia = ESTRATEGIA_UPSERT
+    if estrategia in (ESTRATEGIA_UPSERT, ESTRATEGIA_MERGE) and fonte.chave not in df.columns and not df.empty:
+        logger.warning(f"{fonte.nome}: chave {fonte.chave} ausente no DataFrame - usando replace")
+        estrategia = ESTRATEGIA_REPLACE
+    if not tabela_existe(conn, fonte.tabela):
+        if df.empty:
+            return f"{fonte.descricao}: tabela inexistente e nenhum registro coletado"
+        estrategia = ESTRATEGIA_REPLACE
+    elif fonte.colunas_descontinuadas:
+        remover_colunas_descontinuadas(conn, fonte.tabela, fonte.colunas_descontinuadas)
+
+    if estrategia == ESTRATEGIA_UPSERT and not completa and particoes and fonte.coluna_particao:
+        inseridos = substituir_particoes(conn, df, fonte.tabela, fonte.coluna_particao, particoes, chave=fonte.chave)
+        mensagem = (f"{fonte.descricao} coleta parcial: {len(particoes)} partições ({fonte.coluna_particao}) "
+                    f"substituídas com {inseridos:,} registros")
+    elif estrategia == ESTRATEGIA_UPSERT:
+        if not completa:
+            logger.warning(f"{fonte.nome}: coleta não confirmada como completa - upsert sem remoções")
+        resultado = aplicar_upsert(conn, df, fonte.tabela, fonte.chave, detectar_remocoes=completa)
+        mensagem = f"{fonte.descricao} upsert por {fonte.chave}: {resultado}"
+    elif estrategia == ESTRATEGIA_MERGE:
+        mesclados = mesclar_por_chave(conn, df, fonte.tabela, fonte.chave, chaves_removidas=chaves_removidas)
+        total = conn.sql(f"SELECT COUNT(*) FROM {fonte.tabela}").fetchone()[0]
+        mensagem = f"{fonte.descricao} mesclados por {fonte.chave}: {mesclados:,} ({total:,} registros na tabela)"
+    elif estrategia == ESTRATEGIA_APPEND:
+        conn.register('df_append', df)
+        try:
+            garantir_tabela_log(conn)
+            conn.execute("BEGIN TRANSACTION")
+            try:
+                registrar_alteracoes(conn, fonte.tabela,
+                                     f'SELECT "{fonte.chave}" FROM df_append' if fonte.chave in df.columns else None)
+                conn.execute(f"INSERT INTO {fonte.tabela} BY NAME SELECT * FROM df_append")
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.unregister('df_append')
+        total = conn.sql(f"SELECT COUNT(*) FROM {fonte.tabela}").fetchone()[0]
+        mensagem = f"{fonte.descricao} anexados: {len(df):,} ({total:,} registros na tabela)"
+    else:
+        mensagem = f"{fonte.descricao} upload: {substituir_tabela(conn, df, fonte.tabela):,} registros"
+
+    if fonte.incremental is not None and not completa:
+        logger.warning(f"{fonte.nome}: coleta incompleta - watermark mantida, janela será refeita")
+        mensagem += " (coleta incompleta, watermark mantida)"
+    elif fonte.incremental is not None:
+        if fonte.incremental.coluna_watermark:
+            watermark = calcular_watermark(df, fonte.incremental.coluna_watermark)
+        else:
+            # Próxima execução parte do fim desta janela (menos o overlap)
+            watermark = datetime.strptime(janela.ate, '%Y-%m-%d')
+        salvar_estado_sync(conn, fonte.nome, watermark, carga_completa=not janela.incremental)
+
+    return mensagem
+
+async def _executar_fonte(fonte: Fonte, uploader: UploadWorker, forcar_completa: bool, deps: Dict[str, Any]) -> int:
+    """Coleta, transforma e enfileira o upload de uma fonte; retorna o número de registros"""
+    # Dependências precisam estar gravadas no MotherDuck, não apenas coletadas
+    for dependencia in deps:
+        upload = await uploader.aguardar(dependencia)
+        if upload is not None and not upload.sucesso:
+            raise RuntimeError(f"upload de {dependencia} falhou: {upload.mensagem}")
+
+    # ler_estado_sync abre uma conexão com o MotherDuck: fora do event loop
+    janela = await asyncio.to_thread(planejar_janela, fonte, forcar_completa)
+    if fonte.incremental is not None:
+        print(f"Modo {fonte.descricao}: {janela.modo}" +
+              (f" ({janela.a_partir} a {janela.ate})" if janela.a_partir else ""))
+
+    coleta = await fonte.coletar(janela)
+    if not isinstance(coleta, Coleta):
+        coleta = Coleta(coleta)
+    df = fonte.transformar(coleta.dados) if fonte.transformar else coleta.dados
+    if df is None:
+        df = pd.DataFrame()
+    print(f"OK: {fonte.descricao}: {len(df)} registros")
+
+    # Merge incremental com chaves removidas e substituição de partições precisam
+    # rodar mesmo sem linhas novas
+    if not df.empty or (janela.incremental and coleta.chaves_removidas) or \
+            (not coleta.completa and coleta.particoes):
+        uploader.enviar(fonte.nome, partial(carregar_fonte, fonte=fonte, df=df, janela=janela,
+                                            chaves_removidas=coleta.chaves_removidas,
+                                            completa=coleta.completa, particoes=coleta.particoes))
+    return len(df)
+
+async def executar_fontes(fontes: List[Fonte], forcar_completa: bool = False,
+                          limites_grupo: Optional[Dict[str, int]] = None) -> ResultadoExecucao:
+    """
+    Executa as fontes em paralelo com upload em streaming para o MotherDuck
+
+    Fontes com `depende_de` só começam depois que o upload das dependências
+    presentes em `fontes` for gravado.
+
+    Args:
+        fontes: Fontes a executar (ver scripts/fontes.py)
+        forcar_completa: Ignora o sync incremental e recarrega tudo
+        limites_grupo: Tarefas simultâneas por grupo (padrão: LIMITES_GRUPO_PADRAO)
+    """
+    conn = conectar_motherduck()
+    if conn is None:
+        raise RuntimeError("MOTHERDUCK_TOKEN não encontrado")
+
+    uploader = UploadWorker(conn)
+    uploader.iniciar()
+
+    # Dependências fora deste conjunto já estão no MotherDuck (execução anterior)
+    nomes = {fonte.nome for fonte in fontes}
+    runner = DAGRunner([
+        TarefaDAG(
+            fonte.nome, partial(_executar_fonte, fonte, uploader, forcar_completa),
+            depende_de=[d for d in fonte.depende_de if d in nomes], timeout=fonte.timeout,
+            grupo=fonte.grupo, obrigatoria=fonte.obrigatoria
+        )
+        for fonte in fontes
+    ], limites_grupo=limites_grupo or LIMITES_GRUPO_PADRAO)
+
+    try:
+        tarefas = await runner.executar()
+    finally:
+        print("\nAguardando uploads pendentes para o MotherDuck...")
+        uploads = await uploader.finalizar()
+        conn.close()
+
+    return ResultadoExecucao(tarefas, uploads, [f.nome for f in fontes if f.obrigatoria])
+
+def imprimir_resultado(resultado: ResultadoExecucao, fontes: List[Fonte]):
+    """Imprime status das tarefas, falhas e registros por fonte"""
+    imprimir_resumo_dag(resultado.tarefas)
+    if resultado.falhas_obrigatorias:
+        print(f"ERRO: Fontes obrigatórias falharam: {', '.join(resultado.falhas_obrigatorias)}")
+    if resultado.falhas_upload:
+        print(f"ERRO: Falha no upload de: {', '.join(resultado.falhas_upload)}")
+    print("Resumo:")
+    for fonte in fontes:
+        print(f"   - {fonte.descricao}: {resultado.registros(fonte.nome):,} registros")
+
+def imprimir_tabelas_motherduck():
+    """Lista as tabelas do banco 'reservas' com a contagem de registros"""
+    conn = conectar_motherduck()
+    if conn is None:
+        return
+    try:
+        print("\nTabelas no banco 'reservas':")
+        for (tabela,) in conn.sql("SHOW TABLES").fetchall():
+            if tabela.endswith((SUFIXO_ANTERIOR, SUFIXO_STAGING)):
+                continue
+            try:
+                count = conn.sql(f"SELECT COUNT(*) FROM main.{tabela}").fetchone()[0]
+                print(f"   📊 {tabela}: {count:,} registros")
+            except Exception:
+                print(f"   📊 {tabela}: (erro ao contar)")
+    finally:
+        conn.close()
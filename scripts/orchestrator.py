@@ -4,22 +4,28 @@ Orquestrador de APIs
 Gerencia limites de requisições e coordena chamadas para múltiplas APIs
 """
 
+import os
 import time
+import random
 import asyncio
 import aiohttp
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Callable
-from dataclasses import dataclass
-from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from collections import defaultdict
+from email.utils import parsedate_to_datetime
 import threading
 
-from scripts.config import get_api_config, get_all_rate_limits
+from scripts.config import get_api_config, get_all_rate_limits, get_rate_limit_groups
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class ErroColetaIncompleta(Exception):
+    """Páginas/janelas continuaram falhando após as retentativas; os dados coletados estão incompletos"""
+
 @dataclass
 class RequestInfo:
     """Informações sobre uma requisição"""
@@ -29,131 +35,424 @@ class RequestInfo:
     response_time: float
 
 class RateLimiter:
-    """Controlador de taxa de requisições por API"""
+    """
+    Token bucket assíncrono por API (ou grupo de APIs com as mesmas credenciais)
+
+    - Reabastece `rate_limit / 60` tokens por segundo até `burst` tokens
+    - `acquire()` atende os coroutines em ordem de chegada (asyncio.Lock é FIFO),
+      evitando a corrida de checar-e-dormir sob `asyncio.gather`
+    """
     
-    def __init__(self, api_name: str, rate_limit: int):
+    def __init__(self, api_name: str, rate_limit: int, burst: Optional[int] = None):
         self.api_name = api_name
         self.rate_limit = rate_limit  # requests per minute
-        self.requests = deque()
-        self.lock = threading.Lock()
+        self.refill_rate = rate_limit / 60.0  # tokens per second
+        self.burst = burst or max(1, rate_limit // 12)
+        self.tokens = float(self.burst)
+        self.last_refill = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
     
-    def can_make_request(self) -> bool:
-        """Verifica se pode fazer uma nova requisição"""
-        with self.lock:
-            now = datetime.now()
-            # Remove requisições antigas (mais de 1 minuto)
-            while self.requests and (now - self.requests[0]).total_seconds() > 60:
-                self.requests.popleft()
-            
-            return len(self.requests) < self.rate_limit
+    def _get_lock(self) -> asyncio.Lock:
+        """Retorna o lock do event loop atual (o orquestrador global sobrevive a vários asyncio.run)"""
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
     
-    def record_request(self):
-        """Registra uma nova requisição"""
-        with self.lock:
-            self.requests.append(datetime.now())
+    def _refill(self):
+        """Adiciona os tokens acumulados desde o último reabastecimento"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.refill_rate)
+        self.last_refill = now
     
     def wait_time(self) -> float:
-        """Calcula tempo de espera necessário"""
-        with self.lock:
-            if len(self.requests) < self.rate_limit:
-                return 0
-            
-            # Tempo até a requisição mais antiga expirar
-            oldest_request = self.requests[0]
-            wait_seconds = 60 - (datetime.now() - oldest_request).total_seconds()
-            return max(0, wait_seconds)
+        """Calcula tempo de espera necessário para o próximo token"""
+        self._refill()
+        if self.tokens >= 1:
+            return 0
+        return (1 - self.tokens) / self.refill_rate
+    
+    async def acquire(self) -> float:
+        """Aguarda um token na fila e o consome; retorna o tempo esperado em segundos"""
+        waited = 0.0
+        async with self._get_lock():
+            wait = self.wait_time()
+            while wait > 0:
+                await asyncio.sleep(wait)
+                waited += wait
+                wait = self.wait_time()
+            self.tokens -= 1
+        return waited
+
+@dataclass
+class RetryPolicy:
+    """
+    Política de retentativa: backoff exponencial com jitter, respeitando Retry-After
+
+    - `retry_statuses`: status HTTP considerados transitórios
+    - `status_min_delay`: espera mínima por status (ex.: 429 nunca antes de 5s)
+    - Erros de rede/timeout também são retentados até `max_attempts`
+    """
+    max_attempts: int = 5
+    base_delay: float = 1.0
+    max_delay: float = 60.0
+    jitter: float = 0.5
+    retry_statuses: frozenset = frozenset({429, 500, 502, 503, 504})
+    status_min_delay: Dict[int, float] = field(default_factory=lambda: {429: 5.0})
+    
+    def should_retry(self, attempt: int, status: Optional[int] = None) -> bool:
+        """Indica se a tentativa `attempt` (1-based) pode ser repetida"""
+        if attempt >= self.max_attempts:
+            return False
+        return status is None or status in self.retry_statuses
+    
+    def delay(self, attempt: int, status: Optional[int] = None, retry_after: Optional[str] = None) -> float:
+        """Calcula a espera antes da próxima tentativa"""
+        backoff = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        backoff *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        
+        server_delay = self._parse_retry_after(retry_after)
+        if server_delay is not None:
+            backoff = max(backoff, server_delay)
+        
+        return max(backoff, self.status_min_delay.get(status, 0.0))
+    
+    @staticmethod
+    def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """Retry-After pode vir em segundos ou como data HTTP"""
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+            return max(0.0, (retry_at - datetime.now(retry_at.tzinfo)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+
+class CircuitBreaker:
+    """
+    Circuit breaker por API
+
+    Conta requisições lógicas que falharam (depois de esgotadas as retentativas
+    da RetryPolicy), não cada tentativa. Abre após `failure_threshold` falhas
+    consecutivas e rejeita chamadas por `recovery_timeout` segundos; depois
+    deixa passar uma única chamada de teste (meio-aberto) e fecha novamente se
+    ela tiver sucesso.
+    """
+    
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    
+    def __init__(self, api_name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.api_name = api_name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trips = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+    
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.recovery_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+    
+    def allow_request(self) -> bool:
+        """Verifica se o circuito permite uma nova chamada (no meio-aberto, só uma sonda por vez)"""
+        with self._lock:
+            state = self.state
+            if state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return state == self.CLOSED
+    
+    def release_probe(self):
+        """Libera a sonda do meio-aberto sem mudar o estado (ex.: resposta 4xx ou cancelamento)"""
+        with self._lock:
+            self._probe_in_flight = False
+    
+    def record_success(self):
+        """Fecha o circuito e zera o contador de falhas"""
+        with self._lock:
+            if self.opened_at is not None:
+                logger.info(f"🔌 Circuito de {self.api_name} fechado novamente")
+            self.failures = 0
+            self.opened_at = None
+            self._probe_in_flight = False
+    
+    def record_failure(self):
+        """Conta uma requisição que falhou e abre o circuito ao atingir o limite"""
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or (self.opened_at is None and self.failures >= self.failure_threshold):
+                self.opened_at = time.monotonic()
+                self.trips += 1
+                logger.error(
+                    f"🔌 Circuito de {self.api_name} aberto após {self.failures} requisições com falha "
+                    f"(pausa de {self.recovery_timeout:.0f}s)"
+                )
+            self._probe_in_flight = False
+
+@dataclass
+class ConnectionPoolConfig:
+    """Limites do pool de conexões HTTP compartilhado pelo orquestrador"""
+    limit: int = int(os.environ.get('HTTP_POOL_LIMIT', '100'))
+    limit_per_host: int = int(os.environ.get('HTTP_POOL_LIMIT_PER_HOST', '10'))
+    ttl_dns_cache: int = int(os.environ.get('HTTP_DNS_CACHE_TTL', '300'))
+    keepalive_timeout: float = float(os.environ.get('HTTP_KEEPALIVE_TIMEOUT', '30'))
 
 class APIOrchestrator:
     """Orquestrador principal para gerenciar chamadas de APIs"""
     
-    def __init__(self):
+    def __init__(self, pool_config: Optional[ConnectionPoolConfig] = None,
+                 retry_policy: Optional[RetryPolicy] = None):
         self.rate_limiters = {}
+        self.circuit_breakers: Dict[str, CircuitBreaker] = {}
         self.request_history = []
         self.lock = threading.Lock()
+        self.retry_policy = retry_policy or RetryPolicy()
         
-        # Inicializar rate limiters para cada API
+        # Pool de conexões (keep-alive + cache de DNS), aberto uma única vez por execução
+        self.pool_config = pool_config or ConnectionPoolConfig()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.connection_stats = {'new': 0, 'reused': 0}
+        
+        # Inicializar rate limiters para cada API; APIs do mesmo grupo
+        # (mesmas credenciais) compartilham um único orçamento
         rate_limits = get_all_rate_limits()
+        groups = get_rate_limit_groups()
+        limiters_por_grupo = {}
         for api_name, limit in rate_limits.items():
-            self.rate_limiters[api_name] = RateLimiter(api_name, limit)
+            group = groups.get(api_name, api_name)
+            if group not in limiters_por_grupo:
+                limiters_por_grupo[group] = RateLimiter(group, limit)
+            self.rate_limiters[api_name] = limiters_por_grupo[group]
         
         logger.info(f"Inicializado orquestrador para {len(self.rate_limiters)} APIs")
     
+    def _build_trace_config(self) -> aiohttp.TraceConfig:
+        """Cria trace config que contabiliza conexões novas x reutilizadas"""
+        trace_config = aiohttp.TraceConfig()
+        
+        async def on_connection_create_end(session, ctx, params):
+            self.connection_stats['new'] += 1
+        
+        async def on_connection_reuseconn(session, ctx, params):
+            self.connection_stats['reused'] += 1
+        
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace_config
+    
+    async def open(self):
+        """Abre a sessão HTTP compartilhada (pool de conexões por host)"""
+        loop = asyncio.get_running_loop()
+        if self._session is not None and not self._session.closed and self._session_loop is loop:
+            return
+        await self._fechar_sessao_anterior()
+        
+        connector = aiohttp.TCPConnector(
+            limit=self.pool_config.limit,
+            limit_per_host=self.pool_config.limit_per_host,
+            ttl_dns_cache=self.pool_config.ttl_dns_cache,
+            keepalive_timeout=self.pool_config.keepalive_timeout
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            trace_configs=[self._build_trace_config()]
+        )
+        self._session_loop = loop
+        logger.info(
+            f"Pool HTTP aberto (limit={self.pool_config.limit}, "
+            f"limit_per_host={self.pool_config.limit_per_host}, "
+            f"ttl_dns_cache={self.pool_config.ttl_dns_cache}s)"
+        )
+    
+    async def _fechar_sessao_anterior(self):
+        """
+        Fecha a sessão de um event loop anterior antes de substituí-la
+
+        O orquestrador global sobrevive a vários asyncio.run; se o loop antigo já
+        foi encerrado, os transportes não podem mais ser fechados nele, mas o
+        conector é marcado como fechado e as conexões são descartadas.
+        """
+        sessao = self._session
+        self._session = None
+        self._session_loop = None
+        if sessao is None or sessao.closed:
+            return
+        try:
+            await sessao.close()
+        except RuntimeError as e:
+            logger.debug(f"Sessão HTTP anterior fechada com o event loop já encerrado: {e}")
+    
+    async def close(self):
+        """Fecha a sessão HTTP compartilhada e libera as conexões do pool"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.info(
+                f"Pool HTTP fechado (conexões novas: {self.connection_stats['new']}, "
+                f"reutilizadas: {self.connection_stats['reused']})"
+            )
+        self._session = None
+        self._session_loop = None
+    
+    async def __aenter__(self):
+        await self.open()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Retorna a sessão compartilhada, abrindo-a se ainda não existir neste event loop"""
+        if self._session is None or self._session.closed or self._session_loop is not asyncio.get_running_loop():
+            await self.open()
+        return self._session
+    
+    def _get_circuit_breaker(self, api_name: str) -> CircuitBreaker:
+        """Retorna (criando se necessário) o circuit breaker da API"""
+        if api_name not in self.circuit_breakers:
+            self.circuit_breakers[api_name] = CircuitBreaker(api_name)
+        return self.circuit_breakers[api_name]
+    
+    def _record_history(self, api_name: str, success: bool, response_time: float):
+        """Registra uma tentativa no histórico de requisições"""
+        with self.lock:
+            self.request_history.append(RequestInfo(
+                timestamp=datetime.now(),
+                api_name=api_name,
+                success=success,
+                response_time=response_time
+            ))
+    
     async def make_request(self, api_name: str, url: str, headers: Dict[str, str], 
                           params: Optional[Dict] = None, data: Optional[Dict] = None) -> Dict[str, Any]:
-        """Faz uma requisição respeitando os limites de taxa"""
+        """Faz uma requisição respeitando os limites de taxa, com retentativas e circuit breaker"""
         
         rate_limiter = self.rate_limiters.get(api_name)
         if not rate_limiter:
             raise ValueError(f"Rate limiter não encontrado para API: {api_name}")
         
-        # Aguardar se necessário
-        wait_time = rate_limiter.wait_time()
-        if wait_time > 0:
-            logger.info(f"Aguardando {wait_time:.2f}s para API {api_name} (limite de taxa)")
-            await asyncio.sleep(wait_time)
-        
-        # Registrar requisição
-        rate_limiter.record_request()
+        breaker = self._get_circuit_breaker(api_name)
+        if not breaker.allow_request():
+            logger.warning(f"⛔ {api_name}: circuito aberto, requisição rejeitada")
+            return {
+                'success': False,
+                'error': f'Circuito aberto para {api_name}',
+                'circuit_open': True,
+                'response_time': 0,
+                'attempts': 0
+            }
+        # No meio-aberto, esta é a única chamada de teste admitida
+        sonda = breaker.state == CircuitBreaker.HALF_OPEN
         
-        # Fazer a requisição
-        start_time = time.time()
         try:
-            async with aiohttp.ClientSession() as session:
-                if data:
-                    async with session.post(url, headers=headers, json=data, params=params) as response:
-                        result = await response.json()
-                        success = response.status == 200
-                else:
-                    async with session.get(url, headers=headers, params=params) as response:
-                        result = await response.json()
-                        success = response.status == 200
-                        # Retry/backoff para 429
-                        if response.status == 429:
-                            retry_after = int(response.headers.get('Retry-After', '5'))
-                            wait = max(5, retry_after)
-                            logger.warning(f"429 em {api_name}. Aguardando {wait}s e tentando novamente...")
-                            await asyncio.sleep(wait)
-                            return await self.make_request(api_name, url, headers, params, data)
+            return await self._request_with_retries(api_name, url, headers, params, data, rate_limiter, breaker)
+        finally:
+            if sonda:
+                breaker.release_probe()
+    
+    async def _request_with_retries(self, api_name: str, url: str, headers: Dict[str, str],
+                                    params: Optional[Dict], data: Optional[Dict],
+                                    rate_limiter: RateLimiter, breaker: CircuitBreaker) -> Dict[str, Any]:
+        """Executa as tentativas de uma requisição lógica; o circuito recebe um único resultado"""
+        policy = self.retry_policy
+        attempt = 0
+        
+        while True:
+            attempt += 1
+            
+            # Aguardar token (fila FIFO compartilhada pelo grupo da API)
+            waited = await rate_limiter.acquire()
+            if waited > 0:
+                logger.debug(f"Aguardou {waited:.2f}s para API {api_name} (limite de taxa {rate_limiter.api_name})")
+            
+            # Fazer a requisição
+            start_time = time.time()
+            status = None
+            retry_after = None
+            try:
+                session = await self._get_session()
+                method = 'POST' if data else 'GET'
+                async with session.request(method, url, headers=headers, json=data, params=params) as response:
+                    status = response.status
+                    retry_after = response.headers.get('Retry-After')
+                    try:
+                        result = await response.json(content_type=None)
+                    except ValueError:
+                        result = None  # corpo não-JSON (ex.: página de erro HTML)
                 
                 response_time = time.time() - start_time
-                
-                # Registrar histórico
-                with self.lock:
-                    self.request_history.append(RequestInfo(
-                        timestamp=datetime.now(),
-                        api_name=api_name,
-                        success=success,
-                        response_time=response_time
-                    ))
+                success = status == 200 and result is not None
+                self._record_history(api_name, success, response_time)
                 
                 if success:
+                    breaker.record_success()
                     logger.info(f"✅ {api_name}: {response_time:.2f}s")
-                else:
-                    logger.warning(f"⚠️ {api_name}: Status {response.status}")
+                    return {
+                        'success': True,
+                        'data': result,
+                        'response_time': response_time,
+                        'status_code': status,
+                        'attempts': attempt
+                    }
                 
+                error = f'HTTP {status}' if status != 200 else 'Resposta JSON inválida'
+                
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                response_time = time.time() - start_time
+                self._record_history(api_name, False, response_time)
+                result = None
+                error = str(e) or type(e).__name__
+            
+            except Exception as e:
+                # Erro não relacionado à rede (ex.: URL inválida): não adianta repetir
+                response_time = time.time() - start_time
+                self._record_history(api_name, False, response_time)
+                logger.error(f"❌ {api_name}: Erro - {str(e)}")
                 return {
-                    'success': success,
-                    'data': result,
+                    'success': False,
+                    'error': str(e),
                     'response_time': response_time,
-                    'status_code': response.status if 'response' in locals() else None
+                    'attempts': attempt
                 }
-                
-        except Exception as e:
-            response_time = time.time() - start_time
-            logger.error(f"❌ {api_name}: Erro - {str(e)}")
             
-            with self.lock:
-                self.request_history.append(RequestInfo(
-                    timestamp=datetime.now(),
-                    api_name=api_name,
-                    success=False,
-                    response_time=response_time
-                ))
+            # Outras requisições abriram o circuito durante a espera: não insistir
+            if policy.should_retry(attempt, None if status == 200 else status) and \
+                    breaker.state != CircuitBreaker.OPEN:
+                wait = policy.delay(attempt, status, retry_after)
+                logger.warning(
+                    f"⚠️ {api_name}: {error} (tentativa {attempt}/{policy.max_attempts}). "
+                    f"Nova tentativa em {wait:.1f}s"
+                )
+                await asyncio.sleep(wait)
+                continue
+            
+            # Retentativas esgotadas: falhas transitórias (5xx, rede, JSON inválido)
+            # contam uma vez para o circuito; 429 é controle de taxa e 4xx é erro do cliente
+            if status is None or status >= 500 or status == 200:
+                breaker.record_failure()
             
+            logger.error(f"❌ {api_name}: {error} após {attempt} tentativa(s)")
             return {
                 'success': False,
-                'error': str(e),
-                'response_time': response_time
+                'error': error,
+                'data': result,
+                'response_time': response_time,
+                'status_code': status,
+                'attempts': attempt
             }
     
     def get_stats(self) -> Dict[str, Any]:
@@ -168,7 +467,15 @@ class APIOrchestrator:
                 'successful_requests': len([r for r in recent_requests if r.success]),
                 'failed_requests': len([r for r in recent_requests if not r.success]),
                 'avg_response_time': sum(r.response_time for r in recent_requests) / len(recent_requests) if recent_requests else 0,
-                'by_api': defaultdict(lambda: {'total': 0, 'success': 0, 'failed': 0})
+                'by_api': defaultdict(lambda: {'total': 0, 'success': 0, 'failed': 0}),
+                'connections': {
+                    'new': self.connection_stats['new'],
+                    'reused': self.connection_stats['reused']
+                },
+                'circuit_breakers': {
+                    api_name: {'state': cb.state, 'failures': cb.failures, 'trips': cb.trips}
+                    for api_name, cb in self.circuit_breakers.items()
+                }
             }
             
             for req in recent_requests:
@@ -188,11 +495,16 @@ class APIOrchestrator:
         print(f"Sucessos: {stats['successful_requests']}")
         print(f"Falhas: {stats['failed_requests']}")
         print(f"Tempo médio de resposta: {stats['avg_response_time']:.2f}s")
+        print(f"Conexões novas: {stats['connections']['new']} | reutilizadas: {stats['connections']['reused']}")
         
         print("\nPor API:")
         for api_name, api_stats in stats['by_api'].items():
             success_rate = (api_stats['success'] / api_stats['total'] * 100) if api_stats['total'] > 0 else 0
             print(f"  {api_name}: {api_stats['total']} req, {success_rate:.1f}% sucesso")
+        
+        for api_name, cb_stats in stats['circuit_breakers'].items():
+            if cb_stats['trips']:
+                print(f"  Circuito {api_name}: {cb_stats['state']} ({cb_stats['trips']} abertura(s))")
 
 # Instância global do orquestrador
 orchestrator = APIOrchestrator()
@@ -218,5 +530,6 @@ if __name__ == "__main__":
         
         # Imprimir estatísticas
         orchestrator.print_stats()
+        await orchestrator.close()
     
     asyncio.run(test_orchestrator())
@@ -103,15 +103,15 @@ def obter_lista_empreendimentos_motherduck() -> List[Dict[str, Any]]:
 class SiengeAPIClient:
     """Cliente para APIs do Sienge com controle de limite diário"""
     
-    def __init__(self):
+    def __init__(self, empreendimentos: Optional[List[Dict[str, Any]]] = None):
         self.config_vendas = get_api_config('sienge_vendas_realizadas')
         self.config_canceladas = get_api_config('sienge_vendas_canceladas')
         
         if not self.config_vendas or not self.config_canceladas:
             raise ValueError("Configurações do Sienge não encontradas")
         
-        # Carregar lista de empreendimentos
-        self.empreendimentos = obter_lista_empreendimentos_motherduck()
+        # Carregar lista de empreendimentos (ou reutilizar a lista já carregada pelo chamador)
+        self.empreendimentos = empreendimentos if empreendimentos is not None else obter_lista_empreendimentos_motherduck()
         
         # Controle de limite diário (40 requisições por dia, 16 por execução)
         self.limite_diario = 40
@@ -311,6 +311,33 @@ class SiengeAPIClient:
         
         return result
     
+    async def buscar_vendas_empreendimento(self, empreendimento: Dict[str, Any], situacao: str,
+                                           data_fim: str) -> Dict[str, Any]:
+        """
+        Busca vendas de um único empreendimento, sem o controle de limite em memória
+        (o orçamento diário é controlado pelo ledger do SiengeScheduler)
+        
+        Args:
+            empreendimento: Dicionário com 'id' e 'nome'
+            situacao: 'SOLD' (realizadas) ou 'CANCELED' (canceladas)
+            data_fim: Data de fim (YYYY-MM-DD)
+        """
+        api_name = 'sienge_vendas_realizadas' if situacao == 'SOLD' else 'sienge_vendas_canceladas'
+        
+        if self.modo_teste:
+            logger.info(f"🧪 MODO TESTE - Retornando dados simulados para {api_name}")
+            return {'success': True, 'data': {'dados': []}, 'modo_teste': True, 'attempts': 0}
+        
+        params = {
+            'enterpriseId': int(empreendimento['id']),  # ID como inteiro
+            'createdAfter': '2020-01-01',  # Data inicial fixa (como no Power BI)
+            'createdBefore': data_fim,     # Data final (atualizada)
+            'situation': situacao
+        }
+        
+        logger.info(f"🔍 {api_name}: {empreendimento['nome']} (ID: {empreendimento['id']})")
+        return await make_api_request(api_name, "", params)
+    
     def processar_dados_vendas_realizadas(self, dados: List[Dict[str, Any]]) -> pd.DataFrame:
         """
         Processa dados de vendas realizadas baseado no código M do Power BI
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Paginação paralela para APIs REST do Sienge (offset/limit)
+Usado por Contratos de Suprimentos e Pedidos de Compras:
+- Divide o período em janelas de datas (padrão: trimestres) quando o filtro de
+  datas da API atua sobre um único campo; sem janelas, busca o período inteiro
+- Busca as janelas em paralelo via orquestrador (aiohttp, sem bloquear o event loop)
+- Usa resultSetMetadata.count da primeira página de cada janela para
+  agendar os offsets restantes em paralelo
+- Qualquer página que falhe (após as retentativas do orquestrador) invalida a
+  coleta: ErroColetaIncompleta em vez de um conjunto parcial
+"""
+
+import asyncio
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from scripts.orchestrator import make_api_request, ErroColetaIncompleta
+
+logger = logging.getLogger(__name__)
+
+def gerar_janelas(data_inicio: str, data_fim: str, meses_por_janela: int = 3) -> List[Tuple[str, str]]:
+    """
+    Divide [data_inicio, data_fim] em janelas contíguas e sem sobreposição
+
+    Args:
+        data_inicio: Data de início (YYYY-MM-DD)
+        data_fim: Data de fim (YYYY-MM-DD)
+        meses_por_janela: Tamanho de cada janela em meses (3 = trimestre)
+
+    Returns:
+        List[Tuple[str, str]]: Lista de (inicio, fim) no formato YYYY-MM-DD
+    """
+    inicio = datetime.strptime(data_inicio, '%Y-%m-%d').date()
+    fim = datetime.strptime(data_fim, '%Y-%m-%d').date()
+    janelas = []
+
+    while inicio <= fim:
+        mes = inicio.month - 1 + meses_por_janela
+        proximo = date(inicio.year + mes // 12, mes % 12 + 1, 1)
+        fim_janela = min(proximo - timedelta(days=1), fim)
+        janelas.append((inicio.strftime('%Y-%m-%d'), fim_janela.strftime('%Y-%m-%d')))
+        inicio = proximo
+
+    return janelas
+
+async def buscar_periodo_paralelo(api_name: str,
+                                  montar_params: Callable[[str, str, int, int], Dict[str, Any]],
+                                  data_inicio: str,
+                                  data_fim: str,
+                                  limit: int = 200,
+                                  meses_por_janela: Optional[int] = 3,
+                                  max_concorrencia: int = 4,
+                                  chave: Optional[Callable[[Dict], Any]] = None) -> List[Dict]:
+    """
+    Busca todos os registros do período, janela a janela, em paralelo
+
+    Args:
+        api_name: Nome da API no orquestrador (define URL, headers e rate limit)
+        montar_params: Função (inicio, fim, limit, offset) -> parâmetros da requisição
+        data_inicio: Data de início (YYYY-MM-DD)
+        data_fim: Data de fim (YYYY-MM-DD)
+        limit: Registros por requisição (máximo 200 no Sienge)
+        meses_por_janela: Tamanho das janelas em meses. Só particione quando o
+            par início/fim filtrar um único campo de data (ex.: data do pedido);
+            None busca o período inteiro numa janela só
+        max_concorrencia: Requisições simultâneas (somando todas as janelas)
+        chave: Função que extrai a chave do registro para remover duplicatas
+
+    Returns:
+        List[Dict]: Registros em ordem de janela e offset
+
+    Raises:
+        ErroColetaIncompleta: Se alguma página falhar
+    """
+    if meses_por_janela:
+        janelas = gerar_janelas(data_inicio, data_fim, meses_por_janela)
+    else:
+        janelas = [(data_inicio, data_fim)]
+    semaforo = asyncio.Semaphore(max_concorrencia)
+    falhas = []
+
+    async def buscar_pagina(inicio: str, fim: str, offset: int) -> Optional[Dict]:
+        async with semaforo:
+            result = await make_api_request(api_name, '', montar_params(inicio, fim, limit, offset))
+        if not result['success'] or not isinstance(result.get('data'), dict):
+            logger.error(f"{api_name}: erro na janela {inicio} a {fim}, offset {offset}: {result.get('error')}")
+            falhas.append((inicio, fim, offset))
+            return None
+        return result['data']
+
+    async def buscar_janela(inicio: str, fim: str) -> List[Dict]:
+        primeira = await buscar_pagina(inicio, fim, 0)
+        if not primeira or not primeira.get('results'):
+            return []
+
+        registros = list(primeira['results'])
+        total_count = primeira.get('resultSetMetadata', {}).get('count', len(registros))
+        offsets = list(range(limit, total_count, limit))
+        logger.info(f"{api_name}: janela {inicio} a {fim} - {total_count} registros ({len(offsets) + 1} páginas)")
+
+        paginas = await asyncio.gather(*(buscar_pagina(inicio, fim, offset) for offset in offsets))
+        for pagina in paginas:
+            if pagina:
+                registros.extend(pagina.get('results', []))
+        return registros
+
+    logger.info(f"{api_name}: {len(janelas)} janelas de {data_inicio} a {data_fim} (concorrência {max_concorrencia})")
+    por_janela = await asyncio.gather(*(buscar_janela(inicio, fim) for inicio, fim in janelas))
+
+    if falhas:
+        raise ErroColetaIncompleta(
+            f"{api_name}: {len(falhas)} páginas com erro (janela, offset): {falhas[:10]}"
+        )
+
+    todos: List[Dict] = []
+    vistos = set()
+    for registros in por_janela:
+        for registro in registros:
+            if chave is not None:
+                k = chave(registro)
+                if k in vistos:
+                    continue
+                vistos.add(k)
+            todos.append(registro)
+
+    logger.info(f"{api_name}: total de {len(todos)} registros")
+    return todos
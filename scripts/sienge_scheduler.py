@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Agendador de requisições Sienge (bulk-data /sales) com controle de cota diária
+- Ledger persistido no MotherDuck (reservas.main.sienge_request_ledger): a cota de
+  40 requisições/dia vale entre execuções, não apenas dentro de um processo
+- Lista de empreendimentos carregada uma única vez e compartilhada entre
+  vendas realizadas e canceladas
+- Empreendimentos com vendas recentes têm prioridade quando a cota não é suficiente
+- Espaçamento apenas pelo rate limit do orquestrador (sem pausas fixas)
+"""
+
+import os
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from scripts.sienge_apis import SiengeAPIClient, obter_lista_empreendimentos_motherduck, _extrair_registros
+from scripts.sync_state import conectar_motherduck
+
+logger = logging.getLogger(__name__)
+
+LEDGER_TABLE = 'main.sienge_request_ledger'
+LIMITE_DIARIO_PADRAO = 40
+
+SITUACOES = ('SOLD', 'CANCELED')
+
+# Empreendimento fixo (não está em cv_vendas)
+EMPREENDIMENTO_FIXO = {'id': 19, 'nome': 'Ondina II'}
+
+@dataclass
+class TarefaSienge:
+    """Uma requisição planejada: um empreendimento em uma situação"""
+    empreendimento: Dict[str, Any]
+    situacao: str
+
+@dataclass
+class ResultadoSituacao:
+    """Resultado das requisições de uma situação (SOLD/CANCELED)"""
+    dados: List[Dict[str, Any]] = field(default_factory=list)
+    empreendimentos_ok: List[str] = field(default_factory=list)
+    empreendimentos_adiados: List[str] = field(default_factory=list)
+    empreendimentos_com_erro: List[str] = field(default_factory=list)
+
+    @property
+    def completo(self) -> bool:
+        """Todos os empreendimentos foram consultados com sucesso"""
+        return not self.empreendimentos_adiados and not self.empreendimentos_com_erro
+
+class SiengeLedger:
+    """Registro persistente das requisições feitas ao Sienge por dia"""
+
+    def __init__(self, conn=None, limite_diario: int = LIMITE_DIARIO_PADRAO):
+        self.conn = conn
+        self.limite_diario = limite_diario
+        self._usadas_memoria = 0
+        if self.conn is not None:
+            self.conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {LEDGER_TABLE} (
+                    registrado_em TIMESTAMP,
+                    dia DATE,
+                    api VARCHAR,
+                    enterprise_id VARCHAR,
+                    requisicoes INTEGER,
+                    sucesso BOOLEAN
+                )
+            """)
+        else:
+            logger.warning("Ledger Sienge sem MotherDuck - contagem apenas em memória")
+
+    def usadas_hoje(self) -> int:
+        """Requisições já consumidas hoje (todas as execuções)"""
+        if self.conn is None:
+            return self._usadas_memoria
+        row = self.conn.execute(
+            f"SELECT COALESCE(SUM(requisicoes), 0) FROM {LEDGER_TABLE} WHERE dia = ?",
+            [date.today()]
+        ).fetchone()
+        return int(row[0])
+
+    def restantes(self) -> int:
+        """Requisições ainda disponíveis hoje"""
+        return max(0, self.limite_diario - self.usadas_hoje())
+
+    def registrar(self, api: str, enterprise_id: Any, requisicoes: int, sucesso: bool):
+        """Registra requisições consumidas (inclui retentativas do orquestrador)"""
+        if self.conn is None:
+            self._usadas_memoria += requisicoes
+            return
+        self.conn.execute(
+            f"INSERT INTO {LEDGER_TABLE} VALUES (?, ?, ?, ?, ?, ?)",
+            [datetime.now(), date.today(), api, str(enterprise_id), requisicoes, sucesso]
+        )
+
+def obter_empreendimentos_priorizados(conn) -> List[Dict[str, Any]]:
+    """
+    Lista de empreendimentos (uma linha por enterpriseId) ordenada por atividade recente
+
+    Prioridade: mais vendas nos últimos 90 dias e venda mais recente primeiro.
+    Sem conexão ou sem a coluna data_venda, usa a lista padrão sem prioridade.
+    """
+    empreendimentos: List[Dict[str, Any]] = []
+    try:
+        if conn is None:
+            raise RuntimeError("sem conexão com o MotherDuck")
+        rows = conn.execute("""
+            SELECT
+                codigointerno_empreendimento,
+                ANY_VALUE(empreendimento) AS empreendimento,
+                COUNT(*) FILTER (WHERE TRY_CAST(data_venda AS DATE) >= current_date - INTERVAL 90 DAY) AS vendas_recentes,
+                MAX(TRY_CAST(data_venda AS DATE)) AS ultima_venda
+            FROM main.cv_vendas
+            WHERE codigointerno_empreendimento IS NOT NULL
+            GROUP BY codigointerno_empreendimento
+            ORDER BY vendas_recentes DESC, ultima_venda DESC NULLS LAST
+        """).fetchall()
+        empreendimentos = [
+            {'id': row[0], 'nome': row[1], 'vendas_recentes': row[2], 'ultima_venda': row[3]}
+            for row in rows
+        ]
+    except Exception as e:
+        logger.warning(f"Não foi possível priorizar empreendimentos ({e}); usando lista padrão")
+        vistos = set()
+        for emp in obter_lista_empreendimentos_motherduck():
+            if str(emp['id']) not in vistos:
+                vistos.add(str(emp['id']))
+                empreendimentos.append({**emp, 'vendas_recentes': 0, 'ultima_venda': None})
+
+    if str(EMPREENDIMENTO_FIXO['id']) not in {str(e['id']) for e in empreendimentos}:
+        empreendimentos.append({**EMPREENDIMENTO_FIXO, 'vendas_recentes': 0, 'ultima_venda': None})
+
+    return empreendimentos
+
+def planejar_tarefas(empreendimentos: List[Dict[str, Any]], orcamento: int) -> Tuple[List[TarefaSienge], List[TarefaSienge]]:
+    """
+    Distribui o orçamento entre os empreendimentos, em ordem de prioridade
+
+    Cada empreendimento recebe as duas situações juntas (realizadas e canceladas),
+    para que ambas as tabelas reflitam o mesmo momento.
+
+    Returns:
+        Tuple[List[TarefaSienge], List[TarefaSienge]]: (planejadas, adiadas)
+    """
+    todas = [TarefaSienge(emp, situacao) for emp in empreendimentos for situacao in SITUACOES]
+    return todas[:orcamento], todas[orcamento:]
+
+class SiengeScheduler:
+    """Executa as requisições de vendas Sienge dentro da cota diária"""
+
+    def __init__(self, conn=None, limite_diario: Optional[int] = None):
+        self.conn = conn if conn is not None else conectar_motherduck()
+        limite = limite_diario or int(os.environ.get('SIENGE_LIMITE_DIARIO', LIMITE_DIARIO_PADRAO))
+        self.ledger = SiengeLedger(self.conn, limite)
+        self.empreendimentos = obter_empreendimentos_priorizados(self.conn)
+        self.client = SiengeAPIClient(empreendimentos=self.empreendimentos)
+
+    async def executar(self, data_fim: Optional[str] = None) -> Dict[str, ResultadoSituacao]:
+        """
+        Planeja e executa as requisições de realizadas e canceladas
+
+        Returns:
+            Dict[str, ResultadoSituacao]: Resultado por situação ('SOLD', 'CANCELED')
+        """
+        data_fim = data_fim or datetime.now().strftime('%Y-%m-%d')
+        restantes = self.ledger.restantes()
+        planejadas, adiadas = planejar_tarefas(self.empreendimentos, restantes)
+
+        logger.info(f"📊 Cota Sienge: {restantes}/{self.ledger.limite_diario} requisições disponíveis hoje")
+        logger.info(f"   - Planejadas: {len(planejadas)} | Adiadas: {len(adiadas)}")
+
+        resultados = {situacao: ResultadoSituacao() for situacao in SITUACOES}
+        for tarefa in adiadas:
+            resultados[tarefa.situacao].empreendimentos_adiados.append(str(tarefa.empreendimento['id']))
+
+        for i, tarefa in enumerate(planejadas, 1):
+            emp = tarefa.empreendimento
+            # Re-checar a cota: retentativas do orquestrador também consomem requisições
+            if self.ledger.restantes() <= 0:
+                logger.warning(f"Cota diária esgotada - adiando {emp['nome']} ({tarefa.situacao})")
+                resultados[tarefa.situacao].empreendimentos_adiados.append(str(emp['id']))
+                continue
+
+            logger.info(f"📊 [{i}/{len(planejadas)}] {emp['nome']} (ID: {emp['id']}) - {tarefa.situacao}")
+            result = await self.client.buscar_vendas_empreendimento(emp, tarefa.situacao, data_fim)
+            sucesso = result.get('success', False)
+            self.ledger.registrar(
+                'sienge_vendas_realizadas' if tarefa.situacao == 'SOLD' else 'sienge_vendas_canceladas',
+                emp['id'], result.get('attempts', 1), sucesso
+            )
+
+            if sucesso:
+                dados = _extrair_registros(result)
+                resultados[tarefa.situacao].dados.extend(dados)
+                resultados[tarefa.situacao].empreendimentos_ok.append(str(emp['id']))
+                logger.info(f"   ✅ {len(dados)} registros encontrados")
+            else:
+                resultados[tarefa.situacao].empreendimentos_com_erro.append(str(emp['id']))
+                logger.error(f"   ❌ Erro: {result.get('error', 'Erro desconhecido')}")
+
+        return resultados
+
+async def obter_dados_sienge_vendas_agendado(data_fim: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Obtém vendas realizadas e canceladas do Sienge respeitando a cota diária persistida
+
+    Returns:
+        Dict com 'vendas_realizadas'/'vendas_canceladas' (DataFrames) e
+        'resultado' (ResultadoSituacao por situação, para a carga parcial)
+    """
+    # Conexão, ledger e priorização consultam o MotherDuck: fora do event loop
+    scheduler = await asyncio.to_thread(SiengeScheduler)
+    try:
+        resultados = await scheduler.executar(data_fim)
+    finally:
+        if scheduler.conn is not None:
+            scheduler.conn.close()
+
+    return {
+        'vendas_realizadas': scheduler.client.processar_dados_vendas_realizadas(resultados['SOLD'].dados),
+        'vendas_canceladas': scheduler.client.processar_dados_vendas_canceladas(resultados['CANCELED'].dados),
+        'resultado': resultados
+    }
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Estado de sincronização incremental (delta sync)
+Guarda no MotherDuck a marca d'água (high-water mark) de cada fonte e
+decide, a cada execução, entre carga incremental e carga completa.
+
+Tabela: reservas.main.sync_state
+- fonte: nome da fonte (ex.: 'cv_leads')
+- watermark: maior data de referência já carregada
+- ultima_carga_completa: quando a última carga completa foi feita
+- atualizado_em: última atualização do registro
+
+Tabela: reservas.main.log_alteracoes (change log dos loaders)
+- tabela: tabela carregada (sem schema, ex.: 'sienge_vendas_realizadas')
+- chave: chave natural inserida/alterada/removida (NULL = tabela inteira substituída)
+- registrado_em: momento do registro
+"""
+
+import os
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, List, Optional, Tuple
+
+import duckdb
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+SYNC_STATE_TABLE = 'main.sync_state'
+
+LOG_ALTERACOES_TABLE = 'main.log_alteracoes'
+
+MODO_COMPLETO = 'completo'
+MODO_INCREMENTAL = 'incremental'
+
+@dataclass
+class EstadoSync:
+    """Estado persistido de uma fonte"""
+    fonte: str
+    watermark: Optional[datetime]
+    ultima_carga_completa: Optional[datetime]
+    atualizado_em: Optional[datetime]
+
+def conectar_motherduck(database: str = 'reservas'):
+    """Abre conexão com o MotherDuck (retorna None sem MOTHERDUCK_TOKEN)"""
+    token = os.environ.get('MOTHERDUCK_TOKEN', '').strip()
+    if not token:
+        return None
+    os.environ['motherduck_token'] = token
+    return duckdb.connect(f'md:{database}')
+
+def garantir_tabela_estado(conn):
+    """Cria a tabela de estado caso ainda não exista"""
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {SYNC_STATE_TABLE} (
+            fonte VARCHAR PRIMARY KEY,
+            watermark TIMESTAMP,
+            ultima_carga_completa TIMESTAMP,
+            atualizado_em TIMESTAMP
+        )
+    """)
+
+def garantir_tabela_log(conn):
+    """Cria a tabela do change log caso ainda não exista"""
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {LOG_ALTERACOES_TABLE} (
+            tabela VARCHAR,
+            chave VARCHAR,
+            registrado_em TIMESTAMP
+        )
+    """)
+
+def registrar_alteracoes(conn, tabela: str, consulta_chaves: Optional[str] = None):
+    """
+    Registra no change log as chaves afetadas por uma carga
+
+    Chamado pelos loaders dentro da própria transação da carga, para que o log
+    e os dados fiquem consistentes. A tabela do log precisa existir antes da
+    transação (garantir_tabela_log).
+
+    Args:
+        conn: Conexão com o MotherDuck
+        tabela: Tabela carregada (o schema é descartado)
+        consulta_chaves: SELECT de uma coluna com as chaves afetadas; None registra
+            a substituição da tabela inteira
+    """
+    nome = tabela.split('.')[-1]
+    if consulta_chaves is None:
+        conn.execute(
+            f"INSERT INTO {LOG_ALTERACOES_TABLE} VALUES (?, NULL, current_localtimestamp())", [nome]
+        )
+        return
+    conn.execute(f"""
+        INSERT INTO {LOG_ALTERACOES_TABLE}
+        SELECT DISTINCT ?, CAST(chave AS VARCHAR), current_localtimestamp()
+        FROM ({consulta_chaves}) AS alteradas(chave)
+        WHERE chave IS NOT NULL
+    """, [nome])
+
+def limpar_log_alteracoes(conn, dias: Optional[int] = None):
+    """Remove do change log os registros mais antigos que LOG_ALTERACOES_RETENCAO_DIAS (padrão 7)"""
+    dias = dias if dias is not None else int(os.environ.get('LOG_ALTERACOES_RETENCAO_DIAS', '7'))
+    garantir_tabela_log(conn)
+    conn.execute(
+        f"DELETE FROM {LOG_ALTERACOES_TABLE} WHERE registrado_em < current_localtimestamp() - to_days(?)", [dias]
+    )
+
+def ler_estado_sync(fonte: str, conn=None) -> Optional[EstadoSync]:
+    """
+    Lê o estado de sincronização de uma fonte
+
+    Args:
+        fonte: Nome da fonte (ex.: 'cv_leads')
+        conn: Conexão existente; se omitida, abre e fecha uma conexão própria
+    """
+    conexao_propria = conn is None
+    try:
+        if conexao_propria:
+            conn = conectar_motherduck()
+            if conn is None:
+                return None
+        garantir_tabela_estado(conn)
+        row = conn.execute(
+            f"SELECT fonte, watermark, ultima_carga_completa, atualizado_em FROM {SYNC_STATE_TABLE} WHERE fonte = ?",
+            [fonte]
+        ).fetchone()
+        return EstadoSync(*row) if row else None
+    except Exception as e:
+        logger.warning(f"Não foi possível ler o estado de sync de {fonte}: {e}")
+        return None
+    finally:
+        if conexao_propria and conn is not None:
+            conn.close()
+
+def salvar_estado_sync(conn, fonte: str, watermark: Optional[datetime], carga_completa: bool):
+    """
+    Grava a nova marca d'água da fonte (mantém a anterior se `watermark` for None)
+
+    Args:
+        conn: Conexão com o MotherDuck
+        fonte: Nome da fonte
+        watermark: Maior data de referência carregada nesta execução
+        carga_completa: Se esta execução foi uma carga completa
+    """
+    garantir_tabela_estado(conn)
+    agora = datetime.now()
+    conn.execute(f"""
+        INSERT INTO {SYNC_STATE_TABLE} (fonte, watermark, ultima_carga_completa, atualizado_em)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT (fonte) DO UPDATE SET
+            watermark = COALESCE(excluded.watermark, {SYNC_STATE_TABLE}.watermark),
+            ultima_carga_completa = COALESCE(excluded.ultima_carga_completa, {SYNC_STATE_TABLE}.ultima_carga_completa),
+            atualizado_em = excluded.atualizado_em
+    """, [fonte, watermark, agora if carga_completa else None, agora])
+    logger.info(f"Estado de sync salvo - {fonte}: watermark={watermark}, carga_completa={carga_completa}")
+
+def planejar_sync(estado: Optional[EstadoSync],
+                  dias_carga_completa: int = 7,
+                  overlap_dias: int = 1,
+                  forcar_completa: bool = False) -> Tuple[str, Optional[str]]:
+    """
+    Decide o modo de sincronização da execução atual
+
+    Carga completa quando não há estado/watermark, quando forçada, ou quando a
+    última carga completa tem mais de `dias_carga_completa` dias. Caso contrário,
+    incremental a partir de `watermark - overlap_dias` (cobre atualizações tardias).
+
+    Returns:
+        Tuple[str, Optional[str]]: (modo, data 'YYYY-MM-DD' de início ou None)
+    """
+    if forcar_completa or estado is None or estado.watermark is None:
+        return MODO_COMPLETO, None
+
+    if estado.ultima_carga_completa is None or \
+            datetime.now() - estado.ultima_carga_completa >= timedelta(days=dias_carga_completa):
+        return MODO_COMPLETO, None
+
+    a_partir = (estado.watermark - timedelta(days=overlap_dias)).strftime('%Y-%m-%d')
+    return MODO_INCREMENTAL, a_partir
+
+def calcular_watermark(df: pd.DataFrame, coluna: str) -> Optional[datetime]:
+    """Maior valor da coluna de referência no DataFrame (None se vazio)"""
+    if df is None or df.empty or coluna not in df.columns:
+        return None
+    maximo = pd.to_datetime(df[coluna], errors='coerce').max()
+    return None if pd.isna(maximo) else maximo.to_pydatetime()
+
+def mesclar_por_chave(conn, df: pd.DataFrame, tabela: str, chave: str,
+                      chaves_removidas: Optional[List[Any]] = None) -> int:
+    """
+    Mescla (upsert) o DataFrame na tabela pela chave natural
+
+    Remove da tabela as linhas cujas chaves vieram no DataFrame (ou em
+    `chaves_removidas`, registros que saíram do filtro da fonte) e insere as
+    novas versões, numa única transação. Colunas novas (ex.: campos dinâmicos)
+    são adicionadas à tabela; colunas ausentes no DataFrame ficam nulas.
+
+    Returns:
+        int: Número de linhas mescladas
+    """
+    if df.empty and chave not in df.columns:
+        # Apenas remoções (ex.: todos os registros da janela saíram do filtro)
+        df = pd.DataFrame({chave: pd.Series(dtype=str)})
+    df = df.drop_duplicates(subset=[chave], keep='last')
+    conn.register('df_mesclar', df)
+    try:
+        tipos_tabela = {r[0]: r[1] for r in conn.execute(f"DESCRIBE {tabela}").fetchall()}
+        tipos_df = conn.execute("DESCRIBE SELECT * FROM df_mesclar").fetchall()
+        garantir_tabela_log(conn)
+
+        conn.execute("BEGIN TRANSACTION")
+        try:
+            for coluna, tipo, *_ in tipos_df:
+                if coluna not in tipos_tabela:
+                    conn.execute(f'ALTER TABLE {tabela} ADD COLUMN "{coluna}" {tipo}')
+            tipo_chave = tipos_tabela.get(chave, 'VARCHAR')
+            chaves_df = f'SELECT TRY_CAST("{chave}" AS {tipo_chave}) FROM df_mesclar'
+            registrar_alteracoes(conn, tabela, chaves_df)
+            conn.execute(f'DELETE FROM {tabela} WHERE "{chave}" IN ({chaves_df})')
+            if chaves_removidas:
+                conn.register('df_chaves_removidas', pd.DataFrame({chave: pd.Series(chaves_removidas).astype(str)}))
+                filtro_removidas = f'CAST("{chave}" AS VARCHAR) IN (SELECT "{chave}" FROM df_chaves_removidas)'
+                registrar_alteracoes(conn, tabela, f'SELECT "{chave}" FROM {tabela} WHERE {filtro_removidas}')
+                conn.execute(f'DELETE FROM {tabela} WHERE {filtro_removidas}')
+                conn.unregister('df_chaves_removidas')
+            conn.execute(f"INSERT INTO {tabela} BY NAME SELECT * FROM df_mesclar")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.unregister('df_mesclar')
+
+    return len(df)
+
+def substituir_particoes(conn, df: pd.DataFrame, tabela: str, coluna: str, valores: List[Any],
+                         chave: Optional[str] = None) -> int:
+    """
+    Substitui apenas as partições (ex.: enterpriseId) atualizadas nesta execução
+
+    Apaga da tabela as linhas cujo valor de `coluna` está em `valores` e insere
+    as linhas novas, numa única transação. As demais partições são mantidas.
+    Com `chave`, o change log recebe as chaves apagadas e inseridas; sem ela,
+    registra a tabela inteira como alterada. Antes de apagar, aplica a
+    verificação de queda de volume da carga atômica (CARGA_QUEDA_MAXIMA).
+
+    Returns:
+        int: Número de linhas inseridas
+
+    Raises:
+        ErroValidacaoCarga: Se a substituição derrubar a tabela além do limite
+    """
+    # Import tardio: carga_atomica importa este módulo
+    from scripts.carga_atomica import verificar_queda_volume
+
+    if df.empty and not len(df.columns):
+        # Partições consultadas sem nenhum registro: só apaga
+        df = pd.DataFrame({coluna: pd.Series(dtype=str)})
+    conn.register('df_particoes', df)
+    conn.register('df_valores_particao', pd.DataFrame({coluna: [str(v) for v in valores]}))
+    try:
+        garantir_tabela_log(conn)
+        conn.execute("BEGIN TRANSACTION")
+        try:
+            filtro = f'CAST("{coluna}" AS VARCHAR) IN (SELECT "{coluna}" FROM df_valores_particao)'
+            atuais, apagadas = conn.execute(
+                f"SELECT COUNT(*), COUNT(*) FILTER (WHERE {filtro}) FROM {tabela}"
+            ).fetchone()
+            verificar_queda_volume(tabela, atuais - apagadas + len(df), atuais)
+            if chave is None:
+                registrar_alteracoes(conn, tabela)
+            else:
+                registrar_alteracoes(conn, tabela, f'SELECT "{chave}" FROM {tabela} WHERE {filtro}')
+                if not df.empty:
+                    registrar_alteracoes(conn, tabela, f'SELECT "{chave}" FROM df_particoes')
+            conn.execute(f'DELETE FROM {tabela} WHERE {filtro}')
+            if not df.empty:
+                conn.execute(f"INSERT INTO {tabela} BY NAME SELECT * FROM df_particoes")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.unregister('df_particoes')
+        conn.unregister('df_valores_particao')
+
+    return len(df)
+
+# Colunas de controle que mudam a cada execução e não indicam alteração do registro
+COLUNAS_IGNORADAS_DIFF = ('processado_em',)
+
+@dataclass
+class ResultadoUpsert:
+    """Contagem de linhas afetadas por aplicar_upsert"""
+    inseridos: int = 0
+    atualizados: int = 0
+    removidos: int = 0
+    inalterados: int = 0
+
+    def __str__(self) -> str:
+        return (f"+{self.inseridos:,} inseridos, ~{self.atualizados:,} atualizados, "
+                f"-{self.removidos:,} removidos, ={self.inalterados:,} inalterados")
+
+def aplicar_upsert(conn, df: pd.DataFrame, tabela: str, chave: str,
+                   detectar_remocoes: bool = True,
+                   ignorar_colunas: Tuple[str, ...] = COLUNAS_IGNORADAS_DIFF) -> ResultadoUpsert:
+    """
+    Aplica um snapshot completo na tabela pela chave natural (semântica de MERGE)
+
+    Só as linhas novas ou alteradas são reescritas; as inalteradas não são
+    tocadas, e a tabela nunca deixa de existir durante a carga. Com
+    `detectar_remocoes`, chaves que sumiram do snapshot são apagadas — passe
+    True apenas quando o coletor confirmou que o snapshot está completo. Antes
+    de apagar, a mesma verificação de queda de volume da carga atômica
+    (CARGA_QUEDA_MAXIMA) é aplicada. Tudo numa única transação.
+
+    Returns:
+        ResultadoUpsert: Linhas inseridas, atualizadas, removidas e inalteradas
+
+    Raises:
+        ErroValidacaoCarga: Se as remoções derrubarem a tabela além do limite
+    """
+    # Import tardio: carga_atomica importa este módulo
+    from scripts.carga_atomica import verificar_queda_volume
+
+    k = f'"{chave}"'
+    sem_chave = int(df[chave].isna().sum())
+    if sem_chave:
+        logger.warning(f"{tabela}: {sem_chave} linhas sem {chave} descartadas no upsert")
+    df = df[df[chave].notna()].drop_duplicates(subset=[chave], keep='last')
+
+    conn.register('df_upsert', df)
+    try:
+        colunas_tabela = {r[0] for r in conn.execute(f"DESCRIBE {tabela}").fetchall()}
+        tipos_df = conn.execute("DESCRIBE SELECT * FROM df_upsert").fetchall()
+        garantir_tabela_log(conn)
+
+        conn.execute("BEGIN TRANSACTION")
+        try:
+            for coluna, tipo, *_ in tipos_df:
+                if coluna not in colunas_tabela:
+                    conn.execute(f'ALTER TABLE {tabela} ADD COLUMN "{coluna}" {tipo}')
+
+            # Compara com os tipos da tabela destino (colunas de controle ficam de fora)
+            tipos_tabela = {r[0]: r[1] for r in conn.execute(f"DESCRIBE {tabela}").fetchall()}
+            comparadas = [c for c, *_ in tipos_df if c not in ignorar_colunas]
+            sel_df = ", ".join(f'TRY_CAST("{c}" AS {tipos_tabela[c]}) AS "{c}"' for c in comparadas)
+            sel_tabela = ", ".join(f'"{c}"' for c in comparadas)
+            chave_df = f'TRY_CAST({k} AS {tipos_tabela[chave]})'
+            conn.execute(f"""
+                CREATE OR REPLACE TEMP TABLE chaves_upsert AS
+                SELECT DISTINCT {k} AS chave FROM (
+                    SELECT {sel_df} FROM df_upsert
+                    EXCEPT
+                    SELECT {sel_tabela} FROM {tabela}
+                )
+            """)
+
+            resultado = ResultadoUpsert()
+            alteradas = conn.execute("SELECT COUNT(*) FROM chaves_upsert").fetchone()[0]
+            resultado.inseridos = conn.execute(f"""
+                SELECT COUNT(*) FROM chaves_upsert
+                WHERE chave NOT IN (SELECT {k} FROM {tabela} WHERE {k} IS NOT NULL)
+            """).fetchone()[0]
+            resultado.atualizados = alteradas - resultado.inseridos
+            resultado.inalterados = len(df) - alteradas
+
+            if detectar_remocoes:
+                filtro_removidos = f"{k} NOT IN (SELECT {chave_df} FROM df_upsert WHERE {chave_df} IS NOT NULL)"
+                resultado.removidos = conn.execute(
+                    f"SELECT COUNT(*) FROM {tabela} WHERE {filtro_removidos}"
+                ).fetchone()[0]
+                if resultado.removidos:
+                    atuais = conn.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0]
+                    verificar_queda_volume(tabela, atuais - resultado.removidos + resultado.inseridos, atuais)
+                    registrar_alteracoes(conn, tabela, f"SELECT {k} FROM {tabela} WHERE {filtro_removidos}")
+                    conn.execute(f"DELETE FROM {tabela} WHERE {filtro_removidos}")
+
+            if alteradas:
+                registrar_alteracoes(conn, tabela, "SELECT chave FROM chaves_upsert")
+                conn.execute(f"DELETE FROM {tabela} WHERE {k} IN (SELECT chave FROM chaves_upsert)")
+                conn.execute(f"""
+                    INSERT INTO {tabela} BY NAME
+                    SELECT * FROM df_upsert WHERE {chave_df} IN (SELECT chave FROM chaves_upsert)
+                """)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.execute("DROP TABLE IF EXISTS chaves_upsert")
+    finally:
+        conn.unregister('df_upsert')
+
+    logger.info(f"Upsert {tabela} por {chave}: {resultado}")
+    return resultado
@@ -15,6 +15,9 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 # Importar controle de concorrência
 from scripts.concurrency_control import check_concurrency, release_concurrency
+from scripts.orchestrator import orchestrator
+
+FONTES_SIENGE = ['sienge_vendas_realizadas', 'sienge_vendas_canceladas']
 
 async def sistema_sienge():
     """Sistema de atualização Sienge (2x/semana)"""
@@ -25,92 +28,39 @@ async def sistema_sienge():
     
     start_time = datetime.now()
     
+    # Abrir pool de conexões HTTP uma única vez para toda a coleta
+    await orchestrator.open()
+    
     try:
-        # Importar módulos necessários
-        from scripts.sienge_apis import obter_dados_sienge_vendas_realizadas, obter_dados_sienge_vendas_canceladas
-        import duckdb
-        import pandas as pd
-        
-        # 1. Coletar dados Sienge Vendas Realizadas
-        print("\n1. Coletando dados Sienge Vendas Realizadas...")
-        try:
-            df_sienge_realizadas = await obter_dados_sienge_vendas_realizadas()
-            print(f"✅ Sienge Vendas Realizadas: {len(df_sienge_realizadas)} registros")
-        except Exception as e:
-            df_sienge_realizadas = pd.DataFrame()
-            print(f"❌ Falha ao coletar Sienge Vendas Realizadas: {e}")
-            return False
-        
-        # 2. Aguardar delay entre vendas realizadas e canceladas (5 minutos)
-        print(f"\n⏳ Aguardando 5 minutos antes de buscar vendas canceladas...")
-        await asyncio.sleep(300)  # 5 minutos = 300 segundos
+        from scripts.fontes import obter_fontes
+        from scripts.motor_fontes import executar_fontes, imprimir_resultado
+        from scripts.vendas_consolidadas import atualizar_vendas_consolidadas
         
-        # 3. Coletar dados Sienge Vendas Canceladas
-        print("\n2. Coletando dados Sienge Vendas Canceladas...")
-        try:
-            df_sienge_canceladas = await obter_dados_sienge_vendas_canceladas()
-            print(f"✅ Sienge Vendas Canceladas: {len(df_sienge_canceladas)} registros")
-        except Exception as e:
-            df_sienge_canceladas = pd.DataFrame()
-            print(f"❌ Falha ao coletar Sienge Vendas Canceladas: {e}")
-            return False
-        
-        # 4. Upload para MotherDuck
-        print("\n3. Fazendo upload para MotherDuck...")
-        
-        # Configurar DuckDB
-        duckdb.sql("INSTALL motherduck")
-        duckdb.sql("LOAD motherduck")
-        
-        token = os.environ.get('MOTHERDUCK_TOKEN', '').strip()
-        if not token:
-            print("❌ MOTHERDUCK_TOKEN não encontrado")
-            return False
+        # 1. Coletar realizadas e canceladas dentro da cota diária (SiengeScheduler + ledger);
+        #    execução completa aplica upsert por id, parcial substitui só os empreendimentos consultados
+        print("\n1. Coletando Sienge Vendas Realizadas e Canceladas (upload em streaming)...")
+        fontes = obter_fontes(FONTES_SIENGE)
+        resultado = await executar_fontes(fontes)
         
-        os.environ['motherduck_token'] = token
-        conn = duckdb.connect('md:reservas')
+        # 2. Materializar vendas consolidadas com as vendas Sienge atualizadas
+        print("\n2. Materializando vendas consolidadas...")
+        consolidadas_ok = atualizar_vendas_consolidadas()
         
-        # Upload Sienge Vendas Realizadas
-        if not df_sienge_realizadas.empty:
-            conn.register("df_sienge_realizadas", df_sienge_realizadas)
-            conn.execute("CREATE OR REPLACE TABLE main.sienge_vendas_realizadas AS SELECT * FROM df_sienge_realizadas")
-            count_realizadas = conn.sql("SELECT COUNT(*) FROM main.sienge_vendas_realizadas").fetchone()[0]
-            print(f"✅ Sienge Vendas Realizadas upload: {count_realizadas:,} registros")
-        
-        # Upload Sienge Vendas Canceladas
-        if not df_sienge_canceladas.empty:
-            conn.register("df_sienge_canceladas", df_sienge_canceladas)
-            conn.execute("CREATE OR REPLACE TABLE main.sienge_vendas_canceladas AS SELECT * FROM df_sienge_canceladas")
-            count_canceladas = conn.sql("SELECT COUNT(*) FROM main.sienge_vendas_canceladas").fetchone()[0]
-            print(f"✅ Sienge Vendas Canceladas upload: {count_canceladas:,} registros")
-        
-        # Listar tabelas Sienge
-        print("\n4. Tabelas Sienge no banco 'reservas':")
-        try:
-            count_realizadas = conn.sql("SELECT COUNT(*) FROM main.sienge_vendas_realizadas").fetchone()[0]
-            print(f"   📊 sienge_vendas_realizadas: {count_realizadas:,} registros")
-        except:
-            print(f"   📊 sienge_vendas_realizadas: (erro ao contar)")
-        
-        try:
-            count_canceladas = conn.sql("SELECT COUNT(*) FROM main.sienge_vendas_canceladas").fetchone()[0]
-            print(f"   📊 sienge_vendas_canceladas: {count_canceladas:,} registros")
-        except:
-            print(f"   📊 sienge_vendas_canceladas: (erro ao contar)")
-        
-        conn.close()
-        
-        # 5. Estatísticas finais
+        # 3. Estatísticas finais
         end_time = datetime.now()
         duration = end_time - start_time
         
+        imprimir_resultado(resultado, fontes)
+        falhas = [nome for nome in FONTES_SIENGE if not resultado.tarefas[nome].ok]
+        if falhas or not resultado.sucesso or not consolidadas_ok:
+            return False
+        
         print(f"\n🎉 ATUALIZAÇÃO SIENGE CONCLUÍDA!")
         print(f"⏱️ Duração: {duration}")
-        print(f"📊 Resumo:")
-        print(f"   - Sienge Vendas Realizadas: {len(df_sienge_realizadas):,} registros")
-        print(f"   - Sienge Vendas Canceladas: {len(df_sienge_canceladas):,} registros")
         print("   - Outras APIs: ⏸️ Pausadas (execução diária)")
         
+        orchestrator.print_stats()
+        
         return True
         
     except Exception as e:
@@ -118,6 +68,9 @@ async def sistema_sienge():
         import traceback
         traceback.print_exc()
         return False
+    
+    finally:
+        await orchestrator.close()
 
 def main():
     """Função principal para execução via GitHub Actions"""
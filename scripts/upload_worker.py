@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Worker de upload para o MotherDuck
+Sobe cada fonte assim que ela termina de ser coletada, enquanto as demais
+ainda estão buscando dados:
+- Conexão própria com o MotherDuck, usada só pelo worker (uploads em série)
+- Operações do DuckDB rodam em thread (asyncio.to_thread) para não bloquear
+  o event loop das coletas
+- Cada DataFrame é liberado logo após o upload (menor pico de memória)
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+import pandas as pd
+
+from scripts.carga_atomica import substituir_tabela_atomica
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class ResultadoUpload:
+    """Resultado do upload de uma fonte"""
+    nome: str
+    sucesso: bool
+    mensagem: str = ''
+    duracao: float = 0.0
+
+def substituir_tabela(conn, df: pd.DataFrame, tabela: str) -> int:
+    """Substitui a tabela pelo DataFrame (staging + troca atômica); retorna a contagem final"""
+    return substituir_tabela_atomica(conn, df, tabela)
+
+class UploadWorker:
+    """
+    Fila de uploads consumida por um único worker
+
+    Uso:
+        worker = UploadWorker(conn)
+        worker.iniciar()
+        worker.enviar('cv_vendas', lambda conn: ...)   # dentro das coletas
+        await worker.aguardar('cv_vendas')              # fontes que dependem da tabela
+        resultados = await worker.finalizar()
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.resultados: Dict[str, ResultadoUpload] = {}
+        self._fila: Optional[asyncio.Queue] = None
+        self._tarefa: Optional[asyncio.Task] = None
+        self._concluidos: Dict[str, asyncio.Event] = {}
+
+    def iniciar(self):
+        """Cria a fila e o worker no event loop atual"""
+        self._fila = asyncio.Queue()
+        self._tarefa = asyncio.create_task(self._consumir())
+
+    def enviar(self, nome: str, carregar: Callable[[Any], str]):
+        """
+        Enfileira o upload de uma fonte
+
+        Args:
+            nome: Nome da fonte (para o resumo)
+            carregar: Função (conn) -> mensagem, executada em thread pelo worker
+        """
+        self._concluidos[nome] = asyncio.Event()
+        self._fila.put_nowait((nome, carregar))
+        logger.info(f"Upload enfileirado: {nome} ({self._fila.qsize()} na fila)")
+
+    async def _consumir(self):
+        while True:
+            item = await self._fila.get()
+            if item is None:
+                self._fila.task_done()
+                return
+            nome, carregar = item
+            del item
+            inicio = time.monotonic()
+            try:
+                mensagem = await asyncio.to_thread(carregar, self.conn)
+                self.resultados[nome] = ResultadoUpload(nome, True, mensagem, time.monotonic() - inicio)
+                print(f"OK: {mensagem}")
+            except Exception as e:
+                logger.error(f"Falha no upload de {nome}: {e}")
+                self.resultados[nome] = ResultadoUpload(nome, False, str(e), time.monotonic() - inicio)
+                print(f"ERRO: Upload {nome}: {e}")
+            finally:
+                # Libera o DataFrame capturado pela função de carga
+                del carregar
+                self._concluidos[nome].set()
+                self._fila.task_done()
+
+    async def aguardar(self, nome: str) -> Optional[ResultadoUpload]:
+        """
+        Aguarda o upload de uma fonte terminar (commit no MotherDuck)
+
+        Returns:
+            ResultadoUpload, ou None se a fonte não enfileirou upload
+        """
+        evento = self._concluidos.get(nome)
+        if evento is None:
+            return None
+        await evento.wait()
+        return self.resultados.get(nome)
+
+    async def finalizar(self) -> Dict[str, ResultadoUpload]:
+        """Aguarda a fila esvaziar e encerra o worker"""
+        if self._tarefa is None:
+            return self.resultados
+        self._fila.put_nowait(None)
+        await self._tarefa
+        self._tarefa = None
+        return self.resultados
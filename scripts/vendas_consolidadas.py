@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Tabela materializada de vendas consolidadas (Sienge + Reservas Vera Cruz)
+- Reconstruída ao final de cada ingestão, com JOINs em lookups já deduplicados
+  de reservas_abril (uma linha por empreendimento, código interno e imobiliária)
+  no lugar das subconsultas correlacionadas por linha da antiga view
+- Publicada via troca atômica (scripts/carga_atomica.py)
+- A view informacoes_consolidadas.sienge_vendas_consolidadas passa a ser apenas
+  um alias da tabela: os dashboards não pagam mais o custo da view a cada consulta
+- Atualização incremental: só as vendas afetadas desde a última atualização
+  são recalculadas (chave_venda = '<tabela de origem>:<chave>'):
+  - vendas Sienge novas/alteradas/removidas, lidas do change log dos loaders
+    (main.log_alteracoes)
+  - reservas alteradas em reservas_abril (sem loader no pipeline), detectadas
+    comparando a assinatura de cada reserva com o snapshot da última
+    atualização; afetam as reservas Vera Cruz e as vendas Sienge que usam os
+    lookups de empreendimento, código interno e imobiliária alterados
+- Rollup (vendas_consolidadas_cubo) por dia/empreendimento/imobiliária/corretor/
+  mídia/tipo de venda/origem, lido pelos dashboards no lugar da tabela detalhada
+- Dimensões (vendas_consolidadas_dimensoes): valores de empreendimento, corretor,
+  imobiliária, mídia e tipo de venda com datas mín/máx e quantidade de vendas,
+  de onde os dashboards montam todos os filtros com uma única consulta
+"""
+
+import os
+import logging
+
+from scripts.carga_atomica import materializar_consulta_atomica, tabela_existe
+from scripts.sync_state import (
+    LOG_ALTERACOES_TABLE, garantir_tabela_log, limpar_log_alteracoes,
+    ler_estado_sync, salvar_estado_sync
+)
+
+logger = logging.getLogger(__name__)
+
+TABELA_VENDAS_CONSOLIDADAS = 'informacoes_consolidadas.main.vendas_consolidadas'
+VIEW_VENDAS_CONSOLIDADAS = 'informacoes_consolidadas.sienge_vendas_consolidadas'
+TABELA_SNAPSHOT_RESERVAS = 'informacoes_consolidadas.main.vendas_consolidadas_reservas'
+TABELA_CUBO_VENDAS = 'informacoes_consolidadas.main.vendas_consolidadas_cubo'
+TABELA_DIMENSOES_VENDAS = 'informacoes_consolidadas.main.vendas_consolidadas_dimensoes'
+
+# Estado da atualização incremental em main.sync_state (watermark = último registro do log aplicado)
+FONTE_SYNC = 'vendas_consolidadas'
+
+# Tabelas Sienge de origem -> valor da coluna origem
+TABELAS_SIENGE = {
+    'sienge_vendas_realizadas': 'Sienge Realizada',
+    'sienge_vendas_canceladas': 'Sienge Cancelada',
+}
+
+# Assinatura de cada reserva: muda quando qualquer coluna da linha muda
+SQL_SNAPSHOT_RESERVAS = """
+SELECT idreserva, idempreendimento, codigointerno, idimobiliaria, hash(r) AS assinatura
+FROM reservas.reservas_abril r
+"""
+
+# Lookups de reservas_abril, uma linha por chave (reserva mais recente).
+# A view antiga juntava um SELECT DISTINCT por empreendimento, que repetia cada
+# venda Sienge por corretor/imobiliária distinto (ver docs/arquitetura.md)
+SQL_LOOKUPS = """
+empreendimentos AS (
+    SELECT idempreendimento, empreendimento, corretor, imobiliaria
+    FROM reservas.reservas_abril
+    WHERE idempreendimento IS NOT NULL
+    QUALIFY ROW_NUMBER() OVER (PARTITION BY idempreendimento ORDER BY idreserva DESC) = 1
+),
+reservas_por_codigo AS (
+    SELECT codigointerno, vpl_reserva, vpl_tabela, idreserva
+    FROM reservas.reservas_abril
+    WHERE codigointerno IS NOT NULL
+    QUALIFY ROW_NUMBER() OVER (PARTITION BY codigointerno ORDER BY idreserva DESC) = 1
+),
+imobiliarias AS (
+    SELECT idimobiliaria, imobiliaria
+    FROM reservas.reservas_abril
+    WHERE idimobiliaria IS NOT NULL
+    QUALIFY ROW_NUMBER() OVER (PARTITION BY idimobiliaria ORDER BY idreserva DESC) = 1
+)
+"""
+
+def _sql_secao_sienge(tabela: str, origem: str, filtro: str = '') -> str:
+    """SELECT de uma tabela de vendas do Sienge enriquecida pelos lookups"""
+    return f"""
+    SELECT
+        '{tabela}:' || CAST(s.id AS VARCHAR) as chave_venda,
+        CAST(s.enterpriseId AS INTEGER) as enterpriseId,
+        COALESCE(e.empreendimento, CASE WHEN s.enterpriseId = '19' THEN 'Ondina II' ELSE '{origem}' END) as nome_empreendimento,
+        s.value,
+        CAST(s.issueDate AS DATE) as issueDate,
+        CAST(s.contractDate AS DATE) as contractDate,
+        '{origem}' as origem,
+        COALESCE(e.corretor, s.brokers[1].name) as corretor,
+        COALESCE(e.imobiliaria, i.imobiliaria) as imobiliaria,
+        s.customers[1].name as cliente,
+        s.customers[1].email as email,
+        s.customers[1].addresses[1].city as cidade,
+        s.customers[1].addresses[1].zipCode as cep_cliente,
+        s.customers[1].profession as profissao,
+        s.customers[1].cpf as documento_cliente,
+        s.customers[1].id as idcliente,
+        s.brokers[1].id as idcorretor,
+        i.idimobiliaria,
+        s.customers[1].sex as sexo,
+        s.customers[1].civilStatus as estado_civil,
+        NULL as idade,
+        NULL as renda,
+        NULL as situacao_original,
+        NULL as data_venda,
+        NULL as valor_contrato_com_juros,
+        NULL as vencimento,
+        NULL as campanha,
+        NULL as midia,
+        NULL as tipovenda,
+        NULL as grupo,
+        NULL as regiao,
+        NULL as bloco,
+        NULL as unidade,
+        NULL as etapa,
+        c.vpl_reserva,
+        c.vpl_tabela,
+        c.idreserva
+    FROM reservas.{tabela} s
+    LEFT JOIN empreendimentos e ON CAST(s.enterpriseId AS INTEGER) = e.idempreendimento
+    LEFT JOIN reservas_por_codigo c ON c.codigointerno = s.id
+    LEFT JOIN imobiliarias i ON i.idimobiliaria = s.brokers[1].id
+    {filtro.format(chave_venda=f"'{tabela}:' || CAST(s.id AS VARCHAR)")}
+    """
+
+def sql_vendas_consolidadas(apenas_afetadas: bool = False) -> str:
+    """
+    Consulta das vendas consolidadas (realizadas, canceladas e Vera Cruz)
+
+    Com `apenas_afetadas`, retorna só as vendas cuja chave_venda está na tabela
+    temporária vendas_afetadas (atualização incremental).
+    """
+    filtro = "WHERE {chave_venda} IN (SELECT chave_venda FROM vendas_afetadas)" if apenas_afetadas else ''
+    secoes_sienge = "\n    UNION ALL BY NAME\n".join(
+        _sql_secao_sienge(tabela, origem, filtro) for tabela, origem in TABELAS_SIENGE.items()
+    )
+    return f"""
+    WITH {SQL_LOOKUPS}
+    {secoes_sienge}
+    UNION ALL BY NAME
+    SELECT
+        'reservas_abril:' || CAST(idreserva AS VARCHAR) as chave_venda,
+        enterpriseId, nome_empreendimento, value, issueDate, contractDate, origem,
+        corretor, imobiliaria, cliente, email, cidade, cep_cliente, renda, sexo, idade,
+        estado_civil, documento_cliente, idcliente, idcorretor, idimobiliaria,
+        situacao_original, data_venda, valor_contrato_com_juros, vencimento, campanha,
+        midia, tipovenda, grupo, regiao, bloco, unidade, etapa,
+        vpl_reserva, vpl_tabela, idreserva
+    FROM reservas.cv_vendas_consolidadas_vera_cruz
+    {filtro.format(chave_venda="'reservas_abril:' || CAST(idreserva AS VARCHAR)")}
+    """
+
+# Rollup para os dashboards: dia x empreendimento x imobiliária x corretor x mídia
+# x tipo de venda x origem. Imobiliária/corretor já normalizados como nos filtros
+# do dashboard; VPL somado só onde reserva e tabela são ambos válidos (regra do % VPL)
+SQL_CUBO_VENDAS = f"""
+SELECT
+    contractDate::DATE AS contractDate,
+    enterpriseId,
+    nome_empreendimento,
+    COALESCE(NULLIF(TRIM(imobiliaria), ''), '—') AS imobiliaria,
+    COALESCE(NULLIF(TRIM(corretor), ''), '—') AS corretor,
+    midia,
+    tipovenda,
+    origem,
+    COUNT(*) AS qtd_vendas,
+    SUM(value::DOUBLE) AS soma_valor,
+    MIN(value::DOUBLE) AS menor_valor,
+    MAX(value::DOUBLE) AS maior_valor,
+    SUM(TRY_CAST(vpl_reserva AS DOUBLE)) FILTER (
+        WHERE TRY_CAST(vpl_reserva AS DOUBLE) <> 0 AND TRY_CAST(vpl_tabela AS DOUBLE) <> 0
+    ) AS soma_vpl_reserva,
+    SUM(TRY_CAST(vpl_tabela AS DOUBLE)) FILTER (
+        WHERE TRY_CAST(vpl_reserva AS DOUBLE) <> 0 AND TRY_CAST(vpl_tabela AS DOUBLE) <> 0
+    ) AS soma_vpl_tabela
+FROM {TABELA_VENDAS_CONSOLIDADAS}
+WHERE value IS NOT NULL
+GROUP BY ALL
+"""
+
+# Dimensões dos filtros, lidas do cubo: uma linha por (dimensao, valor) com
+# datas mín/máx e quantidade de vendas; dimensao = 'total' traz o período geral
+DIMENSOES_FILTRO = ['nome_empreendimento', 'corretor', 'imobiliaria', 'midia', 'tipovenda']
+
+SQL_DIMENSOES_VENDAS = f"""
+SELECT
+    CASE
+{chr(10).join(f"        WHEN GROUPING({d}) = 0 THEN '{d}'" for d in DIMENSOES_FILTRO)}
+        ELSE 'total'
+    END AS dimensao,
+    CASE
+{chr(10).join(f"        WHEN GROUPING({d}) = 0 THEN CAST({d} AS VARCHAR)" for d in DIMENSOES_FILTRO)}
+    END AS valor,
+    MIN(contractDate) AS data_min,
+    MAX(contractDate) AS data_max,
+    SUM(qtd_vendas)::BIGINT AS qtd_vendas
+FROM {TABELA_CUBO_VENDAS}
+GROUP BY GROUPING SETS ({', '.join(f'({d})' for d in DIMENSOES_FILTRO)}, ())
+"""
+
+def materializar_cubo_vendas(conn) -> int:
+    """Reconstrói o rollup dos dashboards (e as dimensões dos filtros) a partir da tabela materializada"""
+    total = materializar_consulta_atomica(conn, SQL_CUBO_VENDAS, TABELA_CUBO_VENDAS)
+    logger.info(f"Cubo de vendas materializado: {total:,} linhas")
+    dimensoes = materializar_consulta_atomica(conn, SQL_DIMENSOES_VENDAS, TABELA_DIMENSOES_VENDAS)
+    logger.info(f"Dimensões de vendas materializadas: {dimensoes:,} linhas")
+    return total
+
+def _ultimo_registro_log(conn):
+    garantir_tabela_log(conn)
+    return conn.execute(f"SELECT MAX(registrado_em) FROM {LOG_ALTERACOES_TABLE}").fetchone()[0]
+
+def materializar_vendas_consolidadas(conn) -> int:
+    """
+    Reconstrói a tabela de vendas consolidadas e mantém a view como alias
+
+    Também grava o snapshot das reservas e a posição no change log, ponto de
+    partida da próxima atualização incremental.
+
+    Returns:
+        int: Registros na tabela materializada
+    """
+    ultimo_registro = _ultimo_registro_log(conn)
+    total = materializar_consulta_atomica(conn, sql_vendas_consolidadas(), TABELA_VENDAS_CONSOLIDADAS)
+    conn.execute(f"CREATE OR REPLACE VIEW {VIEW_VENDAS_CONSOLIDADAS} AS SELECT * FROM {TABELA_VENDAS_CONSOLIDADAS}")
+    conn.execute(f"CREATE OR REPLACE TABLE {TABELA_SNAPSHOT_RESERVAS} AS {SQL_SNAPSHOT_RESERVAS}")
+    materializar_cubo_vendas(conn)
+    salvar_estado_sync(conn, FONTE_SYNC, ultimo_registro, carga_completa=True)
+    logger.info(f"Vendas consolidadas materializadas: {total:,} registros")
+    return total
+
+def _motivo_carga_completa(conn, estado) -> str:
+    """Motivo para reconstruir a tabela inteira ('' se a atualização pode ser incremental)"""
+    if os.environ.get('VENDAS_CONSOLIDADAS_INCREMENTAL', 'true').lower() != 'true':
+        return 'VENDAS_CONSOLIDADAS_INCREMENTAL=false'
+    if not tabela_existe(conn, TABELA_VENDAS_CONSOLIDADAS) or not tabela_existe(conn, TABELA_SNAPSHOT_RESERVAS):
+        return 'tabela materializada ou snapshot inexistente'
+    if 'chave_venda' not in {r[0] for r in conn.execute(f"DESCRIBE {TABELA_VENDAS_CONSOLIDADAS}").fetchall()}:
+        return 'tabela materializada sem chave_venda'
+    if estado is None or estado.ultima_carga_completa is None:
+        return 'sem estado de atualização'
+    # Registros mais antigos que a retenção já podem ter sido apagados do log
+    retencao = int(os.environ.get('LOG_ALTERACOES_RETENCAO_DIAS', '7'))
+    if conn.execute(
+        "SELECT ? < current_localtimestamp() - to_days(?)", [estado.atualizado_em, retencao]
+    ).fetchone()[0]:
+        return f'última atualização há mais de {retencao} dias'
+    substituidas = conn.execute(f"""
+        SELECT DISTINCT tabela FROM {LOG_ALTERACOES_TABLE}
+        WHERE chave IS NULL AND tabela IN ({', '.join('?' for _ in TABELAS_SIENGE)})
+          AND registrado_em > COALESCE(?, TIMESTAMP '1970-01-01')
+    """, [*TABELAS_SIENGE, estado.watermark]).fetchall()
+    if substituidas:
+        return f"tabelas substituídas por inteiro: {', '.join(t for (t,) in substituidas)}"
+    return ''
+
+def atualizar_vendas_consolidadas_incremental(conn) -> int:
+    """
+    Recalcula só as vendas afetadas desde a última atualização
+
+    Cai para a reconstrução completa quando não há estado, quando uma tabela
+    Sienge foi substituída por inteiro (sem chaves no log) ou quando a última
+    atualização é mais antiga que a retenção do log.
+
+    Returns:
+        int: Vendas recalculadas (ou registros da tabela, na reconstrução completa)
+    """
+    garantir_tabela_log(conn)
+    estado = ler_estado_sync(FONTE_SYNC, conn)
+    motivo = _motivo_carga_completa(conn, estado)
+    if motivo:
+        logger.info(f"Vendas consolidadas: reconstrução completa ({motivo})")
+        return materializar_vendas_consolidadas(conn)
+
+    ultimo_registro = _ultimo_registro_log(conn)
+    desde = estado.watermark
+    try:
+        conn.execute(f"""
+            CREATE OR REPLACE TEMP TABLE reservas_alteradas AS
+            (SELECT * FROM {TABELA_SNAPSHOT_RESERVAS} EXCEPT {SQL_SNAPSHOT_RESERVAS})
+            UNION
+            ({SQL_SNAPSHOT_RESERVAS} EXCEPT SELECT * FROM {TABELA_SNAPSHOT_RESERVAS})
+        """)
+        # Vendas Sienge do log + vendas que usam lookups alterados + reservas alteradas
+        afetadas_lookups = "\nUNION\n".join(f"""
+            SELECT '{tabela}:' || CAST(s.id AS VARCHAR) FROM reservas.{tabela} s
+            WHERE CAST(s.enterpriseId AS INTEGER) IN (SELECT idempreendimento FROM reservas_alteradas)
+               OR s.id IN (SELECT codigointerno FROM reservas_alteradas)
+               OR s.brokers[1].id IN (SELECT idimobiliaria FROM reservas_alteradas)
+        """ for tabela in TABELAS_SIENGE)
+        conn.execute(f"""
+            CREATE OR REPLACE TEMP TABLE vendas_afetadas AS
+            SELECT tabela || ':' || chave AS chave_venda FROM {LOG_ALTERACOES_TABLE}
+            WHERE chave IS NOT NULL AND tabela IN ({', '.join('?' for _ in TABELAS_SIENGE)})
+              AND registrado_em > COALESCE(?, TIMESTAMP '1970-01-01') AND registrado_em <= ?
+            UNION
+            {afetadas_lookups}
+            UNION
+            SELECT 'reservas_abril:' || CAST(idreserva AS VARCHAR) FROM reservas_alteradas
+        """, [*TABELAS_SIENGE, desde, ultimo_registro])
+
+        afetadas = conn.execute("SELECT COUNT(*) FROM vendas_afetadas").fetchone()[0]
+        conn.execute("BEGIN TRANSACTION")
+        try:
+            if afetadas:
+                conn.execute(f"""
+                    DELETE FROM {TABELA_VENDAS_CONSOLIDADAS}
+                    WHERE chave_venda IN (SELECT chave_venda FROM vendas_afetadas)
+                """)
+                conn.execute(f"""
+                    INSERT INTO {TABELA_VENDAS_CONSOLIDADAS} BY NAME
+                    {sql_vendas_consolidadas(apenas_afetadas=True)}
+                """)
+            if conn.execute("SELECT COUNT(*) FROM reservas_alteradas").fetchone()[0]:
+                conn.execute(f"CREATE OR REPLACE TABLE {TABELA_SNAPSHOT_RESERVAS} AS {SQL_SNAPSHOT_RESERVAS}")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.execute("DROP TABLE IF EXISTS reservas_alteradas")
+        conn.execute("DROP TABLE IF EXISTS vendas_afetadas")
+
+    # O estado fica em outro banco (reservas) e não entra na transação acima; se a
+    # gravação falhar, a próxima execução reaplica as mesmas chaves (idempotente)
+    salvar_estado_sync(conn, FONTE_SYNC, ultimo_registro or desde, carga_completa=False)
+    if afetadas or not tabela_existe(conn, TABELA_CUBO_VENDAS) or not tabela_existe(conn, TABELA_DIMENSOES_VENDAS):
+        materializar_cubo_vendas(conn)
+
+    limpar_log_alteracoes(conn)
+    logger.info(f"Vendas consolidadas: {afetadas:,} vendas recalculadas (incremental)")
+    return afetadas
+
+def atualizar_vendas_consolidadas() -> bool:
+    """Abre uma conexão com o MotherDuck e atualiza as vendas consolidadas (fim da ingestão)"""
+    from scripts.sync_state import conectar_motherduck
+
+    conn = conectar_motherduck()
+    if conn is None:
+        print("ERRO: MOTHERDUCK_TOKEN não encontrado - vendas consolidadas não atualizadas")
+        return False
+    try:
+        recalculadas = atualizar_vendas_consolidadas_incremental(conn)
+        print(f"OK: Vendas consolidadas atualizadas: {recalculadas:,} registros recalculados")
+        return True
+    except Exception as e:
+        logger.error(f"Falha ao atualizar vendas consolidadas: {e}")
+        print(f"ERRO: Vendas consolidadas: {e}")
+        return False
+    finally:
+        conn.close()
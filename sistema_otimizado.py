@@ -14,6 +14,7 @@ from dotenv import load_dotenv
 from scripts.cv_vendas_api import CVVendasAPIClient, processar_dados_cv_vendas
 from scripts.cv_repasses_api import obter_dados_cv_repasses
 from scripts.sienge_apis import SiengeAPIClient, obter_dados_sienge_vendas_canceladas, obter_dados_sienge_vendas_realizadas
+from scripts.orchestrator import orchestrator
 
 async def coletar_dados_cv_vendas_otimizado():
     """Coleta dados do CV Vendas com rate limiting otimizado"""
@@ -285,6 +286,9 @@ async def sistema_otimizado():
         import traceback
         traceback.print_exc()
         return False
+    
+    finally:
+        await orchestrator.close()
 
 def main():
     """Função principal"""
@@ -1,460 +1,13 @@
 """
 Utilitário de conexão com MotherDuck para o app Streamlit de vendas.
-Baseado nos padrões do projeto Vendas_Consolidadas.
+A implementação (conexão, cache e consultas) fica no pacote compartilhado
+consultas_vendas (pyproject.toml na raiz do repositório, instalado com
+`pip install .` na raiz; ver o README do app).
 """
 
-import os
-import duckdb
-import pandas as pd
-from typing import List, Optional, Dict, Any
 from dotenv import load_dotenv
-import streamlit as st
 
 # Carregar variáveis de ambiente
 load_dotenv()
 
-class MotherDuckConnection:
-    """Classe para gerenciar conexões com MotherDuck."""
-    
-    def __init__(self):
-        self.token = self._get_token()
-        self.connection = None
-    
-    def _get_token(self) -> str:
-        """Obtém o token do MotherDuck das variáveis de ambiente."""
-        # Tentar diferentes nomes de variáveis conforme padrão do projeto
-        token = os.getenv('MOTHERDUCK_TOKEN') or os.getenv('Token_MD')
-        
-        if not token:
-            raise ValueError(
-                "Token do MotherDuck não encontrado. "
-                "Configure MOTHERDUCK_TOKEN ou Token_MD no arquivo .env"
-            )
-        
-        return token
-    
-    def connect(self):
-        """Estabelece conexão com MotherDuck."""
-        if not self.connection:
-            try:
-                connection_string = f"md:?motherduck_token={self.token}"
-                self.connection = duckdb.connect(connection_string)
-                st.success("✅ Conectado ao MotherDuck com sucesso!")
-            except Exception as e:
-                st.error(f"❌ Erro ao conectar com MotherDuck: {str(e)}")
-                raise
-    
-    def disconnect(self):
-        """Fecha a conexão com MotherDuck."""
-        if self.connection:
-            self.connection.close()
-            self.connection = None
-    
-    @st.cache_data(ttl=300)  # Cache por 5 minutos
-    def run_query(_self, sql: str, params: Optional[List] = None) -> pd.DataFrame:
-        """
-        Executa uma consulta SQL e retorna um DataFrame.
-        
-        Args:
-            sql: Query SQL
-            params: Parâmetros para a query (opcional)
-            
-        Returns:
-            DataFrame com os resultados
-        """
-        if not _self.connection:
-            _self.connect()
-        
-        try:
-            if params:
-                return _self.connection.execute(sql, params).df()
-            else:
-                return _self.connection.execute(sql).df()
-        except Exception as e:
-            st.error(f"❌ Erro na consulta SQL: {str(e)}")
-            st.error(f"SQL: {sql}")
-            if params:
-                st.error(f"Parâmetros: {params}")
-            raise
-
-# Instância global da conexão
-@st.cache_resource
-def get_md_connection():
-    """Retorna uma instância singleton da conexão MotherDuck."""
-    return MotherDuckConnection()
-
-def build_date_filter(start_date: str, end_date: str) -> str:
-    """
-    Constrói filtro de data para consultas SQL.
-    
-    Args:
-        start_date: Data inicial (YYYY-MM-DD)
-        end_date: Data final (YYYY-MM-DD)
-        
-    Returns:
-        String com filtro SQL
-    """
-    return f"contractDate BETWEEN '{start_date}' AND '{end_date}'"
-
-def build_optional_filters(midia: Optional[List[str]] = None, 
-                          tipovenda: Optional[List[str]] = None) -> tuple:
-    """
-    Constrói filtros opcionais para midia e tipovenda.
-    
-    Args:
-        midia: Lista de mídias para filtrar
-        tipovenda: Lista de tipos de venda para filtrar
-        
-    Returns:
-        Tuple com (filtro_sql, parametros)
-    """
-    filters = []
-    params = []
-    
-    if midia and len(midia) > 0:
-        placeholders = ','.join(['?' for _ in midia])
-        filters.append(f"midia IN ({placeholders})")
-        params.extend(midia)
-    
-    if tipovenda and len(tipovenda) > 0:
-        placeholders = ','.join(['?' for _ in tipovenda])
-        filters.append(f"tipovenda IN ({placeholders})")
-        params.extend(tipovenda)
-    
-    filter_sql = " AND ".join(filters) if filters else ""
-    return filter_sql, params
-
-def get_base_data(start_date: str, end_date: str, 
-                 midia: Optional[List[str]] = None,
-                 tipovenda: Optional[List[str]] = None) -> pd.DataFrame:
-    """
-    Obtém dados base da tabela sienge_vendas_consolidadas com filtros aplicados.
-    
-    Args:
-        start_date: Data inicial
-        end_date: Data final
-        midia: Lista de mídias (opcional)
-        tipovenda: Lista de tipos de venda (opcional)
-        
-    Returns:
-        DataFrame com dados filtrados
-    """
-    md_conn = get_md_connection()
-    
-    # Construir filtros
-    date_filter = build_date_filter(start_date, end_date)
-    optional_filter, params = build_optional_filters(midia, tipovenda)
-    
-    # SQL base
-    sql = f"""
-    WITH base AS (
-        SELECT
-            nome_empreendimento,
-            COALESCE(NULLIF(TRIM(imobiliaria), ''), '—') AS imobiliaria,
-            COALESCE(NULLIF(TRIM(corretor), ''), '—') AS corretor,
-            COALESCE(NULLIF(TRIM(bloco), ''), '—') AS bloco,
-            COALESCE(NULLIF(TRIM(unidade), ''), '—') AS unidade,
-            midia,
-            tipovenda,
-            contractDate::DATE AS contractDate,
-            value::DOUBLE AS value
-        FROM informacoes_consolidadas.sienge_vendas_consolidadas
-        WHERE value IS NOT NULL
-          AND {date_filter}
-    """
-    
-    # Adicionar filtros opcionais
-    if optional_filter:
-        sql += f" AND {optional_filter}"
-    
-    sql += """
-    )
-    SELECT * FROM base
-    ORDER BY contractDate DESC, nome_empreendimento
-    """
-    
-    return md_conn.run_query(sql, params)
-
-def get_timeline_data(start_date: str, end_date: str,
-                     midia: Optional[List[str]] = None,
-                     tipovenda: Optional[List[str]] = None) -> pd.DataFrame:
-    """
-    Obtém dados para timeline mensal.
-    
-    Args:
-        start_date: Data inicial
-        end_date: Data final
-        midia: Lista de mídias (opcional)
-        tipovenda: Lista de tipos de venda (opcional)
-        
-    Returns:
-        DataFrame com dados mensais agregados
-    """
-    md_conn = get_md_connection()
-    
-    # Construir filtros
-    date_filter = build_date_filter(start_date, end_date)
-    optional_filter, params = build_optional_filters(midia, tipovenda)
-    
-    sql = f"""
-    WITH base AS (
-        SELECT
-            contractDate::DATE AS contractDate,
-            value::DOUBLE AS value
-        FROM informacoes_consolidadas.sienge_vendas_consolidadas
-        WHERE value IS NOT NULL
-          AND {date_filter}
-    """
-    
-    if optional_filter:
-        sql += f" AND {optional_filter}"
-    
-    sql += """
-    )
-    SELECT 
-        date_trunc('month', contractDate)::DATE AS mes,
-        COUNT(*) AS qtd_vendas,
-        SUM(value) AS total_valor,
-        AVG(value) AS ticket_medio
-    FROM base
-    GROUP BY date_trunc('month', contractDate)
-    ORDER BY mes
-    """
-    
-    return md_conn.run_query(sql, params)
-
-def get_kpis(start_date: str, end_date: str,
-            midia: Optional[List[str]] = None,
-            tipovenda: Optional[List[str]] = None) -> Dict[str, Any]:
-    """
-    Obtém KPIs principais.
-    
-    Args:
-        start_date: Data inicial
-        end_date: Data final
-        midia: Lista de mídias (opcional)
-        tipovenda: Lista de tipos de venda (opcional)
-        
-    Returns:
-        Dicionário com KPIs
-    """
-    md_conn = get_md_connection()
-    
-    # Construir filtros
-    date_filter = build_date_filter(start_date, end_date)
-    optional_filter, params = build_optional_filters(midia, tipovenda)
-    
-    sql = f"""
-    WITH base AS (
-        SELECT
-            value::DOUBLE AS value
-        FROM informacoes_consolidadas.sienge_vendas_consolidadas
-        WHERE value IS NOT NULL
-          AND {date_filter}
-    """
-    
-    if optional_filter:
-        sql += f" AND {optional_filter}"
-    
-    sql += """
-    )
-    SELECT 
-        COUNT(*) AS total_vendas,
-        SUM(value) AS total_valor,
-        AVG(value) AS ticket_medio,
-        MIN(value) AS menor_venda,
-        MAX(value) AS maior_venda
-    FROM base
-    """
-    
-    result = md_conn.run_query(sql, params)
-    
-    if len(result) > 0:
-        return {
-            'total_vendas': int(result.iloc[0]['total_vendas']),
-            'total_valor': float(result.iloc[0]['total_valor']),
-            'ticket_medio': float(result.iloc[0]['ticket_medio']),
-            'menor_venda': float(result.iloc[0]['menor_venda']),
-            'maior_venda': float(result.iloc[0]['maior_venda'])
-        }
-    else:
-        return {
-            'total_vendas': 0,
-            'total_valor': 0.0,
-            'ticket_medio': 0.0,
-            'menor_venda': 0.0,
-            'maior_venda': 0.0
-        }
-
-def get_top_empreendimentos(start_date: str, end_date: str,
-                           midia: Optional[List[str]] = None,
-                           tipovenda: Optional[List[str]] = None,
-                           limit: int = 10) -> pd.DataFrame:
-    """
-    Obtém top empreendimentos por valor e quantidade.
-    
-    Args:
-        start_date: Data inicial
-        end_date: Data final
-        midia: Lista de mídias (opcional)
-        tipovenda: Lista de tipos de venda (opcional)
-        limit: Limite de resultados
-        
-    Returns:
-        DataFrame com top empreendimentos
-    """
-    md_conn = get_md_connection()
-    
-    # Construir filtros
-    date_filter = build_date_filter(start_date, end_date)
-    optional_filter, params = build_optional_filters(midia, tipovenda)
-    
-    sql = f"""
-    WITH base AS (
-        SELECT
-            nome_empreendimento,
-            value::DOUBLE AS value
-        FROM informacoes_consolidadas.sienge_vendas_consolidadas
-        WHERE value IS NOT NULL
-          AND {date_filter}
-    """
-    
-    if optional_filter:
-        sql += f" AND {optional_filter}"
-    
-    sql += f"""
-    )
-    SELECT 
-        nome_empreendimento,
-        COUNT(*) AS qtd_vendas,
-        SUM(value) AS total_valor,
-        AVG(value) AS ticket_medio
-    FROM base
-    GROUP BY nome_empreendimento
-    ORDER BY total_valor DESC
-    LIMIT {limit}
-    """
-    
-    return md_conn.run_query(sql, params)
-
-def get_analytics_by_dimension(start_date: str, end_date: str,
-                              dimension: str,
-                              midia: Optional[List[str]] = None,
-                              tipovenda: Optional[List[str]] = None,
-                              limit: int = 20) -> pd.DataFrame:
-    """
-    Obtém análises por dimensão específica (midia, tipovenda, imobiliaria, corretor).
-    
-    Args:
-        start_date: Data inicial
-        end_date: Data final
-        dimension: Dimensão para análise
-        midia: Lista de mídias (opcional)
-        tipovenda: Lista de tipos de venda (opcional)
-        limit: Limite de resultados
-        
-    Returns:
-        DataFrame com análises por dimensão
-    """
-    md_conn = get_md_connection()
-    
-    # Construir filtros
-    date_filter = build_date_filter(start_date, end_date)
-    optional_filter, params = build_optional_filters(midia, tipovenda)
-    
-    # Validar dimensão
-    valid_dimensions = ['midia', 'tipovenda', 'imobiliaria', 'corretor']
-    if dimension not in valid_dimensions:
-        raise ValueError(f"Dimensão inválida. Use uma das: {valid_dimensions}")
-    
-    # Tratar campos que podem ser nulos
-    if dimension in ['imobiliaria', 'corretor']:
-        dimension_field = f"COALESCE(NULLIF(TRIM({dimension}), ''), '—') AS {dimension}"
-    else:
-        dimension_field = dimension
-    
-    sql = f"""
-    WITH base AS (
-        SELECT
-            {dimension_field},
-            value::DOUBLE AS value
-        FROM informacoes_consolidadas.sienge_vendas_consolidadas
-        WHERE value IS NOT NULL
-          AND {date_filter}
-    """
-    
-    if optional_filter:
-        sql += f" AND {optional_filter}"
-    
-    sql += f"""
-    )
-    SELECT 
-        {dimension},
-        COUNT(*) AS qtd_vendas,
-        SUM(value) AS total_valor,
-        AVG(value) AS ticket_medio
-    FROM base
-    GROUP BY {dimension}
-    ORDER BY total_valor DESC
-    LIMIT {limit}
-    """
-    
-    return md_conn.run_query(sql, params)
-
-def get_date_range() -> tuple:
-    """
-    Obtém o range de datas disponível na tabela.
-    
-    Returns:
-        Tuple com (data_min, data_max)
-    """
-    md_conn = get_md_connection()
-    
-    sql = """
-    SELECT 
-        MIN(contractDate) AS data_min,
-        MAX(contractDate) AS data_max
-    FROM informacoes_consolidadas.sienge_vendas_consolidadas
-    WHERE value IS NOT NULL
-    """
-    
-    result = md_conn.run_query(sql)
-    
-    if len(result) > 0:
-        return (
-            result.iloc[0]['data_min'].strftime('%Y-%m-%d'),
-            result.iloc[0]['data_max'].strftime('%Y-%m-%d')
-        )
-    else:
-        # Fallback para datas padrão
-        return ('2024-01-01', '2025-12-31')
-
-def get_unique_values(column: str) -> List[str]:
-    """
-    Obtém valores únicos de uma coluna para filtros.
-    
-    Args:
-        column: Nome da coluna
-        
-    Returns:
-        Lista de valores únicos
-    """
-    md_conn = get_md_connection()
-    
-    # Tratar campos que podem ser nulos
-    if column in ['imobiliaria', 'corretor']:
-        column_field = f"COALESCE(NULLIF(TRIM({column}), ''), '—')"
-    else:
-        column_field = column
-    
-    sql = f"""
-    SELECT DISTINCT {column_field} AS value
-    FROM informacoes_consolidadas.sienge_vendas_consolidadas
-    WHERE value IS NOT NULL
-      AND {column_field} IS NOT NULL
-    ORDER BY value
-    """
-    
-    result = md_conn.run_query(sql)
-    return result['value'].tolist()
-
+from consultas_vendas import *  # noqa: E402,F401,F403
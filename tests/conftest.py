@@ -0,0 +1,16 @@
+"""Fixtures compartilhadas: DuckDB em memória no lugar do MotherDuck"""
+
+import duckdb
+import pytest
+
+@pytest.fixture
+def conn():
+    conexao = duckdb.connect()
+    yield conexao
+    conexao.close()
+
+@pytest.fixture(autouse=True)
+def limites_carga_padrao(monkeypatch):
+    """Os testes usam os limites padrão da validação de carga, não os do ambiente"""
+    for variavel in ('CARGA_QUEDA_MAXIMA', 'CARGA_PERMITIR_REMOCAO_COLUNAS', 'MOTHERDUCK_TOKEN'):
+        monkeypatch.delenv(variavel, raising=False)
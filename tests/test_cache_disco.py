@@ -0,0 +1,62 @@
+"""Cache de resultados em disco dos dashboards (consultas_vendas/cache_disco.py)"""
+
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from consultas_vendas import cache_disco
+
+SQL = "SELECT * FROM vendas WHERE origem = ?"
+
+@pytest.fixture(autouse=True)
+def diretorio(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_disco, 'DIRETORIO_CACHE', tmp_path)
+    monkeypatch.setattr(cache_disco, 'CACHE_DISCO_ATIVO', True)
+    return tmp_path
+
+def _df(n=3):
+    return pd.DataFrame({'id': range(n), 'valor': [1.5] * n})
+
+def test_grava_e_le_pela_chave_normalizada():
+    cache_disco.gravar(SQL, ['Reserva'], 'v1', _df())
+    lido = cache_disco.ler("SELECT *\n  FROM vendas   WHERE origem = ?", ['Reserva'], 'v1')
+    pd.testing.assert_frame_equal(lido, _df())
+
+def test_versao_ou_parametros_diferentes_nao_reaproveitam():
+    cache_disco.gravar(SQL, ['Reserva'], 'v1', _df())
+    assert cache_disco.ler(SQL, ['Reserva'], 'v2') is None
+    assert cache_disco.ler(SQL, ['Sienge Realizada'], 'v1') is None
+
+def test_arquivo_mais_antigo_que_o_ttl_e_ignorado(diretorio, monkeypatch):
+    monkeypatch.setattr(cache_disco, 'IDADE_MAXIMA_SEGUNDOS', 60)
+    cache_disco.gravar(SQL, None, 'v1', _df())
+    arquivo = next(diretorio.glob('*.parquet'))
+    antigo = time.time() - 120
+    os.utime(arquivo, (antigo, antigo))
+    assert cache_disco.ler(SQL, None, 'v1') is None
+
+def test_arquivo_ilegivel_vira_cache_ausente(diretorio):
+    (diretorio / f"{cache_disco.chave_cache(SQL, None, 'v1')}.parquet").write_bytes(b'corrompido')
+    assert cache_disco.ler(SQL, None, 'v1') is None
+
+def test_descarte_remove_os_menos_usados_recentemente(diretorio):
+    for consulta in 'abc':
+        cache_disco.gravar(f"SELECT '{consulta}'", None, 'v1', _df())
+    arquivos = {c: cache_disco._arquivo(cache_disco.chave_cache(f"SELECT '{c}'", None, 'v1')) for c in 'abc'}
+    agora = time.time()
+    for i, c in enumerate('abc'):
+        os.utime(arquivos[c], (agora - 300 + i * 100, agora - 300))
+
+    # Ler 'a' o torna o mais recente: sobra para 'b' ser descartado
+    assert cache_disco.ler("SELECT 'a'", None, 'v1') is not None
+    tamanho = arquivos['a'].stat().st_size
+    cache_disco.descartar_excedente(tamanho_maximo=2 * tamanho)
+
+    assert sorted(c for c, arquivo in arquivos.items() if arquivo.exists()) == ['a', 'c']
+
+def test_cache_desligado_nao_grava(diretorio, monkeypatch):
+    monkeypatch.setattr(cache_disco, 'CACHE_DISCO_ATIVO', False)
+    cache_disco.gravar(SQL, None, 'v1', _df())
+    assert list(diretorio.iterdir()) == []
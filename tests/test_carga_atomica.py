@@ -0,0 +1,63 @@
+"""Carga atômica com staging, validação e rollback (scripts/carga_atomica.py)"""
+
+import pandas as pd
+import pytest
+
+from scripts.carga_atomica import (
+    ErroValidacaoCarga, materializar_consulta_atomica, reverter_tabela, substituir_tabela_atomica,
+    tabela_existe
+)
+
+def _df(linhas, **extras):
+    return pd.DataFrame({'id': range(linhas), 'valor': [1.0] * linhas, **extras})
+
+def _total(conn, tabela='main.vendas'):
+    return conn.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0]
+
+def test_primeira_carga_cria_a_tabela_e_registra_no_log(conn):
+    assert substituir_tabela_atomica(conn, _df(10), 'main.vendas') == 10
+    assert not tabela_existe(conn, 'main.vendas__staging')
+    assert conn.execute("SELECT tabela, chave FROM main.log_alteracoes").fetchall() == [('vendas', None)]
+
+def test_nova_carga_retem_a_versao_anterior(conn):
+    substituir_tabela_atomica(conn, _df(10), 'main.vendas')
+    substituir_tabela_atomica(conn, _df(12), 'main.vendas')
+    assert _total(conn) == 12
+    assert _total(conn, 'main.vendas__anterior') == 10
+
+def test_recusa_queda_de_volume_e_descarta_o_staging(conn):
+    substituir_tabela_atomica(conn, _df(10), 'main.vendas')
+    with pytest.raises(ErroValidacaoCarga, match='queda'):
+        substituir_tabela_atomica(conn, _df(4), 'main.vendas')
+    assert _total(conn) == 10
+    assert not tabela_existe(conn, 'main.vendas__staging')
+
+def test_recusa_remocao_de_colunas(conn, monkeypatch):
+    substituir_tabela_atomica(conn, _df(10, cidade=['X'] * 10), 'main.vendas')
+    with pytest.raises(ErroValidacaoCarga, match='cidade'):
+        substituir_tabela_atomica(conn, _df(10), 'main.vendas')
+
+    monkeypatch.setenv('CARGA_PERMITIR_REMOCAO_COLUNAS', 'true')
+    substituir_tabela_atomica(conn, _df(10), 'main.vendas')
+    assert 'cidade' not in [r[0] for r in conn.execute("DESCRIBE main.vendas").fetchall()]
+
+def test_reverter_troca_com_a_versao_anterior(conn):
+    substituir_tabela_atomica(conn, _df(10), 'main.vendas')
+    substituir_tabela_atomica(conn, _df(12), 'main.vendas')
+    reverter_tabela(conn, 'main.vendas')
+    assert _total(conn) == 10
+    assert _total(conn, 'main.vendas__anterior') == 12
+
+def test_reverter_sem_versao_anterior(conn):
+    substituir_tabela_atomica(conn, _df(10), 'main.vendas')
+    with pytest.raises(ValueError):
+        reverter_tabela(conn, 'main.vendas')
+
+def test_reverter_tabela_de_outro_banco(conn):
+    # O log fica no banco padrão: não pode entrar na transação dos renames
+    conn.execute("ATTACH ':memory:' AS consolidadas")
+    materializar_consulta_atomica(conn, "SELECT range AS id FROM range(10)", 'consolidadas.main.vendas')
+    materializar_consulta_atomica(conn, "SELECT range AS id FROM range(12)", 'consolidadas.main.vendas')
+    reverter_tabela(conn, 'consolidadas.main.vendas')
+    assert _total(conn, 'consolidadas.main.vendas') == 10
+    assert conn.execute("SELECT tabela FROM main.log_alteracoes").fetchall() == [('vendas',)]
@@ -0,0 +1,76 @@
+"""Execução das fontes diárias em DAG (scripts/dag_runner.py)"""
+
+import asyncio
+
+import pytest
+
+from scripts.dag_runner import (
+    DAGRunner, STATUS_ERRO, STATUS_IGNORADA, STATUS_OK, STATUS_TIMEOUT, TarefaDAG
+)
+
+def _tarefa(nome, valor=None, espera=0.0, erro=None, **kwargs):
+    async def executar(entradas):
+        await asyncio.sleep(espera)
+        if erro:
+            raise RuntimeError(erro)
+        return valor if valor is not None else entradas
+    return TarefaDAG(nome, executar, **kwargs)
+
+def _executar(tarefas, **kwargs):
+    return asyncio.run(DAGRunner(tarefas, **kwargs).executar())
+
+def test_dependencia_recebe_o_resultado_das_anteriores():
+    resultados = _executar([
+        _tarefa('cv_vendas', valor='vendas'),
+        _tarefa('sienge', depende_de=['cv_vendas']),
+    ])
+    assert resultados['sienge'].status == STATUS_OK
+    assert resultados['sienge'].resultado == {'cv_vendas': 'vendas'}
+
+def test_tarefas_independentes_rodam_em_paralelo():
+    async def medir():
+        loop = asyncio.get_running_loop()
+        inicio = loop.time()
+        await DAGRunner([_tarefa(f't{i}', valor=i, espera=0.1) for i in range(5)]).executar()
+        return loop.time() - inicio
+
+    assert asyncio.run(medir()) < 0.3
+
+def test_grupo_limita_a_concorrencia():
+    ativas, pico = [0], [0]
+
+    def tarefa(nome):
+        async def executar(entradas):
+            ativas[0] += 1
+            pico[0] = max(pico[0], ativas[0])
+            await asyncio.sleep(0.01)
+            ativas[0] -= 1
+        return TarefaDAG(nome, executar, grupo='sienge')
+
+    _executar([tarefa(f't{i}') for i in range(4)], limites_grupo={'sienge': 1})
+    assert pico[0] == 1
+
+def test_timeout_e_erro_nao_derrubam_as_demais():
+    resultados = _executar([
+        _tarefa('lenta', espera=1.0, timeout=0.05),
+        _tarefa('quebrada', erro='falhou'),
+        _tarefa('ok', valor=1),
+    ])
+    assert resultados['lenta'].status == STATUS_TIMEOUT
+    assert resultados['quebrada'].status == STATUS_ERRO and resultados['quebrada'].erro == 'falhou'
+    assert resultados['ok'].ok
+
+def test_dependencia_com_falha_ignora_a_tarefa():
+    resultados = _executar([
+        _tarefa('cv_vendas', erro='sem dados'),
+        _tarefa('sienge', depende_de=['cv_vendas']),
+    ])
+    assert resultados['sienge'].status == STATUS_IGNORADA
+
+def test_valida_ciclos_e_dependencias_inexistentes():
+    with pytest.raises(ValueError, match='Ciclo'):
+        DAGRunner([_tarefa('a', depende_de=['b']), _tarefa('b', depende_de=['a'])])
+    with pytest.raises(ValueError, match='inexistentes'):
+        DAGRunner([_tarefa('a', depende_de=['x'])])
+    with pytest.raises(ValueError, match='duplicados'):
+        DAGRunner([_tarefa('a'), _tarefa('a')])
@@ -0,0 +1,51 @@
+"""Execução paralela dos painéis (consultas_vendas/executor.py)"""
+
+import threading
+import time
+
+from consultas_vendas.executor import ExecutorPaineis
+
+def _painel(valor, espera=0.0):
+    time.sleep(espera)
+    return valor
+
+def test_entrega_na_ordem_em_que_terminam():
+    with ExecutorPaineis(max_workers=3) as executor:
+        executor.enviar('lento', _painel, 'kpis', espera=0.2)
+        executor.enviar('rapido', _painel, 'metas')
+        ordem = [(r.nome, r.valor) for r in executor.concluidos()]
+    assert ordem == [('rapido', 'metas'), ('lento', 'kpis')]
+
+def test_paineis_rodam_em_paralelo():
+    barreira = threading.Barrier(3)
+
+    def painel(nome):
+        # Só passa se os três painéis estiverem rodando ao mesmo tempo
+        barreira.wait(timeout=2)
+        return nome
+
+    with ExecutorPaineis(max_workers=3) as executor:
+        for nome in ('kpis', 'metas', 'ranking'):
+            executor.enviar(nome, painel, nome)
+        resultados = list(executor.concluidos())
+    assert all(r.erro is None for r in resultados)
+    assert sorted(r.valor for r in resultados) == ['kpis', 'metas', 'ranking']
+
+def test_erro_em_um_painel_nao_afeta_os_demais():
+    def quebrar():
+        raise ValueError("consulta inválida")
+
+    with ExecutorPaineis(max_workers=2) as executor:
+        executor.enviar('quebrado', quebrar)
+        executor.enviar('ok', _painel, 1)
+        resultados = {r.nome: r for r in executor.concluidos()}
+    assert isinstance(resultados['quebrado'].erro, ValueError)
+    assert resultados['ok'].valor == 1 and resultados['ok'].erro is None
+
+def test_resumo_de_tempos_do_mais_lento_ao_mais_rapido():
+    with ExecutorPaineis(max_workers=2) as executor:
+        executor.enviar('lento', _painel, None, espera=0.1)
+        executor.enviar('rapido', _painel, None)
+        list(executor.concluidos())
+    assert set(executor.tempos) == {'lento', 'rapido'}
+    assert executor.resumo_tempos().startswith('lento ')
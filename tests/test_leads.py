@@ -0,0 +1,37 @@
+"""Etapa do funil e filtros da página de Leads em SQL (consultas_vendas/leads.py)"""
+
+from datetime import date
+
+import pandas as pd
+
+from consultas_vendas.leads import FiltrosLeads, build_filtros_leads, sql_etapa_funil
+
+SITUACOES = pd.DataFrame({
+    'Situacao': ['Em atendimento', '  VISITA REALIZADA ', 'Descartado', 'descartado', 'Descartado',
+                 None, '', 'Vencido', 'Venda realizada', 'Em pré-cadastro'],
+    'nome_situacao_anterior_lead': [None, None, 'Com reserva', None, 'Outra', 'Com reserva', None,
+                                    'Venda realizada', None, None],
+})
+
+ESPERADAS = ['Em atendimento', 'Visita realizada', 'Com reserva', 'Leads', 'Leads',
+             'Leads', 'Leads', 'Leads', 'Venda realizada', 'Com reserva']
+
+def test_sql_etapa_funil(conn):
+    conn.register('leads', SITUACOES)
+    etapas = conn.execute(f"SELECT {sql_etapa_funil()} FROM leads").fetchall()
+    assert [e[0] for e in etapas] == ESPERADAS
+
+def test_filtros_leads_somente_periodo():
+    filtro, params = build_filtros_leads(FiltrosLeads(date(2025, 1, 1), date(2025, 1, 31), empreendimento='Todos'))
+    assert filtro == "CAST(data_consolidada AS DATE) BETWEEN ? AND ?"
+    assert params == [date(2025, 1, 1), date(2025, 1, 31)]
+
+def test_filtros_leads_com_todas_as_dimensoes():
+    filtros = FiltrosLeads(date(2025, 1, 1), date(2025, 1, 31), empreendimento='Ondina II',
+                           midias=['Site', 'Instagram'], corretores=['Ana'])
+    filtro, params = build_filtros_leads(filtros)
+    assert filtro == (
+        "CAST(data_consolidada AS DATE) BETWEEN ? AND ? AND empreendimento_ultimo = ? "
+        "AND midia_consolidada IN (?,?) AND corretor_consolidado IN (?)"
+    )
+    assert params == [date(2025, 1, 1), date(2025, 1, 31), 'Ondina II', 'Site', 'Instagram', 'Ana']
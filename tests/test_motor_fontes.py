@@ -0,0 +1,102 @@
+"""Carga das fontes e gravação da watermark (scripts/motor_fontes.py)"""
+
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+import scripts.motor_fontes as motor_fontes
+from scripts.motor_fontes import (
+    ConfigIncremental, Fonte, JanelaColeta, ESTRATEGIA_UPSERT, ESTRATEGIA_MERGE,
+    carregar_fonte, planejar_janela
+)
+from scripts.sync_state import EstadoSync, MODO_COMPLETO, MODO_INCREMENTAL, ler_estado_sync
+
+async def _sem_coleta(janela):
+    return None
+
+def _fonte(estrategia=ESTRATEGIA_UPSERT, coluna_watermark='referencia', coluna_particao=None):
+    return Fonte(
+        nome='teste', descricao='Teste', coletar=_sem_coleta, tabela='main.teste',
+        chave='id', estrategia=estrategia,
+        incremental=ConfigIncremental('TESTE', coluna_watermark=coluna_watermark),
+        coluna_particao=coluna_particao,
+    )
+
+def _df(ids, particao='1'):
+    return pd.DataFrame({
+        'id': ids,
+        'particao': [particao] * len(ids),
+        'referencia': pd.to_datetime(['2025-03-01'] * len(ids)) + pd.to_timedelta(ids, unit='D'),
+    })
+
+@pytest.fixture
+def tabela(conn):
+    """main.teste com ids 1..4 na partição '1' e 5..8 na partição '2'"""
+    df = pd.concat([_df([1, 2, 3, 4], '1'), _df([5, 6, 7, 8], '2')])
+    conn.register('df_inicial', df)
+    conn.execute("CREATE TABLE main.teste AS SELECT * FROM df_inicial")
+    conn.unregister('df_inicial')
+    return conn
+
+def _ids(conn):
+    return [r[0] for r in conn.execute("SELECT id FROM main.teste ORDER BY id").fetchall()]
+
+def test_coleta_completa_grava_watermark(tabela):
+    carregar_fonte(tabela, _fonte(), _df(list(range(1, 9))), JanelaColeta(), completa=True)
+    estado = ler_estado_sync('teste', tabela)
+    assert estado.watermark == datetime(2025, 3, 9)
+    assert estado.ultima_carga_completa is not None
+
+def test_coleta_incompleta_mantem_watermark_e_nao_remove(tabela):
+    mensagem = carregar_fonte(tabela, _fonte(), _df([1, 9]), JanelaColeta(), completa=False)
+    assert 'watermark mantida' in mensagem
+    assert ler_estado_sync('teste', tabela) is None
+    assert _ids(tabela) == list(range(1, 10))
+
+def test_coleta_completa_remove_chaves_ausentes(tabela):
+    carregar_fonte(tabela, _fonte(), _df([1, 2, 3, 4, 5, 6]), JanelaColeta(), completa=True)
+    assert _ids(tabela) == [1, 2, 3, 4, 5, 6]
+
+def test_coleta_parcial_substitui_so_as_particoes_buscadas(tabela):
+    fonte = _fonte(coluna_particao='particao')
+    carregar_fonte(tabela, fonte, _df([1, 2, 10], '1'), JanelaColeta(), completa=False, particoes=['1'])
+    assert _ids(tabela) == [1, 2, 5, 6, 7, 8, 10]
+    assert ler_estado_sync('teste', tabela) is None
+
+def test_merge_incremental_sem_coluna_watermark_usa_fim_da_janela(tabela):
+    fonte = _fonte(estrategia=ESTRATEGIA_MERGE, coluna_watermark=None)
+    janela = JanelaColeta(modo=MODO_INCREMENTAL, a_partir='2025-03-01', ate='2025-03-20')
+    carregar_fonte(tabela, fonte, _df([9]), janela, chaves_removidas=[8], completa=True)
+    assert _ids(tabela) == [1, 2, 3, 4, 5, 6, 7, 9]
+    estado = ler_estado_sync('teste', tabela)
+    assert estado.watermark == datetime(2025, 3, 20)
+    # Janela incremental não conta como carga completa
+    assert estado.ultima_carga_completa is None
+
+def test_coluna_descontinuada_e_removida_antes_da_carga(tabela):
+    tabela.execute("ALTER TABLE main.teste ADD COLUMN funil_etapa VARCHAR DEFAULT 'Leads'")
+    fonte = _fonte()
+    fonte.colunas_descontinuadas = ['funil_etapa', 'coluna_ja_removida']
+    carregar_fonte(tabela, fonte, _df(list(range(1, 10))), JanelaColeta(), completa=True)
+    colunas = [r[0] for r in tabela.execute("DESCRIBE main.teste").fetchall()]
+    assert 'funil_etapa' not in colunas
+    assert _ids(tabela) == list(range(1, 10))
+
+def test_tabela_inexistente_sem_registros_nao_cria_tabela(conn):
+    mensagem = carregar_fonte(conn, _fonte(), pd.DataFrame(), JanelaColeta(), completa=True)
+    assert 'tabela inexistente' in mensagem
+    assert conn.execute(
+        "SELECT COUNT(*) FROM information_schema.tables WHERE table_name = 'teste'"
+    ).fetchone()[0] == 0
+
+def test_planejar_janela(monkeypatch):
+    estado = EstadoSync('teste', datetime(2025, 3, 10), datetime.now(), datetime.now())
+    monkeypatch.setattr(motor_fontes, 'ler_estado_sync', lambda fonte: estado)
+
+    janela = planejar_janela(_fonte())
+    assert (janela.modo, janela.a_partir) == (MODO_INCREMENTAL, '2025-03-09')
+    assert planejar_janela(_fonte(), forcar_completa=True).modo == MODO_COMPLETO
+
+    monkeypatch.setenv('TESTE_INCREMENTAL', 'false')
+    assert planejar_janela(_fonte()).modo == MODO_COMPLETO
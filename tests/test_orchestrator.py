@@ -0,0 +1,145 @@
+"""Token bucket, circuit breaker e retentativas do orquestrador (scripts/orchestrator.py)"""
+
+import asyncio
+
+import pytest
+from aiohttp import web
+
+import scripts.orchestrator as orquestrador
+from scripts.orchestrator import APIOrchestrator, CircuitBreaker, RateLimiter, RetryPolicy
+
+class RelogioFalso:
+    def __init__(self):
+        self.agora = 1000.0
+
+    def __call__(self):
+        return self.agora
+
+@pytest.fixture
+def relogio(monkeypatch):
+    relogio = RelogioFalso()
+    monkeypatch.setattr(orquestrador.time, 'monotonic', relogio)
+    return relogio
+
+# RateLimiter
+
+def test_token_bucket_libera_o_burst_e_depois_espera(relogio):
+    limiter = RateLimiter('teste', rate_limit=60, burst=3)  # 1 token/s
+    for _ in range(3):
+        assert limiter.wait_time() == 0
+        limiter.tokens -= 1
+    assert limiter.wait_time() == pytest.approx(1.0)
+
+    relogio.agora += 0.5
+    assert limiter.wait_time() == pytest.approx(0.5)
+    relogio.agora += 10
+    # Reabastece até o burst, não além
+    assert limiter.wait_time() == 0
+    assert limiter.tokens == 3
+
+def test_acquire_respeita_a_taxa():
+    limiter = RateLimiter('teste', rate_limit=1200, burst=2)  # 20 tokens/s
+
+    async def adquirir_varios():
+        return await asyncio.gather(*(limiter.acquire() for _ in range(4)))
+
+    esperas = asyncio.run(adquirir_varios())
+    assert esperas[:2] == [0.0, 0.0]
+    assert sum(esperas) == pytest.approx(0.1, abs=0.03)
+
+# CircuitBreaker
+
+def test_breaker_abre_ao_atingir_o_limite(relogio):
+    breaker = CircuitBreaker('teste', failure_threshold=3, recovery_timeout=30)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN and not breaker.allow_request()
+    assert breaker.trips == 1
+
+def test_breaker_meio_aberto_admite_uma_unica_sonda(relogio):
+    breaker = CircuitBreaker('teste', failure_threshold=1, recovery_timeout=30)
+    breaker.record_failure()
+    relogio.agora += 30
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+    # Sonda liberada sem resultado (ex.: 4xx): a próxima chamada vira a sonda
+    breaker.release_probe()
+    assert breaker.allow_request()
+
+def test_breaker_sonda_com_falha_reabre_e_com_sucesso_fecha(relogio):
+    breaker = CircuitBreaker('teste', failure_threshold=1, recovery_timeout=30)
+    breaker.record_failure()
+    relogio.agora += 30
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN and breaker.trips == 2
+
+    relogio.agora += 30
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.failures == 0
+    assert breaker.allow_request() and breaker.allow_request()
+
+def test_sucesso_zera_falhas_consecutivas(relogio):
+    breaker = CircuitBreaker('teste', failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+# make_request
+
+def _executar_contra_servidor(status, requisicoes, max_attempts=3):
+    """Faz `requisicoes` chamadas a um servidor local que sempre responde `status`"""
+    chamadas = []
+
+    async def handler(request):
+        chamadas.append(request.path)
+        return web.json_response({'ok': status == 200}, status=status)
+
+    async def executar():
+        app = web.Application()
+        app.router.add_get('/', handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        porta = runner.addresses[0][1]
+
+        orq = APIOrchestrator(retry_policy=RetryPolicy(max_attempts=max_attempts, base_delay=0, jitter=0))
+        orq.rate_limiters['teste'] = RateLimiter('teste', rate_limit=60000, burst=100)
+        orq.circuit_breakers['teste'] = CircuitBreaker('teste', failure_threshold=2)
+        try:
+            resultados = [
+                await orq.make_request('teste', f'http://127.0.0.1:{porta}/', {})
+                for _ in range(requisicoes)
+            ]
+        finally:
+            await orq.close()
+            await runner.cleanup()
+        return resultados, orq.circuit_breakers['teste']
+
+    resultados, breaker = asyncio.run(executar())
+    return resultados, breaker, chamadas
+
+def test_retentativas_contam_uma_falha_por_requisicao():
+    resultados, breaker, chamadas = _executar_contra_servidor(503, requisicoes=1)
+    assert resultados[0]['attempts'] == 3 and len(chamadas) == 3
+    assert breaker.failures == 1
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_circuito_aberto_rejeita_sem_chamar_a_api():
+    resultados, breaker, chamadas = _executar_contra_servidor(503, requisicoes=3)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert resultados[2]['circuit_open'] and resultados[2]['attempts'] == 0
+    assert len(chamadas) == 6
+
+def test_erro_do_cliente_nao_conta_para_o_circuito():
+    resultados, breaker, chamadas = _executar_contra_servidor(404, requisicoes=3)
+    assert [r['status_code'] for r in resultados] == [404, 404, 404]
+    assert len(chamadas) == 3
+    assert breaker.failures == 0
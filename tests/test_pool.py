@@ -0,0 +1,94 @@
+"""Pool de cursores das sessões Streamlit (consultas_vendas/pool.py)"""
+
+import threading
+
+import duckdb
+import pytest
+
+from consultas_vendas import pool as modulo_pool
+from consultas_vendas.pool import PoolCursores, PoolEsgotado
+
+@pytest.fixture
+def conexoes():
+    """Conexões base abertas pelo pool, na ordem"""
+    abertas = []
+
+    def conectar():
+        conexao = duckdb.connect()
+        abertas.append(conexao)
+        return conexao
+
+    conectar.abertas = abertas
+    return conectar
+
+def test_reutiliza_o_cursor_devolvido(conexoes):
+    pool = PoolCursores(conexoes, tamanho=2)
+    with pool.cursor() as primeiro:
+        pass
+    with pool.cursor() as segundo:
+        assert segundo is primeiro
+    assert len(conexoes.abertas) == 1
+
+def test_threads_recebem_cursores_exclusivos(conexoes):
+    pool = PoolCursores(conexoes, tamanho=4)
+    barreira = threading.Barrier(4)
+    cursores, respostas = [], []
+
+    def consultar():
+        with pool.cursor() as cur:
+            cursores.append(cur)
+            barreira.wait(timeout=5)
+            respostas.append(cur.execute("SELECT 42").fetchone()[0])
+
+    threads = [threading.Thread(target=consultar) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(c) for c in cursores}) == 4
+    assert respostas == [42] * 4
+
+def test_pool_cheio_esgota_apos_a_espera(conexoes, monkeypatch):
+    monkeypatch.setattr(modulo_pool, 'ESPERA_POOL', 0.05)
+    pool = PoolCursores(conexoes, tamanho=1)
+    with pool.cursor():
+        with pytest.raises(PoolEsgotado):
+            with pool.cursor():
+                pass
+
+def test_erro_de_conexao_descarta_o_cursor(conexoes):
+    pool = PoolCursores(conexoes, tamanho=1)
+    with pytest.raises(duckdb.ConnectionException):
+        with pool.cursor() as cur:
+            descartado = cur
+            raise duckdb.ConnectionException("conexão perdida")
+    with pool.cursor() as cur:
+        assert cur is not descartado
+
+def test_erro_da_consulta_devolve_o_cursor(conexoes):
+    pool = PoolCursores(conexoes, tamanho=1)
+    with pytest.raises(duckdb.CatalogException):
+        with pool.cursor() as cur:
+            usado = cur
+            cur.execute("SELECT * FROM tabela_inexistente")
+    with pool.cursor() as cur:
+        assert cur is usado
+
+def test_reconectar_abre_nova_conexao_base(conexoes):
+    pool = PoolCursores(conexoes, tamanho=2)
+    with pool.cursor() as antigo:
+        pool.reconectar()
+    # O cursor da geração anterior não volta ao pool
+    with pool.cursor() as novo:
+        assert novo is not antigo
+        assert novo.execute("SELECT 1").fetchone()[0] == 1
+    assert len(conexoes.abertas) == 2
+
+def test_cursor_ocioso_e_verificado_antes_do_uso(conexoes, monkeypatch):
+    monkeypatch.setattr(modulo_pool, 'VERIFICAR_APOS', 0)
+    pool = PoolCursores(conexoes, tamanho=1)
+    with pool.cursor() as cur:
+        fechado = cur
+    fechado.close()
+    with pool.cursor() as cur:
+        assert cur is not fechado
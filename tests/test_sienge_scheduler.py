@@ -0,0 +1,122 @@
+"""Cota diária e ledger do agendador Sienge (scripts/sienge_scheduler.py)"""
+
+import asyncio
+from datetime import date, timedelta
+
+from scripts.sienge_scheduler import (
+    EMPREENDIMENTO_FIXO, LEDGER_TABLE, SiengeLedger, SiengeScheduler,
+    obter_empreendimentos_priorizados, planejar_tarefas
+)
+
+def _empreendimentos(n):
+    return [{'id': i, 'nome': f'Emp {i}'} for i in range(1, n + 1)]
+
+# planejar_tarefas
+
+def test_planejar_tarefas_mantem_as_duas_situacoes_juntas_em_ordem_de_prioridade():
+    planejadas, adiadas = planejar_tarefas(_empreendimentos(3), orcamento=4)
+    assert [(t.empreendimento['id'], t.situacao) for t in planejadas] == [
+        (1, 'SOLD'), (1, 'CANCELED'), (2, 'SOLD'), (2, 'CANCELED')
+    ]
+    assert [(t.empreendimento['id'], t.situacao) for t in adiadas] == [(3, 'SOLD'), (3, 'CANCELED')]
+
+def test_planejar_tarefas_sem_orcamento_adia_tudo():
+    planejadas, adiadas = planejar_tarefas(_empreendimentos(2), orcamento=0)
+    assert planejadas == [] and len(adiadas) == 4
+
+def test_planejar_tarefas_orcamento_maior_que_o_necessario():
+    planejadas, adiadas = planejar_tarefas(_empreendimentos(2), orcamento=40)
+    assert len(planejadas) == 4 and adiadas == []
+
+# SiengeLedger
+
+def test_ledger_persiste_a_cota_entre_instancias(conn):
+    ledger = SiengeLedger(conn, limite_diario=10)
+    ledger.registrar('sienge_vendas_realizadas', 1, 3, True)
+    ledger.registrar('sienge_vendas_canceladas', 1, 2, False)
+
+    # Nova execução no mesmo dia enxerga o consumo anterior
+    assert SiengeLedger(conn, limite_diario=10).restantes() == 5
+
+def test_ledger_ignora_requisicoes_de_outros_dias(conn):
+    ledger = SiengeLedger(conn, limite_diario=10)
+    conn.execute(
+        f"INSERT INTO {LEDGER_TABLE} VALUES (now(), ?, 'sienge_vendas_realizadas', '1', 8, true)",
+        [date.today() - timedelta(days=1)]
+    )
+    assert ledger.usadas_hoje() == 0
+
+def test_ledger_nunca_fica_negativo(conn):
+    ledger = SiengeLedger(conn, limite_diario=2)
+    ledger.registrar('sienge_vendas_realizadas', 1, 5, True)
+    assert ledger.restantes() == 0
+
+def test_ledger_sem_conexao_conta_em_memoria():
+    ledger = SiengeLedger(None, limite_diario=4)
+    ledger.registrar('sienge_vendas_realizadas', 1, 3, True)
+    assert ledger.restantes() == 1
+
+# obter_empreendimentos_priorizados
+
+def test_priorizacao_por_vendas_recentes(conn):
+    hoje = date.today()
+    conn.execute("""
+        CREATE TABLE main.cv_vendas (
+            codigointerno_empreendimento VARCHAR, empreendimento VARCHAR, data_venda VARCHAR
+        )
+    """)
+    conn.executemany("INSERT INTO main.cv_vendas VALUES (?, ?, ?)", [
+        ['1', 'Antigo', str(hoje - timedelta(days=400))],
+        ['2', 'Ativo', str(hoje - timedelta(days=5))],
+        ['2', 'Ativo', str(hoje - timedelta(days=10))],
+        ['3', 'Recente', str(hoje - timedelta(days=1))],
+    ])
+
+    ids = [str(e['id']) for e in obter_empreendimentos_priorizados(conn)]
+    assert ids == ['2', '3', '1', str(EMPREENDIMENTO_FIXO['id'])]
+
+# SiengeScheduler.executar
+
+class ClienteFalso:
+    """Responde toda requisição com sucesso, consumindo `tentativas` da cota"""
+
+    def __init__(self, tentativas=1):
+        self.tentativas = tentativas
+        self.chamadas = []
+
+    async def buscar_vendas_empreendimento(self, emp, situacao, data_fim):
+        self.chamadas.append((emp['id'], situacao))
+        return {'success': True, 'attempts': self.tentativas, 'data': {'data': [{'id': emp['id']}]}}
+
+def _scheduler(conn, limite, n_empreendimentos, tentativas=1):
+    scheduler = SiengeScheduler.__new__(SiengeScheduler)
+    scheduler.conn = conn
+    scheduler.ledger = SiengeLedger(conn, limite)
+    scheduler.empreendimentos = _empreendimentos(n_empreendimentos)
+    scheduler.client = ClienteFalso(tentativas)
+    return scheduler
+
+def test_executar_adia_o_que_nao_cabe_na_cota(conn):
+    scheduler = _scheduler(conn, limite=4, n_empreendimentos=3)
+    resultados = asyncio.run(scheduler.executar('2025-01-31'))
+
+    assert scheduler.client.chamadas == [(1, 'SOLD'), (1, 'CANCELED'), (2, 'SOLD'), (2, 'CANCELED')]
+    assert resultados['SOLD'].empreendimentos_ok == ['1', '2']
+    assert resultados['SOLD'].empreendimentos_adiados == ['3']
+    assert not resultados['CANCELED'].completo
+    assert scheduler.ledger.restantes() == 0
+
+def test_executar_reconfere_a_cota_quando_ha_retentativas(conn):
+    # Cada requisição consome 2 (retentativa do orquestrador): só metade do plano cabe
+    scheduler = _scheduler(conn, limite=4, n_empreendimentos=2, tentativas=2)
+    resultados = asyncio.run(scheduler.executar('2025-01-31'))
+
+    assert scheduler.client.chamadas == [(1, 'SOLD'), (1, 'CANCELED')]
+    assert resultados['SOLD'].empreendimentos_adiados == ['2']
+    assert resultados['CANCELED'].empreendimentos_adiados == ['2']
+
+def test_executar_com_cota_suficiente_fica_completo(conn):
+    scheduler = _scheduler(conn, limite=40, n_empreendimentos=2)
+    resultados = asyncio.run(scheduler.executar('2025-01-31'))
+    assert resultados['SOLD'].completo and resultados['CANCELED'].completo
+    assert len(resultados['SOLD'].dados) == 2
@@ -0,0 +1,160 @@
+"""Estado do sync incremental e cargas por chave (scripts/sync_state.py)"""
+
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from scripts.carga_atomica import ErroValidacaoCarga
+from scripts.sync_state import (
+    EstadoSync, MODO_COMPLETO, MODO_INCREMENTAL, aplicar_upsert, calcular_watermark,
+    mesclar_por_chave, planejar_sync, salvar_estado_sync, ler_estado_sync, substituir_particoes
+)
+
+def _estado(watermark, dias_desde_completa):
+    agora = datetime.now()
+    completa = None if dias_desde_completa is None else agora - timedelta(days=dias_desde_completa)
+    return EstadoSync('cv_leads', watermark, completa, agora)
+
+@pytest.fixture
+def vendas(conn):
+    """main.vendas com ids 1..10"""
+    df = pd.DataFrame({'id': range(1, 11), 'valor': [100.0] * 10})
+    conn.register('df_inicial', df)
+    conn.execute("CREATE TABLE main.vendas AS SELECT * FROM df_inicial")
+    conn.unregister('df_inicial')
+    return conn
+
+def _ids(conn, tabela='main.vendas'):
+    return [r[0] for r in conn.execute(f"SELECT id FROM {tabela} ORDER BY id").fetchall()]
+
+def _log(conn):
+    return sorted(r[0] for r in conn.execute("SELECT chave FROM main.log_alteracoes").fetchall())
+
+# planejar_sync
+
+def test_planejar_sync_sem_estado_faz_carga_completa():
+    assert planejar_sync(None) == (MODO_COMPLETO, None)
+    assert planejar_sync(_estado(None, 1)) == (MODO_COMPLETO, None)
+
+def test_planejar_sync_forcado_faz_carga_completa():
+    assert planejar_sync(_estado(datetime(2025, 3, 10), 1), forcar_completa=True) == (MODO_COMPLETO, None)
+
+def test_planejar_sync_carga_completa_antiga_ou_ausente():
+    watermark = datetime(2025, 3, 10)
+    assert planejar_sync(_estado(watermark, 8), dias_carga_completa=7) == (MODO_COMPLETO, None)
+    assert planejar_sync(_estado(watermark, None)) == (MODO_COMPLETO, None)
+
+def test_planejar_sync_incremental_recua_o_overlap():
+    estado = _estado(datetime(2025, 3, 10, 15, 30), 1)
+    assert planejar_sync(estado, overlap_dias=1) == (MODO_INCREMENTAL, '2025-03-09')
+    assert planejar_sync(estado, overlap_dias=3) == (MODO_INCREMENTAL, '2025-03-07')
+
+def test_calcular_watermark():
+    df = pd.DataFrame({'referencia': ['2025-03-01 08:00', None, '2025-03-05 10:00', '2025-02-28 23:59']})
+    assert calcular_watermark(df, 'referencia') == datetime(2025, 3, 5, 10, 0)
+    assert calcular_watermark(pd.DataFrame(), 'referencia') is None
+    assert calcular_watermark(df, 'outra') is None
+
+def test_salvar_estado_sync_mantem_watermark_anterior_quando_nula(conn):
+    salvar_estado_sync(conn, 'cv_leads', datetime(2025, 3, 5), carga_completa=True)
+    salvar_estado_sync(conn, 'cv_leads', None, carga_completa=False)
+    estado = ler_estado_sync('cv_leads', conn)
+    assert estado.watermark == datetime(2025, 3, 5)
+    assert estado.ultima_carga_completa is not None
+
+# aplicar_upsert
+
+def test_upsert_conta_inseridos_atualizados_e_inalterados(vendas):
+    df = pd.DataFrame({'id': list(range(1, 11)) + [11], 'valor': [100.0] * 9 + [999.0, 50.0]})
+    resultado = aplicar_upsert(vendas, df, 'main.vendas', 'id')
+    assert (resultado.inseridos, resultado.atualizados, resultado.removidos, resultado.inalterados) == (1, 1, 0, 9)
+    assert vendas.execute("SELECT valor FROM main.vendas WHERE id = 10").fetchone()[0] == 999.0
+    assert _log(vendas) == ['10', '11']
+
+def test_upsert_completo_remove_chaves_ausentes(vendas):
+    df = pd.DataFrame({'id': range(1, 9), 'valor': [100.0] * 8})
+    resultado = aplicar_upsert(vendas, df, 'main.vendas', 'id', detectar_remocoes=True)
+    assert resultado.removidos == 2
+    assert _ids(vendas) == list(range(1, 9))
+    assert _log(vendas) == ['10', '9']
+
+def test_upsert_sem_deteccao_de_remocoes_nao_apaga(vendas):
+    # Coleta parcial: só parte das chaves veio, nenhuma pode ser apagada
+    df = pd.DataFrame({'id': [1, 2], 'valor': [1.0, 2.0]})
+    resultado = aplicar_upsert(vendas, df, 'main.vendas', 'id', detectar_remocoes=False)
+    assert resultado.removidos == 0
+    assert _ids(vendas) == list(range(1, 11))
+
+def test_upsert_recusa_queda_de_volume_e_mantem_a_tabela(vendas):
+    df = pd.DataFrame({'id': [1, 2], 'valor': [1.0, 2.0]})
+    with pytest.raises(ErroValidacaoCarga):
+        aplicar_upsert(vendas, df, 'main.vendas', 'id', detectar_remocoes=True)
+    assert _ids(vendas) == list(range(1, 11))
+    assert vendas.execute("SELECT SUM(valor) FROM main.vendas").fetchone()[0] == 1000.0
+
+def test_upsert_limite_de_queda_configuravel(vendas, monkeypatch):
+    monkeypatch.setenv('CARGA_QUEDA_MAXIMA', '0.9')
+    df = pd.DataFrame({'id': [1, 2], 'valor': [100.0, 100.0]})
+    assert aplicar_upsert(vendas, df, 'main.vendas', 'id').removidos == 8
+
+def test_upsert_ignora_colunas_de_controle_e_descarta_chaves_nulas(vendas):
+    vendas.execute("ALTER TABLE main.vendas ADD COLUMN processado_em TIMESTAMP")
+    df = pd.DataFrame({
+        'id': list(range(1, 11)) + [None],
+        'valor': [100.0] * 11,
+        'processado_em': [datetime.now()] * 11,
+    })
+    resultado = aplicar_upsert(vendas, df, 'main.vendas', 'id')
+    assert (resultado.inseridos, resultado.atualizados, resultado.inalterados) == (0, 0, 10)
+
+def test_upsert_adiciona_colunas_novas(vendas):
+    df = pd.DataFrame({'id': range(1, 11), 'valor': [100.0] * 10, 'cidade': ['X'] * 10})
+    resultado = aplicar_upsert(vendas, df, 'main.vendas', 'id')
+    assert resultado.atualizados == 10
+    assert vendas.execute("SELECT COUNT(*) FROM main.vendas WHERE cidade = 'X'").fetchone()[0] == 10
+
+# mesclar_por_chave
+
+def test_mesclar_substitui_chaves_da_janela_e_remove_as_que_sairam(vendas):
+    df = pd.DataFrame({'id': [2, 2, 12], 'valor': [1.0, 2.0, 3.0]})
+    assert mesclar_por_chave(vendas, df, 'main.vendas', 'id', chaves_removidas=[5, '6']) == 2
+    assert _ids(vendas) == [1, 2, 3, 4, 7, 8, 9, 10, 12]
+    # Duplicada na janela: vale a última versão
+    assert vendas.execute("SELECT valor FROM main.vendas WHERE id = 2").fetchone()[0] == 2.0
+    assert _log(vendas) == ['12', '2', '5', '6']
+
+def test_mesclar_apenas_remocoes(vendas):
+    mesclar_por_chave(vendas, pd.DataFrame(), 'main.vendas', 'id', chaves_removidas=[1])
+    assert _ids(vendas) == list(range(2, 11))
+
+# substituir_particoes
+
+@pytest.fixture
+def vendas_por_empreendimento(conn):
+    df = pd.DataFrame({
+        'id': range(1, 11),
+        'enterpriseId': ['1'] * 3 + ['2'] * 3 + ['3'] * 4,
+    })
+    conn.register('df_inicial', df)
+    conn.execute("CREATE TABLE main.vendas AS SELECT * FROM df_inicial")
+    conn.unregister('df_inicial')
+    return conn
+
+def test_substituir_particoes_mantem_as_demais(vendas_por_empreendimento):
+    conn = vendas_por_empreendimento
+    df = pd.DataFrame({'id': [1, 2, 20], 'enterpriseId': ['1', '1', '1']})
+    assert substituir_particoes(conn, df, 'main.vendas', 'enterpriseId', [1], chave='id') == 3
+    assert _ids(conn) == [1, 2, 4, 5, 6, 7, 8, 9, 10, 20]
+    assert _log(conn) == ['1', '1', '2', '2', '20', '3']
+
+def test_substituir_particoes_sem_registros_apaga_a_particao(vendas_por_empreendimento):
+    conn = vendas_por_empreendimento
+    substituir_particoes(conn, pd.DataFrame(), 'main.vendas', 'enterpriseId', ['2'])
+    assert _ids(conn) == [1, 2, 3, 7, 8, 9, 10]
+
+def test_substituir_particoes_recusa_queda_de_volume(vendas_por_empreendimento):
+    conn = vendas_por_empreendimento
+    with pytest.raises(ErroValidacaoCarga):
+        substituir_particoes(conn, pd.DataFrame(), 'main.vendas', 'enterpriseId', ['1', '2', '3'])
+    assert _ids(conn) == list(range(1, 11))
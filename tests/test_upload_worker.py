@@ -0,0 +1,58 @@
+"""Upload por fonte durante as coletas (scripts/upload_worker.py)"""
+
+import asyncio
+
+from scripts.upload_worker import UploadWorker
+
+def test_uploads_em_serie_na_ordem_de_chegada(conn):
+    ordem = []
+
+    def carregar(nome):
+        def executar(c):
+            ordem.append(nome)
+            c.execute(f"CREATE TABLE main.{nome} AS SELECT 1 AS id")
+            return f"{nome} carregada"
+        return executar
+
+    async def executar():
+        worker = UploadWorker(conn)
+        worker.iniciar()
+        for nome in ('cv_vendas', 'cv_leads', 'cv_repasses'):
+            worker.enviar(nome, carregar(nome))
+        return await worker.finalizar()
+
+    resultados = asyncio.run(executar())
+    assert ordem == ['cv_vendas', 'cv_leads', 'cv_repasses']
+    assert all(r.sucesso for r in resultados.values())
+    assert resultados['cv_leads'].mensagem == 'cv_leads carregada'
+
+def test_falha_em_um_upload_nao_interrompe_a_fila(conn):
+    def quebrar(c):
+        raise RuntimeError("falha de rede")
+
+    async def executar():
+        worker = UploadWorker(conn)
+        worker.iniciar()
+        worker.enviar('cv_vendas', quebrar)
+        worker.enviar('cv_leads', lambda c: 'ok')
+        return await worker.finalizar()
+
+    resultados = asyncio.run(executar())
+    assert not resultados['cv_vendas'].sucesso and 'falha de rede' in resultados['cv_vendas'].mensagem
+    assert resultados['cv_leads'].sucesso
+
+def test_aguardar_libera_apos_o_commit_da_fonte(conn):
+    async def executar():
+        worker = UploadWorker(conn)
+        worker.iniciar()
+        assert await worker.aguardar('cv_vendas') is None  # fonte sem upload enfileirado
+
+        worker.enviar('cv_vendas', lambda c: c.execute("CREATE TABLE main.cv_vendas AS SELECT 1 AS id") and 'ok')
+        resultado = await worker.aguardar('cv_vendas')
+        # A tabela já existe para as fontes dependentes
+        linhas = conn.execute("SELECT COUNT(*) FROM main.cv_vendas").fetchone()[0]
+        await worker.finalizar()
+        return resultado, linhas
+
+    resultado, linhas = asyncio.run(executar())
+    assert resultado.sucesso and linhas == 1
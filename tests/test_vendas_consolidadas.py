@@ -0,0 +1,222 @@
+"""Tabela materializada de vendas consolidadas (scripts/vendas_consolidadas.py)"""
+
+import pytest
+
+from scripts.sync_state import ler_estado_sync, registrar_alteracoes
+from scripts.vendas_consolidadas import (
+    FONTE_SYNC, TABELA_CUBO_VENDAS, TABELA_DIMENSOES_VENDAS, TABELA_VENDAS_CONSOLIDADAS,
+    VIEW_VENDAS_CONSOLIDADAS,
+    atualizar_vendas_consolidadas_incremental, materializar_vendas_consolidadas,
+    sql_vendas_consolidadas
+)
+
+COLUNAS_VERA_CRUZ = """
+    idreserva INTEGER, enterpriseId INTEGER, nome_empreendimento VARCHAR, value DOUBLE,
+    issueDate DATE, contractDate DATE, origem VARCHAR, corretor VARCHAR, imobiliaria VARCHAR,
+    cliente VARCHAR, email VARCHAR, cidade VARCHAR, cep_cliente VARCHAR, renda VARCHAR,
+    sexo VARCHAR, idade VARCHAR, estado_civil VARCHAR, documento_cliente VARCHAR,
+    idcliente INTEGER, idcorretor INTEGER, idimobiliaria INTEGER, situacao_original VARCHAR,
+    data_venda VARCHAR, valor_contrato_com_juros DOUBLE, vencimento VARCHAR, campanha VARCHAR,
+    midia VARCHAR, tipovenda VARCHAR, grupo VARCHAR, regiao VARCHAR, bloco VARCHAR,
+    unidade VARCHAR, etapa VARCHAR, vpl_reserva DOUBLE, vpl_tabela DOUBLE
+"""
+
+def _venda_sienge(conn, tabela, id, enterprise_id, valor, data, idimobiliaria=7):
+    conn.execute(f"""
+        INSERT INTO reservas.main.{tabela} VALUES (
+            ?, ?, ?, ?, ?,
+            [{{'id': ?, 'name': 'Corretor Sienge'}}],
+            [{{'name': 'Cliente ' || ?, 'email': NULL, 'addresses': [], 'profession': NULL,
+               'cpf': NULL, 'id': 1, 'sex': NULL, 'civilStatus': NULL}}]
+        )
+    """, [id, enterprise_id, valor, data, data, idimobiliaria, id])
+
+@pytest.fixture
+def bancos(conn):
+    """reservas (banco atual, como no MotherDuck) e informacoes_consolidadas"""
+    conn.execute("ATTACH ':memory:' AS reservas")
+    conn.execute("ATTACH ':memory:' AS informacoes_consolidadas")
+    conn.execute("USE reservas")
+    for tabela in ('sienge_vendas_realizadas', 'sienge_vendas_canceladas'):
+        conn.execute(f"""
+            CREATE TABLE main.{tabela} (
+                id VARCHAR, enterpriseId VARCHAR, value DOUBLE, issueDate VARCHAR, contractDate VARCHAR,
+                brokers STRUCT(id INTEGER, name VARCHAR)[],
+                customers STRUCT(name VARCHAR, email VARCHAR, addresses STRUCT(city VARCHAR, zipCode VARCHAR)[],
+                                 profession VARCHAR, cpf VARCHAR, id INTEGER, sex VARCHAR, civilStatus VARCHAR)[]
+            )
+        """)
+    conn.execute("""
+        CREATE TABLE main.reservas_abril (
+            idreserva INTEGER, idempreendimento INTEGER, empreendimento VARCHAR, corretor VARCHAR,
+            imobiliaria VARCHAR, idimobiliaria INTEGER, codigointerno VARCHAR,
+            vpl_reserva DOUBLE, vpl_tabela DOUBLE
+        )
+    """)
+    # Duas reservas no mesmo empreendimento e imobiliária: o lookup deve usar só a mais recente
+    conn.execute("""
+        INSERT INTO main.reservas_abril VALUES
+            (1, 100, 'Residencial Alfa', 'Ana', 'Imob Sul', 7, 'S1', 900, 1000),
+            (2, 100, 'Residencial Alfa', 'Bruno', 'Imob Sul', 7, NULL, NULL, NULL),
+            (10, 200, 'Vera Cruz', 'Carla', 'Imob Norte', 8, NULL, NULL, NULL)
+    """)
+    conn.execute(f"CREATE TABLE main.cv_vendas_consolidadas_vera_cruz ({COLUNAS_VERA_CRUZ})")
+    conn.execute("""
+        INSERT INTO main.cv_vendas_consolidadas_vera_cruz (idreserva, enterpriseId, nome_empreendimento,
+            value, contractDate, origem, corretor, imobiliaria, midia, tipovenda)
+        VALUES (10, 200, 'Vera Cruz', 500, DATE '2025-03-10', 'Reserva', 'Carla', 'Imob Norte', 'Site', 'Financiada')
+    """)
+    _venda_sienge(conn, 'sienge_vendas_realizadas', 'S1', '100', 1000.0, '2025-03-01')
+    _venda_sienge(conn, 'sienge_vendas_realizadas', 'S2', '100', 2000.0, '2025-03-02')
+    _venda_sienge(conn, 'sienge_vendas_canceladas', 'C1', '100', 300.0, '2025-03-05')
+    return conn
+
+def _vendas(conn):
+    return conn.execute(f"""
+        SELECT chave_venda, nome_empreendimento, corretor, imobiliaria, value
+        FROM {TABELA_VENDAS_CONSOLIDADAS} ORDER BY chave_venda
+    """).fetchall()
+
+def _diferencas_da_reconstrucao(conn):
+    """Linhas que diferem entre a tabela e uma reconstrução completa"""
+    return conn.execute(f"""
+        SELECT COUNT(*) FROM (
+            (SELECT * FROM {TABELA_VENDAS_CONSOLIDADAS} EXCEPT ALL SELECT * FROM ({sql_vendas_consolidadas()}))
+            UNION ALL
+            (SELECT * FROM ({sql_vendas_consolidadas()}) EXCEPT ALL SELECT * FROM {TABELA_VENDAS_CONSOLIDADAS})
+        )
+    """).fetchone()[0]
+
+def _carregar_venda(conn, tabela, id, **kwargs):
+    """Insere uma venda Sienge e registra a chave no change log, como os loaders"""
+    _venda_sienge(conn, tabela, id, **kwargs)
+    registrar_alteracoes(conn, f'main.{tabela}', f"SELECT '{id}'")
+
+# Materialização completa
+
+def test_materializa_uma_linha_por_venda(bancos):
+    assert materializar_vendas_consolidadas(bancos) == 4
+    assert _vendas(bancos) == [
+        ('reservas_abril:10', 'Vera Cruz', 'Carla', 'Imob Norte', 500.0),
+        ('sienge_vendas_canceladas:C1', 'Residencial Alfa', 'Bruno', 'Imob Sul', 300.0),
+        ('sienge_vendas_realizadas:S1', 'Residencial Alfa', 'Bruno', 'Imob Sul', 1000.0),
+        ('sienge_vendas_realizadas:S2', 'Residencial Alfa', 'Bruno', 'Imob Sul', 2000.0),
+    ]
+    # Reserva pelo código interno da venda
+    vpl = bancos.execute(f"""
+        SELECT vpl_reserva, vpl_tabela FROM {TABELA_VENDAS_CONSOLIDADAS}
+        WHERE chave_venda = 'sienge_vendas_realizadas:S1'
+    """).fetchone()
+    assert vpl == (900.0, 1000.0)
+
+def test_view_e_alias_da_tabela_e_estado_gravado(bancos):
+    materializar_vendas_consolidadas(bancos)
+    assert bancos.execute(f"SELECT COUNT(*) FROM {VIEW_VENDAS_CONSOLIDADAS}").fetchone()[0] == 4
+    estado = ler_estado_sync(FONTE_SYNC, bancos)
+    assert estado is not None and estado.ultima_carga_completa is not None
+
+# Atualização incremental
+
+@pytest.fixture
+def materializada(bancos):
+    atualizar_vendas_consolidadas_incremental(bancos)  # sem estado: reconstrução completa
+    return bancos
+
+def test_sem_estado_reconstroi_a_tabela_inteira(bancos):
+    assert atualizar_vendas_consolidadas_incremental(bancos) == 4
+    assert ler_estado_sync(FONTE_SYNC, bancos).ultima_carga_completa is not None
+
+def test_sem_alteracoes_nao_recalcula_nada(materializada):
+    assert atualizar_vendas_consolidadas_incremental(materializada) == 0
+    assert len(_vendas(materializada)) == 4
+
+def test_venda_nova_no_log_e_recalculada(materializada):
+    _carregar_venda(materializada, 'sienge_vendas_realizadas', 'S3',
+                    enterprise_id='100', valor=3000.0, data='2025-03-20')
+    assert atualizar_vendas_consolidadas_incremental(materializada) == 1
+    assert ('sienge_vendas_realizadas:S3', 'Residencial Alfa', 'Bruno', 'Imob Sul', 3000.0) in _vendas(materializada)
+    assert _diferencas_da_reconstrucao(materializada) == 0
+
+    # O log já aplicado não é reprocessado
+    assert atualizar_vendas_consolidadas_incremental(materializada) == 0
+
+def test_venda_removida_no_log_sai_da_tabela(materializada):
+    materializada.execute("DELETE FROM reservas.main.sienge_vendas_realizadas WHERE id = 'S2'")
+    registrar_alteracoes(materializada, 'main.sienge_vendas_realizadas', "SELECT 'S2'")
+    assert atualizar_vendas_consolidadas_incremental(materializada) == 1
+    assert 'sienge_vendas_realizadas:S2' not in [v[0] for v in _vendas(materializada)]
+    assert _diferencas_da_reconstrucao(materializada) == 0
+
+def test_reserva_alterada_recalcula_as_vendas_que_usam_o_lookup(materializada):
+    # reservas_abril não tem loader: a mudança é detectada pelo snapshot
+    materializada.execute("UPDATE reservas.main.reservas_abril SET corretor = 'Bia' WHERE idreserva = 2")
+    atualizar_vendas_consolidadas_incremental(materializada)
+
+    corretores = {v[0]: v[2] for v in _vendas(materializada)}
+    assert corretores['sienge_vendas_realizadas:S1'] == 'Bia'
+    assert corretores['sienge_vendas_canceladas:C1'] == 'Bia'
+    assert corretores['reservas_abril:10'] == 'Carla'
+    assert _diferencas_da_reconstrucao(materializada) == 0
+
+    # Snapshot atualizado: a mesma alteração não é recalculada de novo
+    assert atualizar_vendas_consolidadas_incremental(materializada) == 0
+
+def test_tabela_sienge_substituida_por_inteiro_reconstroi(materializada):
+    _venda_sienge(materializada, 'sienge_vendas_canceladas', 'C2', '100', 400.0, '2025-03-21')
+    registrar_alteracoes(materializada, 'main.sienge_vendas_canceladas')  # sem chaves
+    assert atualizar_vendas_consolidadas_incremental(materializada) == 5
+    assert _diferencas_da_reconstrucao(materializada) == 0
+
+def test_incremental_desligado_reconstroi(materializada, monkeypatch):
+    monkeypatch.setenv('VENDAS_CONSOLIDADAS_INCREMENTAL', 'false')
+    assert atualizar_vendas_consolidadas_incremental(materializada) == 4
+
+# Cubo dos dashboards
+
+def _cubo(conn):
+    return conn.execute(f"""
+        SELECT contractDate::VARCHAR, imobiliaria, corretor, origem, qtd_vendas, soma_valor,
+               soma_vpl_reserva, soma_vpl_tabela
+        FROM {TABELA_CUBO_VENDAS} ORDER BY contractDate, origem
+    """).fetchall()
+
+def test_cubo_agrega_por_dia_e_dimensoes(bancos):
+    # Mesmo dia e dimensões de S1; sem reserva pelo código interno (fora da soma de VPL)
+    _venda_sienge(bancos, 'sienge_vendas_realizadas', 'S4', '100', 500.0, '2025-03-01')
+    materializar_vendas_consolidadas(bancos)
+
+    assert _cubo(bancos) == [
+        ('2025-03-01', 'Imob Sul', 'Bruno', 'Sienge Realizada', 2, 1500.0, 900.0, 1000.0),
+        ('2025-03-02', 'Imob Sul', 'Bruno', 'Sienge Realizada', 1, 2000.0, None, None),
+        ('2025-03-05', 'Imob Sul', 'Bruno', 'Sienge Cancelada', 1, 300.0, None, None),
+        ('2025-03-10', 'Imob Norte', 'Carla', 'Reserva', 1, 500.0, None, None),
+    ]
+
+def test_cubo_normaliza_imobiliaria_e_corretor_vazios(bancos):
+    bancos.execute("UPDATE reservas.main.cv_vendas_consolidadas_vera_cruz SET imobiliaria = '  ', corretor = NULL")
+    materializar_vendas_consolidadas(bancos)
+    assert _cubo(bancos)[-1][1:3] == ('—', '—')
+
+def test_cubo_acompanha_a_atualizacao_incremental(materializada):
+    _carregar_venda(materializada, 'sienge_vendas_realizadas', 'S3',
+                    enterprise_id='100', valor=3000.0, data='2025-03-02')
+    atualizar_vendas_consolidadas_incremental(materializada)
+    assert _cubo(materializada)[1][4:6] == (2, 5000.0)
+
+# Dimensões dos filtros
+
+def test_dimensoes_trazem_valores_periodo_e_quantidade(bancos):
+    materializar_vendas_consolidadas(bancos)
+    linhas = bancos.execute(f"""
+        SELECT dimensao, valor, data_min::VARCHAR, data_max::VARCHAR, qtd_vendas
+        FROM {TABELA_DIMENSOES_VENDAS}
+        WHERE dimensao IN ('total', 'nome_empreendimento', 'imobiliaria')
+        ORDER BY dimensao, valor
+    """).fetchall()
+    assert linhas == [
+        ('imobiliaria', 'Imob Norte', '2025-03-10', '2025-03-10', 1),
+        ('imobiliaria', 'Imob Sul', '2025-03-01', '2025-03-05', 3),
+        ('nome_empreendimento', 'Residencial Alfa', '2025-03-01', '2025-03-05', 3),
+        ('nome_empreendimento', 'Vera Cruz', '2025-03-10', '2025-03-10', 1),
+        ('total', None, '2025-03-01', '2025-03-10', 4),
+    ]
@@ -8,19 +8,18 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, date, timedelta
-from typing import List, Optional
 
 # Importar utilitários locais
 from utils.md_conn import (
     get_md_connection, 
     get_date_range, 
     get_kpis, 
-    get_timeline_data,
     get_top_empreendimentos,
     get_unique_values,
     get_vendas_with_metas,
     get_metas_periodo,
-    get_analytics_by_dimension
+    get_analytics_by_dimension,
+    ExecutorPaineis
 )
 from utils.formatters import (
     format_currency, 
@@ -131,15 +130,14 @@ def render_kpis(kpis: dict):
             help="Menor valor de venda individual"
         )
 
-def render_metas_section(data_inicial: str, data_final: str, empreendimento: str):
+def render_metas_section(meta_periodo: float, kpis: dict):
     """Renderiza seção de metas."""
     st.subheader("🎯 Análise de Metas")
     
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        # Calcular meta do período
-        meta_periodo = get_metas_periodo(data_inicial, data_final, empreendimento)
+        # Meta do período
         st.metric(
             "Meta do Período",
             format_compact_currency(meta_periodo),
@@ -148,7 +146,6 @@ def render_metas_section(data_inicial: str, data_final: str, empreendimento: str
     
     with col2:
         # Calcular atingimento
-        kpis = st.session_state.get('kpis', {})
         valor_vendas = kpis.get('total_valor', 0)
         atingimento = (valor_vendas / meta_periodo * 100) if meta_periodo > 0 else 0
         
@@ -272,15 +269,10 @@ def render_top_empreendimentos(top_empreendimentos: pd.DataFrame):
         
         st.plotly_chart(fig, use_container_width=True)
 
-def render_house_analysis(data_inicial: str, data_final: str, 
-                         midia_selecionada: List[str], tipovenda_selecionada: List[str],
-                         empreendimento_selecionado: str):
+def render_house_analysis(vendas_data: pd.DataFrame):
     """Renderiza análise House vs Imobiliárias."""
     st.subheader("🏠 Análise Vendas House x Imobiliárias")
     
-    # Obter dados com análise de origem
-    vendas_data = get_vendas_with_metas(data_inicial, data_final, midia_selecionada, tipovenda_selecionada, empreendimento_selecionado)
-    
     if vendas_data.empty:
         st.warning("Nenhum dado disponível para o período selecionado.")
         return
@@ -326,15 +318,10 @@ def render_house_analysis(data_inicial: str, data_final: str,
             help=f"Percentual de vendas e mútuos realizados pela Prati: {taxa_house:.1f}%\n\nRegra: Calculado pelo valor das vendas"
         )
 
-def render_empreendimentos_estratificados(data_inicial: str, data_final: str,
-                                         midia_selecionada: List[str], tipovenda_selecionada: List[str],
-                                         empreendimento_selecionado: str):
+def render_empreendimentos_estratificados(vendas_data: pd.DataFrame):
     """Renderiza tabela estratificada por empreendimento."""
     st.subheader("🏢 Vendas por Empreendimento (House x Externa)")
     
-    # Obter dados
-    vendas_data = get_vendas_with_metas(data_inicial, data_final, midia_selecionada, tipovenda_selecionada, empreendimento_selecionado)
-    
     if vendas_data.empty:
         st.warning("Nenhum dado disponível para o período selecionado.")
         return
@@ -483,43 +470,60 @@ def main():
     data_inicial_str = data_inicial.strftime('%Y-%m-%d')
     data_final_str = data_final.strftime('%Y-%m-%d')
     
-    # Carregar dados com loading
-    with st.spinner("🔄 Carregando dados..."):
-        try:
-            # Carregar KPIs
-            kpis = get_kpis(data_inicial_str, data_final_str, midia_selecionada, tipovenda_selecionada, empreendimento_selecionado)
-            st.session_state.kpis = kpis
+    # Espaços dos painéis na ordem da página, preenchidos conforme os dados chegam
+    secoes = ['kpis', 'metas', 'top_empreendimentos', 'house', 'estratificacao']
+    espacos = {}
+    for i, secao in enumerate(secoes):
+        if i > 0:
+            st.markdown("---")
+        espacos[secao] = st.empty()
+        espacos[secao].info("🔄 Carregando...")
+    
+    filtros = (data_inicial_str, data_final_str, midia_selecionada, tipovenda_selecionada, empreendimento_selecionado)
+    
+    # Consultas independentes em paralelo; cada painel é renderizado ao ficar pronto
+    resultados = {}
+    with ExecutorPaineis() as executor:
+        executor.enviar('kpis', get_kpis, *filtros)
+        executor.enviar('metas', get_metas_periodo, data_inicial_str, data_final_str, empreendimento_selecionado)
+        executor.enviar('top_empreendimentos', get_top_empreendimentos, *filtros, limit=10)
+        # House e estratificação usam o mesmo conjunto de vendas
+        executor.enviar('vendas', get_vendas_with_metas, *filtros)
+        
+        for resultado in executor.concluidos():
+            resultados[resultado.nome] = resultado
+            nome = resultado.nome
             
-            # Carregar timeline
-            timeline_data = get_timeline_data(data_inicial_str, data_final_str, midia_selecionada, tipovenda_selecionada, empreendimento_selecionado)
-            st.session_state.timeline_data = timeline_data
+            if resultado.erro is not None:
+                if nome in espacos:
+                    espacos[nome].error(f"❌ Erro ao carregar dados: {str(resultado.erro)}")
+                elif nome == 'vendas':
+                    espacos['house'].error(f"❌ Erro ao carregar dados: {str(resultado.erro)}")
+                    espacos['estratificacao'].empty()
+                continue
             
-            # Carregar top empreendimentos
-            top_empreendimentos = get_top_empreendimentos(data_inicial_str, data_final_str, midia_selecionada, tipovenda_selecionada, empreendimento_selecionado, limit=10)
-            st.session_state.top_empreendimentos = top_empreendimentos
+            if nome == 'kpis':
+                st.session_state.kpis = resultado.valor
+                with espacos['kpis'].container():
+                    render_kpis(resultado.valor)
+            elif nome == 'top_empreendimentos':
+                st.session_state.top_empreendimentos = resultado.valor
+                with espacos['top_empreendimentos'].container():
+                    render_top_empreendimentos(resultado.valor)
+            elif nome == 'vendas':
+                with espacos['house'].container():
+                    render_house_analysis(resultado.valor)
+                with espacos['estratificacao'].container():
+                    render_empreendimentos_estratificados(resultado.valor)
             
-        except Exception as e:
-            st.error(f"❌ Erro ao carregar dados: {str(e)}")
-            return
-    
-    # Renderizar seções principais
-    render_kpis(kpis)
-    st.markdown("---")
-    
-    render_metas_section(data_inicial_str, data_final_str, empreendimento_selecionado)
-    st.markdown("---")
-    
-    # Gráfico de evolução mensal removido conforme solicitado
-    # render_timeline(timeline_data)
-    # st.markdown("---")
-    
-    render_top_empreendimentos(top_empreendimentos)
-    st.markdown("---")
-    
-    render_house_analysis(data_inicial_str, data_final_str, midia_selecionada, tipovenda_selecionada, empreendimento_selecionado)
-    st.markdown("---")
-    
-    render_empreendimentos_estratificados(data_inicial_str, data_final_str, midia_selecionada, tipovenda_selecionada, empreendimento_selecionado)
+            # Metas dependem da meta do período e do total vendido (KPIs)
+            if nome in ('kpis', 'metas') and 'kpis' in resultados and 'metas' in resultados:
+                kpis, metas = resultados['kpis'], resultados['metas']
+                if kpis.erro is None and metas.erro is None:
+                    with espacos['metas'].container():
+                        render_metas_section(metas.valor, kpis.valor)
+                elif metas.erro is None:
+                    espacos['metas'].empty()
     
     # Footer
     st.markdown("---")
@@ -530,6 +534,7 @@ def main():
         ⏰ Atualizado em: {data_atual}
     </div>
     """.format(data_atual=datetime.now().strftime('%d/%m/%Y %H:%M:%S')), unsafe_allow_html=True)
+    st.caption(f"⏱️ Tempo por painel: {executor.resumo_tempos()}")
 
 if __name__ == "__main__":
     main()